@@ -0,0 +1,739 @@
+"""
+SOLUTION 1 EXTENSION: Columnar Book Catalog
+============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Columnar storage: One compact array per attribute instead of one __dict__ per object
+2. String tables: Repeated strings are stored once and referenced by id
+3. Packed text: Many strings stored back to back in one bytes buffer
+4. Bitsets: Eight True/False flags packed into every byte
+5. Views: Objects made on demand that read and write through to shared storage
+6. Subclassing for compatibility: BookView IS-A Book, so existing code keeps working
+7. Batch operations: One call applies thousands of changes and returns data, not prints
+8. Lock striping: Many small locks so threads only wait for neighbours, not everyone
+
+"""
+
+import sys
+import threading
+from array import array
+from contextlib import ExitStack
+from itertools import accumulate
+from enum import IntEnum
+
+from solution_01_basic_classes import Book
+
+
+class Bitmap:
+    """A growable sequence of booleans packed eight to a byte"""
+
+    def __init__(self, size=0, fill=False):
+        """
+        Initialize a Bitmap
+
+        Parameters:
+        -----------
+        size : int, optional
+            Number of flags to start with (default 0)
+        fill : bool, optional
+            Initial value of every flag (default False)
+        """
+        self._size = 0
+        self._bytes = bytearray()
+        for _ in range(size):
+            self.append(fill)
+
+    @classmethod
+    def from_buffer(cls, buffer, size):
+        """
+        Wrap existing writable bytes (e.g. a memoryview of an mmap) as a Bitmap
+
+        NOTE: The result has a fixed size - append() needs a bytearray
+        """
+        bitmap = cls()
+        bitmap._bytes = buffer
+        bitmap._size = size
+        return bitmap
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return bool(self._bytes[index >> 3] & (1 << (index & 7)))
+
+    def __setitem__(self, index, flag):
+        if flag:
+            self._bytes[index >> 3] |= 1 << (index & 7)
+        else:
+            self._bytes[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def append(self, flag):
+        """Add one flag at the end"""
+        if self._size & 7 == 0:
+            self._bytes.append(0)
+        self._size += 1
+        if flag:
+            self[self._size - 1] = True
+
+    def count(self):
+        """
+        Count the flags that are set
+
+        NOTE: Unused bits in the last byte are always zero, so the whole
+        buffer can be counted in one go
+        """
+        return bin(int.from_bytes(self._bytes, "little")).count("1")
+
+    def nbytes(self):
+        """Return the number of bytes used for storage"""
+        return len(self._bytes)
+
+
+class ItemStatus(IntEnum):
+    """Outcome of one item in a batch borrow or return"""
+    SUCCEEDED = 0
+    ALREADY_BORROWED = 1
+    NOT_BORROWED = 2
+    UNKNOWN = 3
+
+
+class BatchResult:
+    """
+    Per-item outcome of borrow_many() or return_many()
+
+    NOTE: Statuses are kept as one byte per item, in the same order as
+    the ids that were passed in
+    """
+
+    def __init__(self, ids, statuses):
+        """
+        Initialize a BatchResult
+
+        Parameters:
+        -----------
+        ids : sequence of int
+            The book ids that were processed
+        statuses : bytearray
+            One ItemStatus value per id
+        """
+        self.ids = ids
+        self.statuses = statuses
+
+    def __len__(self):
+        return len(self.statuses)
+
+    def __iter__(self):
+        """Iterate over (book_id, ItemStatus) pairs"""
+        for book_id, status in zip(self.ids, self.statuses):
+            yield book_id, ItemStatus(status)
+
+    def count(self, status):
+        """Return how many items ended with the given status"""
+        return self.statuses.count(status)
+
+    def ids_with(self, status):
+        """Return the ids of the items that ended with the given status"""
+        return [book_id for book_id, code in zip(self.ids, self.statuses)
+                if code == status]
+
+    @property
+    def succeeded(self):
+        """Number of items that were applied"""
+        return self.statuses.count(ItemStatus.SUCCEEDED)
+
+    def summary(self):
+        """Return a dict of status name -> count"""
+        return {status.name: self.statuses.count(status) for status in ItemStatus}
+
+
+class BookCatalog:
+    """
+    Stores many books column-wise
+
+    Every book gets an integer id (its row number). Titles are packed as
+    UTF-8 into one buffer, authors are interned once in an author table,
+    pages live in an unsigned int array and availability is a single bit
+    per book.
+
+    Availability changes are thread-safe. Eight books share a byte of
+    the bitmap, so the catalog keeps a fixed pool of locks and picks one
+    by byte number: two threads only wait for each other when they touch
+    books in bytes that map to the same lock. Adding books takes one
+    more lock, so concurrent adds never hand out the same id.
+    """
+
+    LOCK_STRIPES = 64   # must be a power of two
+
+    def __init__(self):
+        """Initialize an empty catalog"""
+        self._title_data = bytearray()
+        self._title_starts = array("Q")
+        self._title_lengths = array("I")
+        self._author_ids = array("I")
+        self._authors = []
+        self._author_lookup = {}
+        self._pages = array("I")
+        self._available = Bitmap()
+        self._live = Bitmap()
+        self._live_count = 0
+        self._listeners = []
+        self._return_handler = None
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._add_lock = threading.Lock()       # id allocation and column appends
+        self._authors_lock = threading.Lock()   # new entries in the author table
+        self._count_lock = threading.Lock()     # _live_count
+
+    def _lock_for(self, book_id):
+        """Return the lock guarding the bitmap byte that holds book_id"""
+        return self._locks[(book_id >> 3) & (self.LOCK_STRIPES - 1)]
+
+    def _all_locks(self):
+        """
+        Return a context manager holding every stripe lock
+
+        NOTE: Locks are always taken in the same order, so two threads
+        doing this cannot deadlock
+        """
+        stack = ExitStack()
+        for lock in self._locks:
+            stack.enter_context(lock)
+        return stack
+
+    def add_listener(self, listener):
+        """
+        Register an object to be told about changes to the catalog
+
+        NOTE: The listener needs book_added(book_id) and
+        book_removed(book_id) methods. A changed title or author is
+        reported as a removal followed by an addition. A removed book's
+        title and author can still be read in book_removed.
+        """
+        self._listeners.append(listener)
+
+    def set_return_handler(self, handler):
+        """
+        Install a function that may claim a book as it is returned
+
+        NOTE: handler(book_id) is called under the book's stripe lock. If
+        it returns True the book was passed straight to someone else and
+        stays borrowed; otherwise it goes back on the shelf. Pass None to
+        remove the handler.
+        """
+        self._return_handler = handler
+
+    def add(self, title, author, pages, is_available=True):
+        """
+        Add a book to the catalog
+
+        Parameters:
+        -----------
+        title : str
+            The title of the book
+        author : str
+            The author of the book
+        pages : int
+            Number of pages in the book
+        is_available : bool, optional
+            Whether the book starts on the shelf (default True)
+
+        Returns:
+        --------
+        int : The id of the new book
+
+        NOTE: Every value is converted before any column changes, so a
+        bad one (e.g. negative pages) leaves the catalog untouched
+        """
+        encoded = title.encode()
+        pages = array("I", [pages])
+        author_id = self._author_id(author)
+        with self._add_lock:
+            book_id = len(self._pages)
+            self._title_starts.append(len(self._title_data))
+            self._title_lengths.append(len(encoded))
+            self._title_data += encoded
+            self._author_ids.append(author_id)
+            self._pages.extend(pages)
+            with self._lock_for(book_id):
+                self._available.append(is_available)
+                self._live.append(True)
+        with self._count_lock:
+            self._live_count += 1
+        for listener in self._listeners:
+            listener.book_added(book_id)
+        return book_id
+
+    def add_many(self, records):
+        """
+        Add many books at once
+
+        Parameters:
+        -----------
+        records : iterable of (title, author, pages, is_available)
+            The books to add
+
+        Returns:
+        --------
+        range : The ids given to the new books
+
+        NOTE: The batch is converted into new columns first and appended
+        only if every record is valid, so a bad record adds nothing
+        """
+        title_data, lengths = bytearray(), array("I")
+        author_ids, author_id, pages_column = array("I"), self._author_id, array("I")
+        flags = []
+        for title, author, pages, is_available in records:
+            encoded = title.encode()
+            pages_column.append(pages)
+            lengths.append(len(encoded))
+            title_data += encoded
+            author_ids.append(author_id(author))
+            flags.append(is_available)
+        with self._add_lock:
+            first_id = len(self._pages)
+            starts = array("Q", accumulate(lengths, initial=len(self._title_data)))
+            starts.pop()    # the end of the last title
+            self._title_starts.extend(starts)
+            self._title_lengths.extend(lengths)
+            self._title_data += title_data
+            self._author_ids.extend(author_ids)
+            self._pages.extend(pages_column)
+            new_ids = range(first_id, len(self._pages))
+            with self._all_locks():
+                for is_available in flags:
+                    self._available.append(is_available)
+                    self._live.append(True)
+        with self._count_lock:
+            self._live_count += len(new_ids)
+        for listener in self._listeners:
+            for book_id in new_ids:
+                listener.book_added(book_id)
+        return new_ids
+
+    def add_book(self, book):
+        """Copy an existing Book object into the catalog and return its id"""
+        return self.add(book.title, book.author, book.pages, book.is_available)
+
+    def remove(self, book_id):
+        """
+        Remove a book from the catalog
+
+        NOTE: The row is only marked as deleted so that the ids of the
+        other books never change. The check and the mark happen under
+        the book's stripe lock, so if two threads remove the same book
+        one of them gets KeyError and listeners hear about it once.
+        """
+        with self._lock_for(book_id):
+            self._check(book_id)
+            self._live[book_id] = False
+            self._available[book_id] = False
+        with self._count_lock:
+            self._live_count -= 1
+        for listener in self._listeners:
+            listener.book_removed(book_id)
+
+    def _title(self, book_id):
+        """Decode the title of a book from the packed title buffer"""
+        start = self._title_starts[book_id]
+        return str(self._title_data[start:start + self._title_lengths[book_id]], "utf-8")
+
+    def _author(self, book_id):
+        """Look up the author of a book in the author table"""
+        return self._authors[self._author_ids[book_id]]
+
+    def _update(self, book_id, title=None, author=None):
+        """Change the title and/or author of a book, keeping listeners in sync"""
+        for listener in self._listeners:
+            listener.book_removed(book_id)
+        if title is not None:
+            self._set_title(book_id, title)
+        if author is not None:
+            self._author_ids[book_id] = self._author_id(author)
+        for listener in self._listeners:
+            listener.book_added(book_id)
+
+    def _set_title(self, book_id, title):
+        """Append a title to the packed title buffer and point the book at it"""
+        encoded = title.encode()
+        with self._add_lock:    # adds append to the same buffer
+            self._title_starts[book_id] = len(self._title_data)
+            self._title_lengths[book_id] = len(encoded)
+            self._title_data += encoded
+
+    def _author_id(self, author):
+        """Return the id of an author, adding it to the author table if new"""
+        author_id = self._author_lookup.get(author)
+        if author_id is None:
+            with self._authors_lock:
+                author_id = self._author_lookup.get(author)
+                if author_id is None:
+                    author_id = len(self._authors)
+                    self._authors.append(sys.intern(author))
+                    self._author_lookup[author] = author_id
+        return author_id
+
+    def _check(self, book_id):
+        """Raise KeyError if book_id does not name a book in the catalog"""
+        if not (0 <= book_id < len(self._pages) and self._live[book_id]):
+            raise KeyError(f"Unknown book id: {book_id}")
+
+    def __len__(self):
+        return self._live_count
+
+    def __contains__(self, book_id):
+        return (isinstance(book_id, int) and 0 <= book_id < len(self._pages)
+                and self._live[book_id])
+
+    def __getitem__(self, book_id):
+        """Return a BookView for the given id"""
+        self._check(book_id)
+        return BookView(self, book_id)
+
+    def __iter__(self):
+        """Iterate over views of every book in the catalog"""
+        for book_id in self.ids():
+            yield BookView(self, book_id)
+
+    def ids(self):
+        """Iterate over the ids of every book in the catalog"""
+        live = self._live
+        return (book_id for book_id in range(len(self._pages)) if live[book_id])
+
+    def try_borrow(self, book_id):
+        """
+        Atomically mark a book as borrowed
+
+        NOTE: The check and the update happen under one lock, so two
+        threads can never both borrow the same book
+
+        Returns:
+        --------
+        bool : True if the book was available and is now borrowed
+        """
+        with self._lock_for(book_id):
+            self._check(book_id)
+            if not self._available[book_id]:
+                return False
+            self._available[book_id] = False
+            return True
+
+    def try_return(self, book_id):
+        """
+        Atomically mark a book as returned
+
+        Returns:
+        --------
+        bool : True if the book was borrowed and has been returned (either
+        to the shelf or to the return handler)
+        """
+        with self._lock_for(book_id):
+            self._check(book_id)
+            if self._available[book_id]:
+                return False
+            handler = self._return_handler
+            if handler is None or not handler(book_id):
+                self._available[book_id] = True
+            return True
+
+    def _set_available(self, book_id, flag):
+        """
+        Set a book's availability bit under its stripe lock
+
+        NOTE: Removed books are left alone, so they never come back as
+        available
+        """
+        with self._lock_for(book_id):
+            if self._live[book_id]:
+                self._available[book_id] = flag
+
+    def borrow_many(self, ids):
+        """
+        Borrow a batch of books in one pass over the availability bitmap
+
+        Parameters:
+        -----------
+        ids : sequence of int
+            Book ids in the order the requests arrived. An id may appear
+            more than once; later requests see the effect of earlier ones.
+
+        Returns:
+        --------
+        BatchResult : SUCCEEDED, ALREADY_BORROWED or UNKNOWN for every id
+        """
+        return self._apply_batch(ids, borrow=True)
+
+    def return_many(self, ids):
+        """
+        Return a batch of books in one pass over the availability bitmap
+
+        Returns:
+        --------
+        BatchResult : SUCCEEDED, NOT_BORROWED or UNKNOWN for every id
+        """
+        return self._apply_batch(ids, borrow=False)
+
+    def _apply_batch(self, ids, borrow):
+        """
+        Flip availability bits for a batch of ids
+
+        NOTE: Works directly on the bitmap bytes with local variables,
+        which keeps the per-item cost to a few byte operations. Every
+        stripe lock is held for the whole batch.
+        """
+        with self._all_locks():
+            return self._apply_batch_locked(ids, borrow)
+
+    def _apply_batch_locked(self, ids, borrow):
+        """Body of _apply_batch; the caller holds every stripe lock"""
+        available = self._available._bytes
+        live = self._live._bytes
+        size = len(self._pages)
+        statuses = bytearray(len(ids))
+        unknown = int(ItemStatus.UNKNOWN)
+        conflict = int(ItemStatus.ALREADY_BORROWED if borrow else ItemStatus.NOT_BORROWED)
+        # Borrowing needs the bit set, returning needs it clear
+        flip = 0 if borrow else 0xFF
+        handler = None if borrow else self._return_handler
+        for position, book_id in enumerate(ids):
+            byte, bit = book_id >> 3, 1 << (book_id & 7)
+            if not (0 <= book_id < size and live[byte] & bit):
+                statuses[position] = unknown
+            elif (available[byte] ^ flip) & bit:
+                if handler is None or not handler(book_id):
+                    available[byte] ^= bit
+            else:
+                statuses[position] = conflict
+        return BatchResult(ids, statuses)
+
+    def available_count(self):
+        """Return how many books are currently on the shelf"""
+        return self._available.count()
+
+    def memory_usage(self):
+        """
+        Estimate the bytes used by the catalog columns
+
+        Returns:
+        --------
+        int : Bytes used by the arrays, bitmaps and string tables
+        """
+        columns = (self._title_starts, self._title_lengths,
+                   self._author_ids, self._pages)
+        return (len(self._title_data)
+                + sum(column.itemsize * len(column) for column in columns)
+                + sys.getsizeof(self._authors)
+                + sys.getsizeof(self._author_lookup)
+                + sum(sys.getsizeof(author) for author in self._authors)
+                + self._available.nbytes()
+                + self._live.nbytes())
+
+
+class BookView(Book):
+    """
+    A Book that reads and writes its fields through a BookCatalog
+
+    NOTE: Book.__init__ is deliberately not called - the data already
+    lives in the catalog. The inherited display_info() works unchanged
+    because the fields are properties. borrow() and return_book() print
+    the same messages as Book but use the catalog's atomic operations,
+    so views are safe to use from several threads.
+
+    NOTE: Views are not kept per book; the catalog makes one when asked
+    and it can be dropped after use. They have no __slots__: Book has
+    none, so every view gets a __dict__ anyway.
+    """
+
+    def __init__(self, catalog, book_id):
+        """
+        Initialize a view
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            The catalog holding the data
+        book_id : int
+            Row of the book in the catalog
+        """
+        self._catalog = catalog
+        self._book_id = book_id
+
+    @property
+    def book_id(self):
+        """Read-only id of the book in its catalog"""
+        return self._book_id
+
+    @property
+    def title(self):
+        return self._catalog._title(self._book_id)
+
+    @title.setter
+    def title(self, value):
+        self._catalog._update(self._book_id, title=value)
+
+    @property
+    def author(self):
+        return self._catalog._author(self._book_id)
+
+    @author.setter
+    def author(self, value):
+        self._catalog._update(self._book_id, author=value)
+
+    @property
+    def pages(self):
+        return self._catalog._pages[self._book_id]
+
+    @pages.setter
+    def pages(self, value):
+        self._catalog._pages[self._book_id] = value
+
+    @property
+    def is_available(self):
+        return self._catalog._available[self._book_id]
+
+    @is_available.setter
+    def is_available(self, value):
+        self._catalog._set_available(self._book_id, value)
+
+    def borrow(self):
+        """Borrow the book if it's available (thread-safe)"""
+        if self._catalog.try_borrow(self._book_id):
+            print(f"✓ '{self.title}' borrowed successfully!")
+        else:
+            print(f"✗ Sorry, '{self.title}' is already borrowed.")
+
+    def return_book(self):
+        """Return the book to the library (thread-safe)"""
+        self._catalog.try_return(self._book_id)
+        print(f"✓ '{self.title}' returned successfully!")
+
+    def __repr__(self):
+        return f"BookView(book_id={self._book_id}, title={self.title!r})"
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    print("=" * 50)
+    print("TESTING BOOK CATALOG")
+    print("=" * 50)
+
+    catalog = BookCatalog()
+    first = catalog.add("Python Crash Course", "Eric Matthes", 544)
+    second = catalog.add_book(Book("Clean Code", "Robert Martin", 464))
+    catalog.add("Clean Architecture", "Robert Martin", 432)
+
+    # Views behave exactly like Book objects
+    print("\n1. Views behave like Book objects:")
+    book = catalog[first]
+    print(f"isinstance(book, Book): {isinstance(book, Book)}")
+    book.display_info()
+    book.borrow()   # Should succeed
+    book.borrow()   # Should fail (already borrowed)
+    catalog[first].display_info()   # A fresh view sees the same state
+    book.return_book()
+
+    # Authors are stored once
+    print("\n2. Shared author table:")
+    print(f"Books: {len(catalog)}, distinct authors: {len(catalog._authors)}")
+
+    # Removing keeps other ids stable
+    print("\n3. Removing a book:")
+    catalog.remove(second)
+    print(f"Books left: {len(catalog)}")
+    print(f"Id {second} still in catalog: {second in catalog}")
+    print(f"Titles: {[b.title for b in catalog]}")
+
+    # Batch borrowing returns data instead of printing
+    print("\n4. Batch borrow and return:")
+    result = catalog.borrow_many([0, 2, 0, 99])
+    for book_id, status in result:
+        print(f"borrow {book_id}: {status.name}")
+    print(f"Returned: {catalog.return_many([0, 2, 2]).summary()}")
+
+    # Memory comparison
+    count = 200_000
+    print(f"\n5. Memory for {count:,} books:")
+    authors = [f"Author {i}" for i in range(5000)]
+
+    tracemalloc.start()
+    objects = [Book(f"The Collected Works, Volume {i}", authors[i % 5000], 300)
+               for i in range(count)]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+
+    tracemalloc.start()
+    big = BookCatalog()
+    for i in range(count):
+        big.add(f"The Collected Works, Volume {i}", authors[i % 5000], 300)
+    column_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Book objects: {object_bytes / count:6.1f} bytes per book")
+    print(f"BookCatalog:  {column_bytes / count:6.1f} bytes per book")
+    print(f"Reduction:    {object_bytes / column_bytes:6.1f}x")
+    print(f"Without title text: {big.memory_usage() / count - len(big._title_data) / count:6.1f}"
+          " bytes per book")
+
+    # Batch throughput
+    events = [random.randrange(count) for _ in range(100_000)]
+    print(f"\n6. Batch of {len(events):,} events against {count:,} books:")
+    start = time.perf_counter()
+    borrowed = big.borrow_many(events)
+    middle = time.perf_counter()
+    returned = big.return_many(events)
+    end = time.perf_counter()
+    print(f"borrow_many: {(middle - start) * 1000:.1f} ms {borrowed.summary()}")
+    print(f"return_many: {(end - middle) * 1000:.1f} ms {returned.summary()}")
+
+    # Stress test: many threads fighting over a few hot titles
+    def hammer(shop, hot_ids, holders, violations, operations):
+        """Borrow and return hot titles, checking nobody else holds them"""
+        for _ in range(operations):
+            book_id = random.choice(hot_ids)
+            if shop.try_borrow(book_id):
+                holders[book_id] += 1
+                if holders[book_id] != 1:
+                    violations.append(book_id)
+                holders[book_id] -= 1
+                shop.try_return(book_id)
+
+    print("\n7. Stress test with threads on 16 hot titles:")
+    sys.setswitchinterval(1e-5)     # switch threads very often to provoke races
+    hot_ids = list(range(16))
+    operations = 20_000
+    for thread_count in (1, 2, 4, 8):
+        holders = [0] * len(hot_ids)
+        violations = []
+        threads = [threading.Thread(target=hammer,
+                                    args=(big, hot_ids, holders, violations, operations))
+                   for _ in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        rate = thread_count * operations / elapsed
+        print(f"{thread_count} thread(s): {rate:10,.0f} attempts/sec, "
+              f"double borrows: {len(violations)}")
+    sys.setswitchinterval(0.005)
+    print("(Only one thread runs Python code at a time under CPython's GIL,")
+    print(" so more threads add safety, not speed)")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Every object with a __dict__ carries a lot of per-instance overhead")
+    print("2. Storing one array per field keeps the data compact")
+    print("3. Lookup tables store repeated strings once")
+    print("4. A view object can still look exactly like the original class")
+    print("5. Properties let inherited methods work on the new storage")
+    print("6. Batch APIs should return structured results for the caller")
+    print("7. Check-then-set must happen under a lock to be thread-safe")
@@ -0,0 +1,231 @@
+"""
+SOLUTION 1 EXTENSION: Catalog Analytics
+========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Vectorization: One NumPy call processes a whole column in C
+2. Optional dependencies: Use NumPy when installed, plain Python otherwise
+3. Group-by with bincount: Sum values per author id in a single pass
+4. Bit unpacking: Turn a packed bitmap into a boolean column
+5. Strategy: Two interchangeable implementations behind one interface
+
+"""
+
+from solution_01_book_catalog import BookCatalog
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CatalogAnalytics:
+    """
+    Aggregate questions about a BookCatalog
+
+    Every method reads the catalog's columns directly. With NumPy the
+    columns are copied into arrays once per call and aggregated with
+    vectorized operations; without NumPy the same results are computed
+    with plain loops over the columns.
+    """
+
+    def __init__(self, catalog, use_numpy=None):
+        """
+        Initialize CatalogAnalytics
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            The catalog to analyse
+        use_numpy : bool, optional
+            Force NumPy on or off (default: use it if it is installed)
+        """
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self._catalog = catalog
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+
+    # ---- column access ----------------------------------------------------
+
+    def _bits(self, bitmap):
+        """
+        Return a bitmap as a NumPy boolean array
+
+        NOTE: The arrays are copies, so the catalog's buffers are never
+        left exported (a bytearray cannot grow while a view of it exists)
+        """
+        size = len(self._catalog._pages)
+        packed = np.frombuffer(bitmap._bytes, dtype=np.uint8).copy()
+        return np.unpackbits(packed, count=size, bitorder="little").astype(bool)
+
+    def _numpy_columns(self):
+        """Return (pages, author_ids, available, live) as NumPy arrays"""
+        catalog = self._catalog
+        pages = np.frombuffer(catalog._pages, dtype=np.uint32).astype(np.int64)
+        author_ids = np.frombuffer(catalog._author_ids, dtype=np.uint32).copy()
+        return pages, author_ids, self._bits(catalog._available), self._bits(catalog._live)
+
+    def _python_rows(self):
+        """Yield (pages, author_id, available) for every book in the catalog"""
+        catalog = self._catalog
+        pages, author_ids = catalog._pages, catalog._author_ids
+        available, live = catalog._available._bytes, catalog._live._bytes
+        for book_id in range(len(pages)):
+            byte, bit = book_id >> 3, 1 << (book_id & 7)
+            if live[byte] & bit:
+                yield pages[book_id], author_ids[book_id], bool(available[byte] & bit)
+
+    # ---- totals -------------------------------------------------------------
+
+    def total_pages(self, available_only=False):
+        """
+        Sum of pages over the catalog
+
+        Parameters:
+        -----------
+        available_only : bool, optional
+            Only count books on the shelf (default False)
+        """
+        if self.use_numpy:
+            pages, _, available, live = self._numpy_columns()
+            mask = available if available_only else live
+            return int(pages[mask].sum())
+        return sum(pages for pages, _, available in self._python_rows()
+                   if available or not available_only)
+
+    def availability_ratio(self):
+        """Fraction of books currently on the shelf"""
+        catalog = self._catalog
+        return catalog.available_count() / len(catalog) if len(catalog) else 0.0
+
+    def page_stats(self):
+        """
+        Minimum, maximum and mean page count
+
+        Returns:
+        --------
+        dict : {'min': int, 'max': int, 'mean': float} (None values if empty)
+        """
+        if not len(self._catalog):
+            return {"min": None, "max": None, "mean": None}
+        if self.use_numpy:
+            pages, _, _, live = self._numpy_columns()
+            pages = pages[live]
+            return {"min": int(pages.min()), "max": int(pages.max()),
+                    "mean": float(pages.mean())}
+        low, high, total, count = None, None, 0, 0
+        for pages, _, _ in self._python_rows():
+            low = pages if low is None or pages < low else low
+            high = pages if high is None or pages > high else high
+            total += pages
+            count += 1
+        return {"min": low, "max": high, "mean": total / count}
+
+    # ---- group-bys ------------------------------------------------------------
+
+    def _author_totals(self):
+        """
+        Per-author book counts, available counts and page totals
+
+        Returns:
+        --------
+        tuple : three sequences indexed by author id
+        """
+        author_count = len(self._catalog._authors)
+        if self.use_numpy:
+            pages, author_ids, available, live = self._numpy_columns()
+            author_ids, pages, available = author_ids[live], pages[live], available[live]
+            books = np.bincount(author_ids, minlength=author_count)
+            on_shelf = np.bincount(author_ids[available], minlength=author_count)
+            page_sums = np.bincount(author_ids, weights=pages, minlength=author_count)
+            return books.tolist(), on_shelf.tolist(), page_sums.astype(np.int64).tolist()
+        books, on_shelf, page_sums = [0] * author_count, [0] * author_count, [0] * author_count
+        for pages, author_id, available in self._python_rows():
+            books[author_id] += 1
+            on_shelf[author_id] += available
+            page_sums[author_id] += pages
+        return books, on_shelf, page_sums
+
+    def pages_by_author(self):
+        """Return a dict of author -> total pages of their books"""
+        authors = self._catalog._authors
+        books, _, page_sums = self._author_totals()
+        return {authors[i]: page_sums[i] for i in range(len(authors)) if books[i]}
+
+    def availability_by_author(self):
+        """
+        Availability per author
+
+        Returns:
+        --------
+        dict : author -> (available books, total books, fraction available)
+        """
+        authors = self._catalog._authors
+        books, on_shelf, _ = self._author_totals()
+        return {authors[i]: (on_shelf[i], books[i], on_shelf[i] / books[i])
+                for i in range(len(authors)) if books[i]}
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING CATALOG ANALYTICS")
+    print("=" * 50)
+    print(f"NumPy available: {np is not None}")
+
+    catalog = BookCatalog()
+    catalog.add("Python Crash Course", "Eric Matthes", 544)
+    catalog.add("Clean Code", "Robert Martin", 464)
+    catalog.add("Clean Architecture", "Robert Martin", 432)
+    catalog.borrow_many([1])
+
+    print("\n1. Totals:")
+    stats = CatalogAnalytics(catalog)
+    print(f"Total pages: {stats.total_pages()}")
+    print(f"Pages on the shelf: {stats.total_pages(available_only=True)}")
+    print(f"Availability ratio: {stats.availability_ratio():.2f}")
+    print(f"Page stats: {stats.page_stats()}")
+
+    print("\n2. Group by author:")
+    for author, (available, total, ratio) in stats.availability_by_author().items():
+        print(f"{author}: {available}/{total} available ({ratio:.0%})")
+    print(f"Pages by author: {stats.pages_by_author()}")
+
+    # Sizes come from the command line, e.g.
+    #   python solution_01_catalog_analytics.py 1000000 10000000
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000]
+    for size in sizes:
+        print(f"\n3. Benchmark with {size:,} books:")
+        big = BookCatalog()
+        big.add_many((f"Volume {i}", f"Author {i % 10_000}", random.randint(50, 1500),
+                      random.random() < 0.7) for i in range(size))
+
+        start = time.perf_counter()
+        totals = {}
+        for book in big:      # the object-by-object way
+            totals[book.author] = totals.get(book.author, 0) + book.pages
+        print(f"Loop over Book views:   {time.perf_counter() - start:8.3f}s")
+
+        modes = [("Pure Python columns:", False)] + ([("NumPy columns:", True)] if np else [])
+        for label, use_numpy in modes:
+            engine = CatalogAnalytics(big, use_numpy=use_numpy)
+            start = time.perf_counter()
+            result = engine.pages_by_author()
+            print(f"{label:23} {time.perf_counter() - start:8.3f}s")
+            assert result == totals
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Columnar data is what makes vectorized analytics possible")
+    print("2. np.bincount is a fast group-by for small integer keys")
+    print("3. Optional imports let code speed up without requiring a package")
+    print("4. Keep both implementations giving identical results")
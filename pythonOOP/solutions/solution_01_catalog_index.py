@@ -0,0 +1,433 @@
+"""
+SOLUTION 1 EXTENSION: Indexing a Book Catalog
+==============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Hash index: A dict from value to ids answers exact lookups in O(1)
+2. Sorted index: Keys kept in order so a prefix is found with bisect
+3. Inverted index: Each word points to the ids of the books containing it
+4. Case folding: str.casefold() makes searches case-insensitive
+5. Observer: The index listens to the catalog and stays up to date
+
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+from solution_01_book_catalog import BookCatalog
+
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into case-folded words"""
+    return _WORD.findall(text.casefold())
+
+
+def _add_posting(postings, item_id):
+    """
+    Add an id to a sorted array of ids
+
+    NOTE: New books have the highest id so far, which makes this an
+    append in the common case
+    """
+    if not postings or postings[-1] < item_id:
+        postings.append(item_id)
+    else:
+        postings.insert(bisect_left(postings, item_id), item_id)
+
+
+def _has_posting(postings, item_id):
+    """Check for an id in a sorted array of ids with bisect"""
+    position = bisect_left(postings, item_id)
+    return position < len(postings) and postings[position] == item_id
+
+
+class PostingLists:
+    """
+    Sorted arrays of ids, one per key, with lazy removal
+
+    NOTE: Removing an id from a long array would shift everything after
+    it, so removal only marks the id stale. Lookups skip stale ids, and
+    an array is rebuilt once more than half of it is stale. An id that
+    is removed and added back (a catalog edit) is simply un-marked.
+    """
+
+    def __init__(self):
+        """Initialize with no keys"""
+        self._lists = {}    # key -> sorted array of ids, stale ones included
+        self._stale = {}    # key -> set of stale ids in its array
+
+    def __contains__(self, key):
+        return key in self._lists
+
+    def add(self, key, item_id):
+        """Add an id under a key"""
+        stale = self._stale.get(key)
+        if stale and item_id in stale:
+            stale.discard(item_id)
+            if not stale:
+                del self._stale[key]
+            return
+        postings = self._lists.get(key)
+        if postings is None:
+            self._lists[key] = array("I", [item_id])
+        else:
+            _add_posting(postings, item_id)
+
+    def remove(self, key, item_id):
+        """Remove an id stored under a key"""
+        postings = self._lists[key]
+        stale = self._stale.setdefault(key, set())
+        stale.add(item_id)
+        live = len(postings) - len(stale)
+        if not live:
+            del self._lists[key], self._stale[key]
+        elif len(postings) > 2 * live + 64:
+            self._lists[key] = array("I", (i for i in postings if i not in stale))
+            del self._stale[key]
+
+    def count(self, key):
+        """Number of ids stored under a key"""
+        return len(self._lists.get(key, ())) - len(self._stale.get(key, ()))
+
+    def ids(self, key):
+        """Return the ids stored under a key, in order"""
+        postings = self._lists.get(key, ())
+        stale = self._stale.get(key)
+        return (i for i in postings if i not in stale) if stale else postings
+
+    def has(self, key, item_id):
+        """Check for an id under a key with bisect"""
+        return (_has_posting(self._lists.get(key, ()), item_id) and
+                item_id not in self._stale.get(key, ()))
+
+
+class SortedKeyIndex:
+    """
+    Ids kept in order of a string key
+
+    NOTE: The entries are split into blocks of a few hundred so that an
+    insert only shifts one small list instead of the whole index. The
+    largest key of every block is kept in a separate list for bisect.
+    """
+
+    BLOCK_SIZE = 512
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._keys = []     # list of sorted blocks of keys
+        self._ids = []      # matching blocks of ids
+        self._maxes = []    # last key of every block
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key, item_id):
+        """Insert an id under a key"""
+        self._size += 1
+        if not self._maxes:
+            self._keys.append([key])
+            self._ids.append(array("I", [item_id]))
+            self._maxes.append(key)
+            return
+        block = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys = self._keys[block]
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        self._ids[block].insert(position, item_id)
+        self._maxes[block] = keys[-1]
+        if len(keys) > 2 * self.BLOCK_SIZE:
+            self._split(block)
+
+    def _split(self, block):
+        """Split an over-full block in two"""
+        keys, ids = self._keys[block], self._ids[block]
+        half = len(keys) // 2
+        self._keys[block:block + 1] = [keys[:half], keys[half:]]
+        self._ids[block:block + 1] = [ids[:half], ids[half:]]
+        self._maxes[block:block + 1] = [keys[half - 1], keys[-1]]
+
+    def remove(self, key, item_id):
+        """
+        Remove an id stored under a key
+
+        Raises:
+        -------
+        KeyError : If the id is not stored under that key
+        """
+        block = bisect_left(self._maxes, key)
+        while block < len(self._maxes):
+            keys, ids = self._keys[block], self._ids[block]
+            position = bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key:
+                if ids[position] == item_id:
+                    del keys[position]
+                    del ids[position]
+                    self._size -= 1
+                    if keys:
+                        self._maxes[block] = keys[-1]
+                    else:
+                        del self._keys[block], self._ids[block], self._maxes[block]
+                    return
+                position += 1
+            if position < len(keys):
+                break
+            block += 1
+        raise KeyError(f"{item_id} is not stored under {key!r}")
+
+    def prefix(self, prefix):
+        """Yield the ids whose key starts with prefix, in key order"""
+        block = bisect_left(self._maxes, prefix)
+        while block < len(self._maxes):
+            keys, ids = self._keys[block], self._ids[block]
+            position = bisect_left(keys, prefix)
+            while position < len(keys):
+                if not keys[position].startswith(prefix):
+                    return
+                yield ids[position]
+                position += 1
+            block += 1
+
+
+class CatalogIndex:
+    """
+    Title and author lookups for a BookCatalog
+
+    Provides:
+    - exact title and author lookups (hash indexes)
+    - case-insensitive prefix search on titles and authors (sorted indexes)
+    - "contains every word" search over titles and authors (inverted index)
+
+    The index registers itself as a listener, so books added, removed or
+    edited through the catalog are reflected immediately.
+    """
+
+    def __init__(self, catalog):
+        """
+        Build the index for every book already in the catalog
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            The catalog to index
+        """
+        self._catalog = catalog
+        self._by_title = {}          # title -> id, or array of ids if shared
+        self._by_author = PostingLists()     # author id -> book ids
+        self._title_order = SortedKeyIndex()
+        self._author_order = SortedKeyIndex()
+        self._words = PostingLists()         # word -> book ids
+        for book_id in catalog.ids():
+            self.book_added(book_id)
+        catalog.add_listener(self)
+
+    # ---- listener interface -------------------------------------------
+
+    def book_added(self, book_id):
+        """Index a book that was just added to (or edited in) the catalog"""
+        catalog = self._catalog
+        title = catalog._title(book_id)
+        author_id = catalog._author_ids[book_id]
+
+        existing = self._by_title.get(title)
+        if existing is None:
+            self._by_title[title] = book_id
+        elif isinstance(existing, int):
+            self._by_title[title] = array("I", sorted((existing, book_id)))
+        else:
+            _add_posting(existing, book_id)
+
+        if author_id not in self._by_author:
+            self._author_order.add(catalog._authors[author_id].casefold(), author_id)
+        self._by_author.add(author_id, book_id)
+
+        self._title_order.add(title.casefold(), book_id)
+        for word in self._book_words(book_id):
+            self._words.add(word, book_id)
+
+    def book_removed(self, book_id):
+        """Forget a book that is about to be removed from (or edited in) the catalog"""
+        catalog = self._catalog
+        title = catalog._title(book_id)
+        author_id = catalog._author_ids[book_id]
+
+        existing = self._by_title[title]
+        if isinstance(existing, int):
+            del self._by_title[title]
+        else:
+            # Only the few books sharing this title are in the array
+            del existing[bisect_left(existing, book_id)]
+            if len(existing) == 1:
+                self._by_title[title] = existing[0]
+
+        self._by_author.remove(author_id, book_id)
+        if author_id not in self._by_author:
+            self._author_order.remove(catalog._authors[author_id].casefold(), author_id)
+
+        self._title_order.remove(title.casefold(), book_id)
+        for word in self._book_words(book_id):
+            self._words.remove(word, book_id)
+
+    def _book_words(self, book_id):
+        """Return the distinct words in a book's title and author"""
+        catalog = self._catalog
+        return set(tokenize(catalog._title(book_id))) | set(tokenize(catalog._author(book_id)))
+
+    # ---- queries ------------------------------------------------------
+
+    def find_by_title(self, title):
+        """
+        Exact title lookup
+
+        Returns:
+        --------
+        list : Ids of the books with exactly this title
+        """
+        found = self._by_title.get(title)
+        if found is None:
+            return []
+        if isinstance(found, int):
+            return [found]
+        return list(found)
+
+    def find_by_author(self, author):
+        """
+        Exact author lookup
+
+        Returns:
+        --------
+        list : Ids of the books by exactly this author
+        """
+        author_id = self._catalog._author_lookup.get(author)
+        return list(self._by_author.ids(author_id))
+
+    def title_prefix(self, prefix, limit=None):
+        """
+        Case-insensitive title prefix search
+
+        Parameters:
+        -----------
+        prefix : str
+            Start of the title
+        limit : int, optional
+            Stop after this many results (default: no limit)
+
+        Returns:
+        --------
+        list : Matching ids in title order
+        """
+        return self._take(self._title_order.prefix(prefix.casefold()), limit)
+
+    def author_prefix(self, prefix, limit=None):
+        """
+        Case-insensitive author prefix search
+
+        Returns:
+        --------
+        list : Ids of books whose author starts with prefix, grouped by author
+        """
+        books = (book_id
+                 for author_id in self._author_order.prefix(prefix.casefold())
+                 for book_id in self._by_author.ids(author_id))
+        return self._take(books, limit)
+
+    def search_words(self, query, limit=None):
+        """
+        Find books whose title or author contains every word of the query
+
+        NOTE: The shortest posting list is scanned and every id is looked
+        up in the others with bisect, so the cost depends on the rarest word
+        """
+        words = sorted(set(tokenize(query)), key=self._words.count)
+        if not words:
+            return []
+        first, others = words[0], words[1:]
+        matches = (book_id for book_id in self._words.ids(first)
+                   if all(self._words.has(other, book_id) for other in others))
+        return self._take(matches, limit)
+
+    @staticmethod
+    def _take(ids, limit):
+        """Collect up to limit ids from an iterator"""
+        if limit is None:
+            return list(ids)
+        result = []
+        for book_id in ids:
+            if len(result) >= limit:
+                break
+            result.append(book_id)
+        return result
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 50)
+    print("TESTING CATALOG INDEX")
+    print("=" * 50)
+
+    catalog = BookCatalog()
+    catalog.add("Python Crash Course", "Eric Matthes", 544)
+    clean_code = catalog.add("Clean Code", "Robert Martin", 464)
+    catalog.add("Clean Architecture", "Robert Martin", 432)
+    index = CatalogIndex(catalog)
+    catalog.add("Fluent Python", "Luciano Ramalho", 792)  # Indexed automatically
+
+    print("\n1. Exact lookups:")
+    print(f"'Clean Code': {index.find_by_title('Clean Code')}")
+    print(f"'Robert Martin': {index.find_by_author('Robert Martin')}")
+
+    print("\n2. Prefix search (case-insensitive):")
+    print(f"Titles starting 'clean': {index.title_prefix('clean')}")
+    print(f"Authors starting 'LUC': {index.author_prefix('LUC')}")
+
+    print("\n3. Word search:")
+    print(f"'python': {index.search_words('python')}")
+    print(f"'clean martin': {index.search_words('clean martin')}")
+
+    print("\n4. Edits and removals keep the index in sync:")
+    catalog[clean_code].title = "Clean Code (2nd Edition)"
+    print(f"'Clean Code' now: {index.find_by_title('Clean Code')}")
+    print(f"'edition': {index.search_words('edition')}")
+    catalog.remove(clean_code)
+    print(f"After removal, 'clean': {index.title_prefix('clean')}")
+
+    count = 1_000_000
+    print(f"\n5. Lookup latency with {count:,} books:")
+    big = BookCatalog()
+    big_index = CatalogIndex(big)
+    start = time.perf_counter()
+    for i in range(count):
+        big.add(f"Volume {i} of the Archive", f"Author {i % 20000}", 300)
+    print(f"Loaded and indexed in {time.perf_counter() - start:.1f}s")
+
+    queries = [
+        ("find_by_title", lambda: big_index.find_by_title("Volume 123456 of the Archive")),
+        ("find_by_author", lambda: big_index.find_by_author("Author 777")),
+        ("title_prefix", lambda: big_index.title_prefix("volume 98765", limit=20)),
+        ("search_words", lambda: big_index.search_words("volume 424242", limit=20)),
+    ]
+    for name, query in queries:
+        rounds = 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            query()
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{name:15} {elapsed * 1e6:8.1f} µs per query")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Pick the index that matches the question being asked")
+    print("2. Sorted data plus bisect turns a prefix search into a range scan")
+    print("3. An inverted index turns word search into set intersection")
+    print("4. Listeners keep derived data consistent with the source")
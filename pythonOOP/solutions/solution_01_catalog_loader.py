@@ -0,0 +1,326 @@
+"""
+SOLUTION 1 EXTENSION: Streaming Catalog Loader
+===============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Generators: Produce one row at a time, so the file is never fully in memory
+2. Pipelines: Small generator stages chained together (read -> parse -> batch)
+3. Chunking: Group rows into fixed-size batches for bulk inserts
+4. Transparent compression: gzip files are read through the same interface
+5. Instrumentation: Count rows, bad rows and throughput while loading
+
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from solution_01_basic_classes import Book
+from solution_01_book_catalog import BookCatalog
+
+
+_TRUE = {"1", "true", "yes", "y", "available"}
+_FALSE = {"0", "false", "no", "n", "borrowed", ""}
+
+
+class LoadStats:
+    """Counters collected while loading a file"""
+
+    MAX_ERRORS = 10
+
+    def __init__(self):
+        """Initialize all counters to zero"""
+        self.rows = 0
+        self.loaded = 0
+        self.malformed = 0
+        self.errors = []        # first few (line, message) pairs
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record_error(self, line, message):
+        """Count a malformed row and keep the first few messages"""
+        self.malformed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line, message))
+
+    @property
+    def elapsed(self):
+        """Seconds spent loading so far"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def rows_per_second(self):
+        """Input rows processed per second"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.rows:,} rows, {self.loaded:,} loaded, "
+                f"{self.malformed:,} malformed in {self.elapsed:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/sec)")
+
+
+def open_text(path):
+    """
+    Open a file for reading as text, decompressing gzip on the fly
+
+    NOTE: gzip is detected from the file's magic bytes, not its name.
+    Bytes that are not UTF-8 are kept as surrogates instead of raising
+    UnicodeDecodeError, so one bad row does not end the load;
+    parse_record rejects them.
+    """
+    with open(path, "rb") as probe:
+        is_gzip = probe.read(2) == b"\x1f\x8b"
+    if is_gzip:
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8",
+                                errors="surrogateescape", newline="")
+    return open(path, "r", encoding="utf-8", errors="surrogateescape", newline="")
+
+
+def detect_format(path):
+    """Return 'csv' or 'jsonl' based on the file name"""
+    name = os.fsdecode(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if name.endswith((".csv", ".txt")):
+        return "csv"
+    raise ValueError(f"Cannot tell the format of {path}; pass fmt='csv' or fmt='jsonl'")
+
+
+FIELDS = ("title", "author", "pages", "is_available")
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, fields) pairs from a CSV or JSON Lines stream
+
+    fields is a (title, author, pages, is_available) tuple of raw values,
+    or None when the line could not be read as a record (including rows
+    the csv module rejects). CSV columns are matched by header name, so
+    their order does not matter.
+    """
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        try:
+            header = [name.strip().lower() for name in next(reader, [])]
+        except csv.Error:
+            raise ValueError("CSV header could not be read") from None
+        missing = [name for name in FIELDS[:3] if name not in header]
+        if missing:
+            raise ValueError(f"CSV header is missing columns: {missing}")
+        title, author, pages = (header.index(name) for name in FIELDS[:3])
+        available = header.index("is_available") if "is_available" in header else None
+        width = len(header)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                # The reader starts afresh on the next line
+                yield reader.line_num, None
+                continue
+            if len(row) != width:
+                yield reader.line_num, None
+                continue
+            yield reader.line_num, (row[title], row[author], row[pages],
+                                    True if available is None else row[available])
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                yield line_number, None
+                continue
+            yield line_number, (row.get("title"), row.get("author"),
+                                row.get("pages"), row.get("is_available", True))
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def parse_record(fields):
+    """
+    Validate raw fields and return a (title, author, pages, is_available) tuple
+
+    Raises:
+    -------
+    ValueError : If a field is missing or has an invalid value
+    """
+    if fields is None:
+        raise ValueError("unreadable row")
+    title, author, pages, available = fields
+    if not title or not author:
+        raise ValueError("missing title or author")
+    title, author = str(title), str(author)
+    try:
+        title.encode("utf-8")
+        author.encode("utf-8")
+    except UnicodeEncodeError:
+        raise ValueError("title or author is not valid UTF-8") from None
+    if isinstance(pages, str):
+        pages = int(pages)
+    elif isinstance(pages, float) and pages.is_integer():
+        pages = int(pages)
+    elif type(pages) is not int:
+        raise ValueError(f"pages is not a whole number: {pages!r}")
+    if not 0 <= pages < 2 ** 32:
+        raise ValueError(f"pages out of range: {pages}")
+    if isinstance(available, str):
+        flag = available.strip().lower()
+        if flag in _TRUE:
+            available = True
+        elif flag in _FALSE:
+            available = False
+        else:
+            raise ValueError(f"invalid is_available: {available!r}")
+    return title, author, pages, bool(available)
+
+
+def iter_records(path, fmt=None, stats=None):
+    """
+    Yield valid (title, author, pages, is_available) tuples from a file
+
+    Malformed rows are skipped and counted in stats
+    """
+    stats = stats if stats is not None else LoadStats()
+    with open_text(path) as stream:
+        for line_number, fields in read_rows(stream, fmt or detect_format(path)):
+            stats.rows += 1
+            try:
+                record = parse_record(fields)
+            except (TypeError, ValueError) as error:
+                stats.record_error(line_number, str(error))
+                continue
+            stats.loaded += 1
+            yield record
+    stats.finished = time.perf_counter()
+
+
+def iter_books(path, fmt=None, stats=None):
+    """Yield a Book object for every valid row of a file"""
+    for title, author, pages, is_available in iter_records(path, fmt, stats):
+        book = Book(title, author, pages)
+        book.is_available = is_available
+        yield book
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_catalog(path, catalog=None, fmt=None, chunk_size=50_000, progress=None):
+    """
+    Stream a file into a BookCatalog in fixed-size chunks
+
+    Parameters:
+    -----------
+    path : str
+        CSV or JSON Lines file, optionally gzip-compressed
+    catalog : BookCatalog, optional
+        Catalog to fill (default: a new one)
+    fmt : str, optional
+        'csv' or 'jsonl' (default: guessed from the file name)
+    chunk_size : int, optional
+        Records added per bulk insert; bounds the memory used
+    progress : callable, optional
+        Called with the LoadStats after every chunk
+
+    Returns:
+    --------
+    tuple : (catalog, LoadStats)
+    """
+    catalog = catalog if catalog is not None else BookCatalog()
+    stats = LoadStats()
+    for chunk in chunked(iter_records(path, fmt, stats), chunk_size):
+        catalog.add_many(chunk)
+        if progress is not None:
+            progress(stats)
+    stats.finished = time.perf_counter()
+    return catalog, stats
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 50)
+    print("TESTING STREAMING CATALOG LOADER")
+    print("=" * 50)
+
+    folder = tempfile.mkdtemp()
+
+    # A small CSV file with five bad rows
+    csv_path = os.path.join(folder, "books.csv")
+    with open(csv_path, "wb") as f:
+        f.write(b"title,author,pages,is_available\n")
+        f.write(b"Python Crash Course,Eric Matthes,544,true\n")
+        f.write(b"Broken Row,Nobody,not-a-number,true\n")
+        f.write(b",Missing Title,100,true\n")
+        f.write(b"Half a Page,Nobody,12.7,true\n")
+        f.write(b"Latin-1 Title \xe9,Nobody,100,true\n")
+        f.write(b'"' + b"x" * 200_000 + b'",Too Long,100,true\n')
+        f.write(b"Clean Code,Robert Martin,464,false\n")
+
+    print("\n1. Iterating Book objects from CSV:")
+    stats = LoadStats()
+    for book in iter_books(csv_path, stats=stats):
+        book.display_info()
+    print(f"Stats: {stats}")
+    for line, message in stats.errors:
+        print(f"  line {line}: {message}")
+
+    # A gzip-compressed JSON Lines file
+    count = 500_000
+    jsonl_path = os.path.join(folder, "books.jsonl.gz")
+    with gzip.open(jsonl_path, "wt", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"title": f"Volume {i}", "author": f"Author {i % 1000}",
+                                "pages": 100 + i % 900, "is_available": i % 3 != 0}))
+            f.write("\n")
+        f.write("{not json}\n")
+        f.write('{"title": "Half a Page", "author": "Nobody", "pages": 12.7}\n')
+
+    print(f"\n2. Loading {count:,} rows from gzip JSON Lines into a catalog:")
+    catalog, stats = load_catalog(jsonl_path)
+    print(f"Stats: {stats}")
+    print(f"Catalog size: {len(catalog):,}, available: {catalog.available_count():,}")
+
+    # The same data as plain CSV
+    big_csv = os.path.join(folder, "big.csv")
+    with open(big_csv, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "pages", "is_available"])
+        for i in range(count):
+            writer.writerow([f"Volume {i}", f"Author {i % 1000}", 100 + i % 900, i % 3 != 0])
+
+    print(f"\n3. Loading {count:,} rows from CSV:")
+    catalog, stats = load_catalog(big_csv)
+    print(f"Stats: {stats}")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Generators let you process files larger than memory")
+    print("2. Each pipeline stage does one job and is easy to test")
+    print("3. Bad rows should be counted, not crash the whole load")
+    print("4. Bulk inserts in chunks keep memory use flat")
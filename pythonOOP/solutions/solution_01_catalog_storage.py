@@ -0,0 +1,375 @@
+"""
+SOLUTION 1 EXTENSION: Memory-Mapped Catalog Storage
+====================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Memory mapping: A file is accessed like a bytes buffer, no reading or parsing
+2. memoryview.cast(): Look at raw bytes as an array of ints without copying
+3. File formats: A fixed header describes where every section starts
+4. Checksums: zlib.crc32 detects data that was corrupted or half-written
+5. Dirty flag and generation counter: Tell a clean shutdown from a crash
+
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from solution_01_book_catalog import Bitmap, BookCatalog
+
+
+MAGIC = b"BOOKCAT\0"
+VERSION = 1
+FLAG_DIRTY = 1
+
+# magic, version, flags, generation, count, title bytes, author bytes,
+# state checksum, static checksum
+HEADER = struct.Struct("<8sIIQQQQII")
+HEADER_SIZE = 64
+
+
+class CorruptCatalogError(ValueError):
+    """Raised when a catalog file fails its consistency checks"""
+
+
+def _align(offset):
+    """Round an offset up to a multiple of 8"""
+    return (offset + 7) & ~7
+
+
+def _layout(count, title_bytes, author_bytes):
+    """
+    Compute where every section of the file lives
+
+    NOTE: The sections that change while the catalog is open (pages and
+    the two bitmaps) come first, so their checksum covers one range.
+
+    Returns:
+    --------
+    dict : section name -> (offset, length in bytes)
+    """
+    bitmap_bytes = (count + 7) // 8
+    sizes = [
+        ("pages", 4 * count),
+        ("available", bitmap_bytes),
+        ("live", bitmap_bytes),
+        ("author_ids", 4 * count),
+        ("title_starts", 8 * count),
+        ("title_lengths", 4 * count),
+        ("title_data", title_bytes),
+        ("authors", author_bytes),
+    ]
+    sections, offset = {}, HEADER_SIZE
+    for name, length in sizes:
+        sections[name] = (offset, length)
+        offset = _align(offset + length)
+    sections["end"] = (offset, 0)
+    return sections
+
+
+def _state_range(sections):
+    """Byte range covered by the state checksum"""
+    return sections["pages"][0], sections["author_ids"][0]
+
+
+def _static_range(sections):
+    """Byte range covered by the static checksum"""
+    return sections["author_ids"][0], sections["end"][0]
+
+
+def _check_byte_order():
+    """Columns are stored in native order, which must be little-endian"""
+    if sys.byteorder != "little":
+        raise OSError("Mapped catalog files require a little-endian machine")
+
+
+def save_catalog(catalog, path):
+    """
+    Write a catalog to a file that MappedBookCatalog can open
+
+    Parameters:
+    -----------
+    catalog : BookCatalog
+        The catalog to save
+    path : str
+        Destination file (written to a temporary name, then renamed)
+    """
+    _check_byte_order()
+    count = len(catalog._pages)
+    authors = "\0".join(catalog._authors).encode()
+    title_data = bytes(catalog._title_data)
+    sections = _layout(count, len(title_data), len(authors))
+    contents = {
+        "pages": catalog._pages.tobytes(),
+        "available": bytes(catalog._available._bytes),
+        "live": bytes(catalog._live._bytes),
+        "author_ids": catalog._author_ids.tobytes(),
+        "title_starts": catalog._title_starts.tobytes(),
+        "title_lengths": catalog._title_lengths.tobytes(),
+        "title_data": title_data,
+        "authors": authors,
+    }
+
+    buffer = bytearray(sections["end"][0])
+    for name, data in contents.items():
+        offset, length = sections[name]
+        buffer[offset:offset + length] = data
+    state_crc = zlib.crc32(memoryview(buffer)[slice(*_state_range(sections))])
+    static_crc = zlib.crc32(memoryview(buffer)[slice(*_static_range(sections))])
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, 0, 1, count, len(title_data),
+                     len(authors), state_crc, static_crc)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(buffer)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class MappedBookCatalog(BookCatalog):
+    """
+    A BookCatalog whose columns live in a memory-mapped file
+
+    Opening is just mmap plus a header check: pages, titles and the
+    bitmaps are used in place. Borrowing, returning, removing and
+    changing pages write straight into the mapped pages of the file.
+    The set of books is fixed - adding books or changing titles and
+    authors needs a new file from save_catalog().
+
+    Crash consistency:
+    - While open, the header's dirty flag is set.
+    - sync() and close() store a checksum of the changing sections and
+      bump the generation counter; close() also clears the dirty flag.
+    - Opening a clean file verifies both checksums. Opening a dirty file
+      (the last process crashed) skips the state checksum and sets
+      `recovered` to True. The state is still usable because every
+      change is one store that either happened or did not: a flag change
+      writes a single byte, and a pages change writes one 4-byte slot.
+      Sections start on 8-byte boundaries, so each slot is aligned, and
+      the recovery relies on aligned 4-byte stores not tearing.
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        Open a catalog file
+
+        Parameters:
+        -----------
+        path : str
+            File written by save_catalog()
+        verify : bool, optional
+            Check the checksums (default True)
+
+        Raises:
+        -------
+        CorruptCatalogError : If the header or a checksum is wrong
+        """
+        _check_byte_order()
+        super().__init__()
+        self.path = path
+        self._file = open(path, "r+b")
+        self._map = None
+        self._views = []
+        try:
+            # mmap cannot map an empty file, so check the size first
+            if os.fstat(self._file.fileno()).st_size < HEADER_SIZE:
+                self._abort("file is too small")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self._load(verify)
+        except BaseException:
+            self._release()     # whatever went wrong, don't leak the file
+            raise
+
+    def _load(self, verify):
+        """Check the header and checksums, then set up the column views"""
+        (magic, version, flags, self.generation, count, title_bytes,
+         author_bytes, state_crc, static_crc) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._abort("not a catalog file or unsupported version")
+        self._sections = _layout(count, title_bytes, author_bytes)
+        if len(self._map) < self._sections["end"][0]:
+            self._abort("file is truncated")
+
+        self.recovered = bool(flags & FLAG_DIRTY)
+        if verify:
+            if self._checksum(_static_range) != static_crc:
+                self._abort("static sections fail their checksum")
+            if not self.recovered and self._checksum(_state_range) != state_crc:
+                self._abort("state sections fail their checksum")
+
+        self._pages = self._column("pages", "I")
+        self._available = Bitmap.from_buffer(self._column("available", "B"), count)
+        self._live = Bitmap.from_buffer(self._column("live", "B"), count)
+        self._author_ids = self._column("author_ids", "I")
+        self._title_starts = self._column("title_starts", "Q")
+        self._title_lengths = self._column("title_lengths", "I")
+        self._title_data = self._column("title_data", "B")
+        try:
+            authors = str(self._column("authors", "B"), "utf-8")
+        except UnicodeDecodeError:
+            self._abort("author names are damaged")
+        self._authors = [sys.intern(author) for author in authors.split("\0")] if authors else []
+        self._author_lookup = {author: i for i, author in enumerate(self._authors)}
+        self._live_count = self._live.count()
+
+        self._write_header(flags | FLAG_DIRTY)
+
+    def _abort(self, message):
+        """Close the file and raise CorruptCatalogError"""
+        self._release()
+        raise CorruptCatalogError(f"{self.path}: {message}")
+
+    def _checksum(self, byte_range):
+        """Compute the crc32 of a range of sections in place"""
+        start, end = byte_range(self._sections)
+        with memoryview(self._map) as whole, whole[start:end] as view:
+            return zlib.crc32(view)
+
+    def _column(self, name, typecode):
+        """Return a section of the file as a typed memoryview"""
+        offset, length = self._sections[name]
+        view = memoryview(self._map)[offset:offset + length]
+        self._views.append(view)
+        if typecode != "B":
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    def _write_header(self, flags):
+        """Rewrite the header with the current state checksum"""
+        state_crc = self._checksum(_state_range)
+        static_crc = HEADER.unpack_from(self._map, 0)[-1]
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, flags, self.generation,
+                         len(self._pages), self._sections["title_data"][1],
+                         self._sections["authors"][1], state_crc, static_crc)
+
+    def sync(self):
+        """Flush changes to disk and record a new generation"""
+        self.generation += 1
+        self._write_header(FLAG_DIRTY)
+        self._map.flush()
+
+    def close(self):
+        """Record a clean shutdown and close the file"""
+        if self._map is None:
+            return
+        self.generation += 1
+        self._write_header(0)
+        self._map.flush()
+        self._release()
+
+    def _release(self):
+        """Release every view, then the mapping and the file"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("A MappedBookCatalog has a fixed set of books and titles; "
+                        "build a BookCatalog and save_catalog() it instead")
+
+    add = add_many = _update = _read_only
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import csv
+    import tempfile
+    import time
+
+    from solution_01_catalog_loader import load_catalog
+
+    print("=" * 50)
+    print("TESTING MEMORY-MAPPED CATALOG")
+    print("=" * 50)
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "catalog.bin")
+
+    catalog = BookCatalog()
+    catalog.add("Python Crash Course", "Eric Matthes", 544)
+    catalog.add("Clean Code", "Robert Martin", 464)
+    save_catalog(catalog, path)
+
+    print("\n1. State survives a restart:")
+    with MappedBookCatalog(path) as mapped:
+        mapped[0].borrow()
+        mapped[1].pages = 480
+    with MappedBookCatalog(path) as mapped:
+        mapped[0].display_info()
+        print(f"Pages of book 1: {mapped[1].pages}, generation: {mapped.generation}")
+
+    print("\n2. Simulated crash (file left open, dirty flag set):")
+    crashed = MappedBookCatalog(path)
+    crashed[0].return_book()
+    crashed._map.flush()
+    crashed._release()      # no close(): header still says dirty
+    with MappedBookCatalog(path) as mapped:
+        print(f"Recovered: {mapped.recovered}, book 0 available: {mapped[0].is_available}")
+
+    print("\n3. Corruption is detected:")
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE)
+        f.write(b"\xff\xff")
+    try:
+        MappedBookCatalog(path)
+    except CorruptCatalogError as error:
+        print(f"✗ {error}")
+    open(path, "wb").close()
+    try:
+        MappedBookCatalog(path)
+    except CorruptCatalogError as error:
+        print(f"✗ {error}")
+
+    count = 1_000_000
+    print(f"\n4. Cold start with {count:,} books:")
+    csv_path = os.path.join(folder, "books.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "pages", "is_available"])
+        for i in range(count):
+            writer.writerow([f"Volume {i}", f"Author {i % 1000}", 100 + i % 900, i % 3 != 0])
+
+    start = time.perf_counter()
+    rebuilt, _ = load_catalog(csv_path)
+    print(f"Rebuild from CSV:       {time.perf_counter() - start:8.3f}s")
+
+    big_path = os.path.join(folder, "big.bin")
+    save_catalog(rebuilt, big_path)
+    for verify in (True, False):
+        start = time.perf_counter()
+        mapped = MappedBookCatalog(big_path, verify=verify)
+        elapsed = time.perf_counter() - start
+        print(f"mmap open (verify={verify!s:5}): {elapsed:8.3f}s")
+        mapped.close()
+
+    with MappedBookCatalog(big_path) as mapped:
+        start = time.perf_counter()
+        result = mapped.borrow_many(range(0, count, 2))
+        print(f"borrow_many of {len(result):,} in place: {time.perf_counter() - start:.3f}s")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. mmap lets the operating system page data in only when it is used")
+    print("2. memoryview.cast() gives typed, writable access without copying")
+    print("3. A header with offsets makes a binary file self-describing")
+    print("4. Checksums and a dirty flag make crashes detectable")
+    print("5. Write a new file then rename it, so readers never see half a file")
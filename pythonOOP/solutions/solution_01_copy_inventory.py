@@ -0,0 +1,351 @@
+"""
+SOLUTION 1 EXTENSION: Multiple Copies per Title
+================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Counters instead of scans: Keep totals up to date as things change
+2. Free lists per title: Find an available copy in O(1)
+3. Parallel arrays: Per-copy state as one array per field
+4. Inheritance for features: CopyInventory adds per-copy state to CopyCounts
+5. Reuse: Due dates go into the same DueDateIndex the catalog's loans use
+
+"""
+
+import threading
+from array import array
+from datetime import date
+
+from solution_01_book_catalog import BookCatalog
+from solution_01_due_dates import DueDateIndex
+
+
+_NO_COPY = -1
+
+
+class CopyCounts:
+    """
+    How many copies of each title exist and how many are on the shelf
+
+    The catalog's availability bit for a title is kept in sync: it is
+    set while at least one copy is on the shelf.
+    """
+
+    def __init__(self, catalog):
+        """
+        Initialize copy counts for a catalog
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            Catalog whose titles the copies belong to
+        """
+        self._catalog = catalog
+        self._total = array("I")
+        self._on_shelf = array("I")
+        self._lock = threading.Lock()
+        self.total_copies = 0
+        self.borrowed_copies = 0
+
+    def _grow(self, book_id):
+        """Make sure the per-title arrays reach book_id"""
+        missing = book_id + 1 - len(self._total)
+        if missing > 0:
+            self._total.extend([0] * missing)
+            self._on_shelf.extend([0] * missing)
+
+    def _sync_flag(self, book_id):
+        """
+        Mirror 'any copy on the shelf' into the catalog's availability bit
+
+        NOTE: _set_available skips titles removed from the catalog
+        """
+        self._catalog._set_available(book_id, self._on_shelf[book_id] > 0)
+
+    def add_copies(self, book_id, count=1):
+        """
+        Add copies of a title
+
+        Returns:
+        --------
+        range : Ids of the new copies (numbered per inventory)
+        """
+        if book_id not in self._catalog:
+            raise KeyError(f"Unknown book id: {book_id}")
+        with self._lock:
+            self._grow(book_id)
+            first = self.total_copies
+            self._total[book_id] += count
+            self._on_shelf[book_id] += count
+            self.total_copies += count
+            copies = range(first, first + count)
+            self._register_copies(book_id, copies)
+            self._sync_flag(book_id)
+            return copies
+
+    def _register_copies(self, book_id, copies):
+        """Hook for subclasses to set up per-copy state (lock is held)"""
+
+    def total(self, book_id):
+        """Number of copies of a title"""
+        return self._total[book_id] if book_id < len(self._total) else 0
+
+    def available(self, book_id):
+        """Number of copies of a title on the shelf"""
+        return self._on_shelf[book_id] if book_id < len(self._on_shelf) else 0
+
+    def borrow(self, book_id):
+        """
+        Take one copy of a title off the shelf
+
+        Returns:
+        --------
+        bool : True if a copy was available
+        """
+        with self._lock:
+            if not self.available(book_id):
+                return False
+            self._take(book_id)
+            return True
+
+    def give_back(self, book_id):
+        """
+        Put one borrowed copy of a title back on the shelf
+
+        Returns:
+        --------
+        bool : True if a copy of the title was out
+        """
+        with self._lock:
+            if self.available(book_id) >= self.total(book_id):
+                return False
+            self._put_back(book_id)
+            return True
+
+    def _take(self, book_id):
+        """Update the counters for one copy leaving the shelf"""
+        self._on_shelf[book_id] -= 1
+        self.borrowed_copies += 1
+        if self._on_shelf[book_id] == 0:
+            self._sync_flag(book_id)
+
+    def _put_back(self, book_id):
+        """Update the counters for one copy returning to the shelf"""
+        self._on_shelf[book_id] += 1
+        self.borrowed_copies -= 1
+        if self._on_shelf[book_id] == 1:
+            self._sync_flag(book_id)
+
+
+class CopyInventory(CopyCounts):
+    """
+    Copy counts plus the state of every physical copy
+
+    Each copy has a title, a borrower id (0 when on the shelf) and a due
+    day. Copies on the shelf are chained in a free list per title, so
+    borrowing and returning a copy are O(1). Due dates live in a
+    DueDateIndex keyed by copy id, so overdue counts come from per-day
+    totals and overdue listings only visit past due days.
+    """
+
+    def __init__(self, catalog):
+        """Initialize an empty inventory for a catalog"""
+        super().__init__(catalog)
+        self._copy_book = array("I")
+        self._on_loan = bytearray()
+        self._borrower = array("Q")
+        self._next_free = array("q")
+        self._free_head = array("q")
+        self._loaned = {}       # book_id -> set of copy ids out on loan
+        self._due = DueDateIndex()
+
+    def _grow(self, book_id):
+        missing = book_id + 1 - len(self._free_head)
+        if missing > 0:
+            self._free_head.extend([_NO_COPY] * missing)
+        super()._grow(book_id)
+
+    def _register_copies(self, book_id, copies):
+        for copy_id in copies:
+            self._copy_book.append(book_id)
+            self._on_loan.append(0)
+            self._borrower.append(0)
+            self._next_free.append(self._free_head[book_id])
+            self._free_head[book_id] = copy_id
+
+    def borrow(self, book_id, borrower_id=0, due=None):
+        """
+        Lend one copy of a title
+
+        Parameters:
+        -----------
+        book_id : int
+            Title to borrow
+        borrower_id : int, optional
+            Who is borrowing it
+        due : date or int, optional
+            Due date (or ordinal day number)
+
+        Returns:
+        --------
+        int : Id of the copy handed out, or None if none is on the shelf
+        """
+        with self._lock:
+            if not self.available(book_id):
+                return None
+            copy_id = self._free_head[book_id]
+            self._free_head[book_id] = self._next_free[copy_id]
+            self._next_free[copy_id] = _NO_COPY
+            self._on_loan[copy_id] = 1
+            self._borrower[copy_id] = borrower_id
+            self._loaned.setdefault(book_id, set()).add(copy_id)
+            if due is not None:
+                self._due.add(copy_id, due)
+            self._take(book_id)
+            return copy_id
+
+    def return_copy(self, copy_id):
+        """
+        Put a borrowed copy back on the shelf
+
+        Returns:
+        --------
+        bool : True if the copy was out
+        """
+        with self._lock:
+            if not (0 <= copy_id < len(self._on_loan) and self._on_loan[copy_id]):
+                return False
+            self._return_locked(copy_id)
+            return True
+
+    def give_back(self, book_id):
+        """
+        Put one borrowed copy of a title back on the shelf
+
+        NOTE: Any copy of the title that is out may be the one returned;
+        use return_copy() to return a particular copy
+
+        Returns:
+        --------
+        bool : True if a copy of the title was out
+        """
+        with self._lock:
+            loaned = self._loaned.get(book_id)
+            if not loaned:
+                return False
+            self._return_locked(next(iter(loaned)))
+            return True
+
+    def _return_locked(self, copy_id):
+        """Put a copy that is out back on the shelf (lock is held)"""
+        book_id = self._copy_book[copy_id]
+        self._on_loan[copy_id] = 0
+        loaned = self._loaned[book_id]
+        loaned.discard(copy_id)
+        if not loaned:
+            del self._loaned[book_id]
+        self._due.remove(copy_id)
+        self._borrower[copy_id] = 0
+        self._next_free[copy_id] = self._free_head[book_id]
+        self._free_head[book_id] = copy_id
+        self._put_back(book_id)
+
+    def borrower(self, copy_id):
+        """Borrower of a copy, or None if it is on the shelf"""
+        return self._borrower[copy_id] if self._on_loan[copy_id] else None
+
+    def due(self, copy_id):
+        """Due date of a copy, or None"""
+        return self._due.due(copy_id)
+
+    def overdue_count(self, today=None):
+        """Number of copies whose due date is before today"""
+        return self._due.overdue_count(today if today is not None else date.today())
+
+    def overdue_copies(self, today=None):
+        """Yield (copy_id, due date) for every overdue copy, oldest first"""
+        return self._due.overdue(today if today is not None else date.today())
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import timedelta
+
+    print("=" * 50)
+    print("TESTING COPY INVENTORY")
+    print("=" * 50)
+
+    catalog = BookCatalog()
+    clean_code = catalog.add("Clean Code", "Robert Martin", 464)
+    inventory = CopyInventory(catalog)
+    inventory.add_copies(clean_code, 3)
+    today = date.today()
+
+    print("\n1. Borrowing copies:")
+    loans = []
+    for patron in (1, 2, 3, 4):
+        copy_id = inventory.borrow(clean_code, patron, due=today + timedelta(days=patron - 3))
+        print(f"Patron {patron}: copy {copy_id}")
+        if copy_id is not None:
+            loans.append(copy_id)
+    print(f"Available: {inventory.available(clean_code)} of {inventory.total(clean_code)}")
+    print(f"Catalog says available: {catalog[clean_code].is_available}")
+
+    print("\n2. Overdue copies:")
+    print(f"Overdue today: {inventory.overdue_count(today)}")
+    print(f"Overdue in a week: {inventory.overdue_count(today + timedelta(days=7))}")
+    for copy_id, due in inventory.overdue_copies(today):
+        print(f"Copy {copy_id} borrowed by {inventory.borrower(copy_id)} was due {due}")
+
+    print("\n3. Returning a copy:")
+    inventory.return_copy(loans[0])
+    print(f"Available: {inventory.available(clean_code)}, "
+          f"catalog says available: {catalog[clean_code].is_available}")
+    print(f"give_back() returns any copy that is out: {inventory.give_back(clean_code)}, "
+          f"available: {inventory.available(clean_code)}")
+
+    print("\n4. A removed title stays unavailable:")
+    inventory.borrow(clean_code, 5)
+    catalog.remove(clean_code)
+    inventory.give_back(clean_code)
+    print(f"Copies back on the shelf: {inventory.available(clean_code)}, "
+          f"catalog availability bit: {catalog._available[clean_code]}")
+
+    titles, copies = 100_000, 1_000_000
+    print(f"\n5. {copies:,} copies of {titles:,} titles:")
+    big = BookCatalog()
+    big.add_many((f"Volume {i}", "Author", 100, True) for i in range(titles))
+    stock = CopyInventory(big)
+    for book_id in range(titles):
+        stock.add_copies(book_id, copies // titles)
+
+    start = time.perf_counter()
+    out = []
+    for _ in range(500_000):
+        copy_id = stock.borrow(random.randrange(titles), 1, due=today.toordinal() + random.randint(-30, 30))
+        if copy_id is not None:
+            out.append(copy_id)
+    elapsed = time.perf_counter() - start
+    print(f"borrow:        {elapsed / 500_000 * 1e6:.2f} µs each ({len(out):,} on loan)")
+
+    start = time.perf_counter()
+    overdue = stock.overdue_count(today)
+    print(f"overdue_count: {overdue:,} in {(time.perf_counter() - start) * 1e6:.0f} µs")
+
+    start = time.perf_counter()
+    for copy_id in out:
+        stock.return_copy(copy_id)
+    print(f"return_copy:   {(time.perf_counter() - start) / len(out) * 1e6:.2f} µs each")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Keep counters up to date instead of counting on demand")
+    print("2. A free list per title makes finding a copy O(1)")
+    print("3. Subclasses can add detail on top of a simpler base class")
+    print("4. Indexing loans by due day turns a scan into a handful of additions")
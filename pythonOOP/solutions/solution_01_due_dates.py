@@ -0,0 +1,305 @@
+"""
+SOLUTION 1 EXTENSION: Due Dates and Overdue Reports
+====================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Time buckets: Group loans by due day so a day's loans are found together
+2. Sorted bucket keys: bisect finds every day before "today" at once
+3. Lazy deletion: A returned loan is only unmarked; its bucket is cleaned later
+4. Wrapping: LoanTracker adds due dates around the catalog's borrow/return
+5. Generators: The overdue report is produced one loan at a time
+
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+
+from solution_01_book_catalog import BookCatalog, ItemStatus
+
+
+def to_day(value):
+    """Turn a date (or an ordinal day number) into an ordinal day number"""
+    return value.toordinal() if isinstance(value, date) else int(value)
+
+
+class DueDateIndex:
+    """
+    Integer keys (book or copy ids) bucketed by due day
+
+    Each key's due day is stored in an array. Every day with loans has a
+    bucket (an array of keys) and a live count. Removing a key only
+    clears its day in the array and lowers the count; the key is dropped
+    from the bucket when the bucket is compacted or emptied. Listing the
+    overdue keys walks the buckets for days before today, and nothing
+    else.
+
+    NOTE: A key removed and added back to the same day sits in the
+    bucket twice (the stale entry looks live again), so buckets with
+    stale entries are de-duplicated when they are read or compacted
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._day_of = array("i")   # key -> due day, 0 = no loan
+        self._buckets = {}          # day -> array of keys (may hold stale keys)
+        self._live = {}             # day -> number of keys really due that day
+        self._days = []             # sorted days that have a bucket
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key, day):
+        """
+        Record that key is due on day (replacing any earlier due day)
+
+        Parameters:
+        -----------
+        key : int
+            Loan key, e.g. a book id or copy id
+        day : date or int
+            Due date or ordinal day number
+        """
+        day = to_day(day)
+        if key >= len(self._day_of):
+            self._day_of.extend([0] * (key + 1 - len(self._day_of)))
+        elif self._day_of[key]:
+            self.remove(key)
+        self._day_of[key] = day
+        self._size += 1
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            self._buckets[day] = array("I", [key])
+            self._live[day] = 1
+            insort(self._days, day)
+        else:
+            bucket.append(key)
+            self._live[day] += 1
+
+    def remove(self, key):
+        """
+        Forget a key's due day
+
+        Returns:
+        --------
+        bool : True if the key had a due day
+        """
+        day = self._day_of[key] if key < len(self._day_of) else 0
+        if not day:
+            return False
+        self._day_of[key] = 0
+        self._size -= 1
+        live = self._live[day] - 1
+        if live == 0:
+            del self._buckets[day], self._live[day]
+            del self._days[bisect_left(self._days, day)]
+            return True
+        self._live[day] = live
+        bucket = self._buckets[day]
+        if len(bucket) > 2 * live + 64:
+            day_of = self._day_of
+            self._buckets[day] = array("I", dict.fromkeys(k for k in bucket if day_of[k] == day))
+        return True
+
+    def due(self, key):
+        """Due day of a key as a date, or None"""
+        day = self._day_of[key] if key < len(self._day_of) else 0
+        return date.fromordinal(day) if day else None
+
+    def overdue(self, today):
+        """
+        Yield (key, due date) for every key due before today
+
+        NOTE: Only buckets for days before today are visited, oldest first
+        """
+        today = to_day(today)
+        day_of = self._day_of
+        for day in self._days[:bisect_left(self._days, today)]:
+            due = date.fromordinal(day)
+            bucket = self._buckets[day]
+            if len(bucket) > self._live[day]:
+                # Stale entries: skip them, and any second copy of a key
+                bucket = dict.fromkeys(key for key in bucket if day_of[key] == day)
+            for key in bucket:
+                if day_of[key] == day:
+                    yield key, due
+
+    def overdue_count(self, today):
+        """Number of keys due before today, from the per-day counts"""
+        days = self._days[:bisect_left(self._days, to_day(today))]
+        return sum(self._live[day] for day in days)
+
+
+class LoanTracker:
+    """
+    Borrow and return books in a BookCatalog with due dates
+
+    NOTE: Borrow and return through the tracker so that due dates stay
+    in step with the catalog. If the catalog has a waitlist, a returned
+    book may go straight to the next patron; it then gets a new loan
+    with a fresh due date.
+    """
+
+    def __init__(self, catalog, loan_days=14, today=date.today):
+        """
+        Initialize a LoanTracker
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            Catalog holding the books
+        loan_days : int, optional
+            Length of a loan when no due date is given (default 14)
+        today : callable, optional
+            Returns today's date (default date.today)
+        """
+        self._catalog = catalog
+        self.loan_days = loan_days
+        self._today = today
+        self._index = DueDateIndex()
+
+    def _default_due(self, due):
+        """Return the due day to use for a new loan"""
+        if due is not None:
+            return to_day(due)
+        return (self._today() + timedelta(days=self.loan_days)).toordinal()
+
+    def borrow(self, book_id, due=None):
+        """
+        Borrow a book and record when it is due
+
+        Returns:
+        --------
+        bool : True if the book was available
+        """
+        if not self._catalog.try_borrow(book_id):
+            return False
+        self._index.add(book_id, self._default_due(due))
+        return True
+
+    def return_book(self, book_id):
+        """
+        Return a book and clear (or restart) its loan
+
+        Returns:
+        --------
+        bool : True if the book was borrowed
+        """
+        if not self._catalog.try_return(book_id):
+            return False
+        self._after_return(book_id)
+        return True
+
+    def _after_return(self, book_id):
+        """Clear a loan, or start a new one if a waitlist kept the book out"""
+        if self._catalog._available[book_id]:
+            self._index.remove(book_id)
+        else:
+            self._index.add(book_id, self._default_due(None))
+
+    def borrow_many(self, ids, due=None):
+        """Batch borrow (see BookCatalog.borrow_many) that records due dates"""
+        result = self._catalog.borrow_many(ids)
+        day = self._default_due(due)
+        add = self._index.add
+        for book_id, status in zip(result.ids, result.statuses):
+            if status == ItemStatus.SUCCEEDED:
+                add(book_id, day)
+        return result
+
+    def return_many(self, ids):
+        """Batch return (see BookCatalog.return_many) that clears due dates"""
+        result = self._catalog.return_many(ids)
+        for book_id, status in zip(result.ids, result.statuses):
+            if status == ItemStatus.SUCCEEDED:
+                self._after_return(book_id)
+        return result
+
+    def due(self, book_id):
+        """Due date of a borrowed book, or None"""
+        return self._index.due(book_id)
+
+    def overdue(self, today=None):
+        """Yield (book_id, due date) for every overdue book, oldest first"""
+        return self._index.overdue(today if today is not None else self._today())
+
+    def overdue_count(self, today=None):
+        """Number of overdue books"""
+        return self._index.overdue_count(today if today is not None else self._today())
+
+    def __len__(self):
+        """Number of books currently on loan"""
+        return len(self._index)
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("=" * 50)
+    print("TESTING DUE DATES")
+    print("=" * 50)
+
+    today = date(2024, 3, 1)
+    catalog = BookCatalog()
+    first = catalog.add("Python Crash Course", "Eric Matthes", 544)
+    second = catalog.add("Clean Code", "Robert Martin", 464)
+    third = catalog.add("The Pragmatic Programmer", "Hunt & Thomas", 352)
+    loans = LoanTracker(catalog, today=lambda: today)
+
+    print("\n1. Borrowing with due dates:")
+    loans.borrow(first)
+    loans.borrow(second, due=today - timedelta(days=3))
+    loans.borrow(third, due=today - timedelta(days=1))
+    for book_id in (first, second, third):
+        print(f"{catalog[book_id].title}: due {loans.due(book_id)}")
+
+    print("\n2. Overdue report:")
+    for book_id, due in loans.overdue():
+        print(f"OVERDUE since {due}: {catalog[book_id].title}")
+
+    print("\n3. Returning clears the loan:")
+    loans.return_book(second)
+    print(f"Overdue now: {loans.overdue_count()}, on loan: {len(loans)}")
+    loans.borrow(second, due=today - timedelta(days=1))
+    loans.return_book(second)
+    loans.borrow(second, due=today - timedelta(days=1))
+    listed = [book_id for book_id, _ in loans.overdue()]
+    print(f"Borrowed again for the same day, listed once: {listed.count(second) == 1}")
+    assert sorted(listed) == sorted(set(listed)) and len(listed) == loans.overdue_count()
+
+    count = 5_000_000
+    print(f"\n4. Nightly report over {count:,} loans:")
+    index = DueDateIndex()
+    base = today.toordinal()
+    start = time.perf_counter()
+    for key, offset in enumerate(random.choices(range(-10, 81), k=count)):
+        index.add(key, base + offset)
+    print(f"Built index in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    overdue = sum(1 for _ in index.overdue(base))
+    print(f"Listed {overdue:,} overdue loans in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    for key in range(0, count, 10):
+        index.remove(key)
+    print(f"Removed {count // 10:,} loans in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    print(f"overdue_count: {index.overdue_count(base):,} "
+          f"in {(time.perf_counter() - start) * 1e6:.0f} µs")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Bucketing by time means old items are found without a full scan")
+    print("2. Counting per bucket answers 'how many' without touching items")
+    print("3. Lazy deletion keeps removals cheap; compact buckets occasionally")
+    print("4. A wrapper class can add a feature without changing the original")
@@ -0,0 +1,336 @@
+"""
+SOLUTION 1 EXTENSION: Waitlists for Borrowed Books
+===================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. FIFO queues: First patron to ask is the first to get the book
+2. Linked lists in arrays: "next" pointers stored as ints, not objects
+3. Free lists: Reuse the slots of finished records instead of growing forever
+4. Min-heaps: heapq always gives the earliest deadline in O(log n)
+5. Lazy deletion: Mark records as dead and skip them later instead of searching
+
+"""
+
+import heapq
+import threading
+import time
+from array import array
+
+from solution_01_book_catalog import BookCatalog
+
+
+WAITING, FULFILLED, EXPIRED, CANCELLED = range(4)
+_NO_HOLD = -1
+
+
+class Waitlist:
+    """
+    Per-book FIFO reservation queues attached to a BookCatalog
+
+    Every hold lives in a slot of a few shared arrays (patron, book,
+    deadline, state and a "next hold" pointer), so a queue is just a
+    head and tail slot per book. When a borrowed book is returned the
+    first waiting hold gets it straight away and the book stays
+    borrowed. Expired holds are found through a min-heap of deadlines.
+    """
+
+    def __init__(self, catalog, hold_seconds=3 * 24 * 3600, clock=time.time):
+        """
+        Attach a waitlist to a catalog
+
+        Parameters:
+        -----------
+        catalog : BookCatalog
+            Catalog whose returns should be handed to waiting patrons
+        hold_seconds : float, optional
+            How long a hold stays valid (default 3 days)
+        clock : callable, optional
+            Returns the current time in seconds (default time.time)
+        """
+        self._catalog = catalog
+        self.hold_seconds = hold_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # One slot per hold
+        self._patron = array("Q")
+        self._book = array("I")
+        self._deadline = array("d")
+        self._next = array("q")
+        self._state = bytearray()
+        self._refs = bytearray()     # 2 = in queue and heap, 1 = in one, 0 = free
+        self._serial = array("I")    # bumped on every reuse, part of the hold id
+        self._free = array("I")
+
+        self._head = {}              # book id -> first slot in its queue
+        self._tail = {}              # book id -> last slot in its queue
+        self._waiting = {}           # book id -> number of WAITING holds
+        self._deadlines = []         # heap of (deadline, slot)
+        self._holders = {}           # book id -> patron who got it from the queue
+        self.handoffs = 0
+
+        catalog.set_return_handler(self._hand_off)
+
+    # ---- slots ----------------------------------------------------------
+
+    def _new_slot(self, book_id, patron_id, deadline):
+        """Store a hold in a free slot (or a new one) and return the slot"""
+        if self._free:
+            slot = self._free.pop()
+            self._patron[slot] = patron_id
+            self._book[slot] = book_id
+            self._deadline[slot] = deadline
+            self._next[slot] = _NO_HOLD
+            self._state[slot] = WAITING
+            self._refs[slot] = 2
+            self._serial[slot] = (self._serial[slot] + 1) & 0xFFFFFFFF
+        else:
+            slot = len(self._state)
+            self._patron.append(patron_id)
+            self._book.append(book_id)
+            self._deadline.append(deadline)
+            self._next.append(_NO_HOLD)
+            self._state.append(WAITING)
+            self._refs.append(2)
+            self._serial.append(0)
+        return slot
+
+    def _slot_of(self, hold_id):
+        """
+        Turn a hold id back into a slot
+
+        NOTE: Slots are reused, so a hold id is the slot plus the slot's
+        serial number; an old id for a reused slot returns None
+        """
+        slot, serial = hold_id & 0xFFFFFFFF, hold_id >> 32
+        if slot < len(self._serial) and self._serial[slot] == serial:
+            return slot
+        return None
+
+    def _release(self, slot):
+        """Drop one reference to a slot; free it when nothing points at it"""
+        self._refs[slot] -= 1
+        if self._refs[slot] == 0:
+            self._free.append(slot)
+
+    def _finish(self, slot, state):
+        """Move a WAITING hold to a final state"""
+        self._state[slot] = state
+        book_id = self._book[slot]
+        remaining = self._waiting[book_id] - 1
+        if remaining:
+            self._waiting[book_id] = remaining
+        else:
+            del self._waiting[book_id]
+
+    # ---- queue operations -----------------------------------------------
+
+    def reserve(self, book_id, patron_id):
+        """
+        Join the queue for a book
+
+        Parameters:
+        -----------
+        book_id : int
+            Book to wait for
+        patron_id : int
+            Who is waiting
+
+        Returns:
+        --------
+        int : Hold id (use it to cancel or check the hold)
+        """
+        if book_id not in self._catalog:
+            raise KeyError(f"Unknown book id: {book_id}")
+        deadline = self._clock() + self.hold_seconds
+        with self._lock:
+            slot = self._new_slot(book_id, patron_id, deadline)
+            tail = self._tail.get(book_id)
+            if tail is None:
+                self._head[book_id] = slot
+            else:
+                self._next[tail] = slot
+            self._tail[book_id] = slot
+            self._waiting[book_id] = self._waiting.get(book_id, 0) + 1
+            heapq.heappush(self._deadlines, (deadline, slot))
+            return (self._serial[slot] << 32) | slot
+
+    def borrow_or_reserve(self, book_id, patron_id):
+        """
+        Borrow a book if it is on the shelf, otherwise join its queue
+
+        NOTE: Holds the book's stripe lock for both steps, so the book
+        cannot be returned in between and leave the patron waiting for
+        a book that is actually on the shelf
+
+        Returns:
+        --------
+        tuple : (True, None) if borrowed, (False, hold_id) if queued
+        """
+        catalog = self._catalog
+        with catalog._lock_for(book_id):
+            catalog._check(book_id)
+            if catalog._available[book_id]:
+                catalog._available[book_id] = False
+                return True, None
+            return False, self.reserve(book_id, patron_id)
+
+    def _hand_off(self, book_id):
+        """
+        Return handler: give a returned book to the first waiting patron
+
+        NOTE: Holds that expired or were cancelled are still linked in
+        the queue; they are unlinked here as they reach the front.
+        Each one is skipped once, so this is O(1) amortized.
+
+        Returns:
+        --------
+        bool : True if the book went to a waiting patron
+        """
+        with self._lock:
+            self._holders.pop(book_id, None)
+            slot = self._head.get(book_id)
+            while slot is not None:
+                following = self._next[slot]
+                if following == _NO_HOLD:
+                    del self._head[book_id], self._tail[book_id]
+                else:
+                    self._head[book_id] = following
+                state = self._state[slot]
+                if state == WAITING:
+                    self._finish(slot, FULFILLED)
+                    self._holders[book_id] = self._patron[slot]
+                    self.handoffs += 1
+                self._release(slot)
+                if state == WAITING:
+                    return True
+                slot = None if following == _NO_HOLD else following
+            return False
+
+    def cancel(self, hold_id):
+        """
+        Cancel a waiting hold
+
+        Returns:
+        --------
+        bool : True if the hold was still waiting
+        """
+        with self._lock:
+            slot = self._slot_of(hold_id)
+            if slot is None or self._state[slot] != WAITING:
+                return False
+            self._finish(slot, CANCELLED)
+            return True
+
+    def expire_stale(self, now=None):
+        """
+        Expire every waiting hold whose deadline has passed
+
+        NOTE: Only heap entries that are actually due are popped, so the
+        cost depends on how many holds expire, not how many exist
+
+        Returns:
+        --------
+        int : Number of holds that expired
+        """
+        now = self._clock() if now is None else now
+        expired = 0
+        with self._lock:
+            deadlines = self._deadlines
+            while deadlines and deadlines[0][0] <= now:
+                _, slot = heapq.heappop(deadlines)
+                if self._state[slot] == WAITING:
+                    self._finish(slot, EXPIRED)
+                    expired += 1
+                self._release(slot)
+        return expired
+
+    # ---- queries ----------------------------------------------------------
+
+    def queue_length(self, book_id):
+        """Number of patrons currently waiting for a book"""
+        return self._waiting.get(book_id, 0)
+
+    def holder(self, book_id):
+        """Patron who received the book from the queue, or None"""
+        return self._holders.get(book_id)
+
+    def status(self, hold_id):
+        """Return 'waiting', 'fulfilled', 'expired' or 'cancelled' ('unknown' if long gone)"""
+        slot = self._slot_of(hold_id)
+        if slot is None:
+            return "unknown"
+        return ("waiting", "fulfilled", "expired", "cancelled")[self._state[slot]]
+
+    def outstanding(self):
+        """Total number of waiting holds"""
+        return sum(self._waiting.values())
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+
+    print("=" * 50)
+    print("TESTING WAITLIST")
+    print("=" * 50)
+
+    now = [1_000_000.0]
+    catalog = BookCatalog()
+    book = catalog[catalog.add("Clean Code", "Robert Martin", 464)]
+    waitlist = Waitlist(catalog, hold_seconds=60, clock=lambda: now[0])
+
+    print("\n1. Borrow or join the queue:")
+    for patron in (101, 102, 103):
+        borrowed, hold = waitlist.borrow_or_reserve(book.book_id, patron)
+        print(f"Patron {patron}: {'borrowed' if borrowed else f'queued (hold {hold})'}")
+    print(f"Queue length: {waitlist.queue_length(book.book_id)}")
+
+    print("\n2. Returning hands the book to the next patron:")
+    book.return_book()
+    print(f"Still borrowed: {not book.is_available}, now held by {waitlist.holder(book.book_id)}")
+
+    print("\n3. Stale holds expire:")
+    now[0] += 120
+    print(f"Expired: {waitlist.expire_stale()}")
+    book.return_book()
+    print(f"Queue empty, back on the shelf: {book.is_available}")
+
+    count, holds = 100_000, 300_000
+    print(f"\n4. {holds:,} holds over {count:,} books:")
+    big = BookCatalog()
+    big.add_many((f"Volume {i}", "Author", 100, True) for i in range(count))
+    big.borrow_many(range(count))
+    queue = Waitlist(big, hold_seconds=60, clock=lambda: now[0])
+
+    start = time.perf_counter()
+    for patron in range(holds):
+        # A quarter of all holds are for 16 hot titles
+        book_id = patron % 16 if patron % 4 == 0 else random.randrange(count)
+        queue.reserve(book_id, patron)
+        now[0] += 0.001
+    print(f"reserve:      {(time.perf_counter() - start) / holds * 1e6:6.2f} µs per hold")
+
+    start = time.perf_counter()
+    result = big.return_many(range(count))
+    elapsed = time.perf_counter() - start
+    print(f"return_many:  {elapsed / count * 1e6:6.2f} µs per return "
+          f"({queue.handoffs:,} handed off)")
+
+    now[0] += 30
+    start = time.perf_counter()
+    expired = queue.expire_stale()
+    print(f"expire_stale: {expired:,} expired in {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{queue.outstanding():,} still waiting")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Arrays of ints can hold a linked list with no per-node objects")
+    print("2. A free list keeps memory flat as holds come and go")
+    print("3. heapq finds the next deadline without scanning every hold")
+    print("4. Lazy deletion means a queue never has to be searched")
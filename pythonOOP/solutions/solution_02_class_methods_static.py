@@ -12,6 +12,9 @@ CONCEPTS EXPLAINED:
 
 """
 
+import threading
+
+
 class Employee:
     """Manages employee records for a company"""
     
@@ -19,6 +22,17 @@ class Employee:
     company_name = "TechCorp"
     employee_count = 0
     
+    # Default valid salary range (the one is_valid_salary checks); a
+    # company can have its own (see is_valid_company_salary)
+    MIN_SALARY = 20000
+    MAX_SALARY = 500000
+    salary_bounds = {}      # company name -> (min salary, max salary)
+    
+    # Where employee IDs come from; None means "use the count"
+    # (see solution_02_employee_ids.py for allocators)
+    id_allocator = None
+    _count_lock = threading.Lock()
+    
     def __init__(self, name, position, salary):
         """
         Initialize an Employee object
@@ -38,8 +52,13 @@ class Employee:
         self.salary = salary
         
         # Increment class variable and assign employee ID
-        Employee.employee_count += 1
-        self.employee_id = Employee.employee_count
+        # NOTE: "+= 1" is a read and a write, so two threads could both
+        # read the same count; the lock makes it one step
+        with Employee._count_lock:
+            Employee.employee_count += 1
+            count = Employee.employee_count
+        allocator = Employee.id_allocator
+        self.employee_id = count if allocator is None else allocator.next_id()
     
     @classmethod
     def get_employee_count(cls):
@@ -70,6 +89,35 @@ class Employee:
         cls.company_name = new_name
         print(f"Company name updated to: {cls.company_name}")
     
+    @classmethod
+    def set_salary_bounds(cls, min_salary, max_salary, company=None):
+        """
+        Class method to set the valid salary range of a company
+        
+        Parameters:
+        -----------
+        min_salary, max_salary : float
+            Lowest and highest valid salary (inclusive)
+        company : str, optional
+            Company name (default: the current company_name)
+        """
+        if min_salary > max_salary:
+            raise ValueError("min_salary cannot be greater than max_salary")
+        cls.salary_bounds[company or cls.company_name] = (min_salary, max_salary)
+    
+    @classmethod
+    def get_salary_bounds(cls, company=None):
+        """
+        Class method to get the valid salary range of a company
+        
+        Returns:
+        --------
+        tuple : (min salary, max salary); MIN_SALARY/MAX_SALARY if the
+        company has no bounds of its own
+        """
+        return cls.salary_bounds.get(company or cls.company_name,
+                                     (cls.MIN_SALARY, cls.MAX_SALARY))
+    
     @staticmethod
     def is_valid_salary(salary):
         """
@@ -86,10 +134,42 @@ class Employee:
         
         NOTE: Use @staticmethod when the method doesn't need access to
         class or instance data. It's like a regular function but
-        belongs logically to the class.
+        belongs logically to the class. It checks the default range
+        only; is_valid_company_salary applies a company's own bounds.
         """
         return 20000 <= salary <= 500000
     
+    @classmethod
+    def is_valid_company_salary(cls, salary, company=None):
+        """
+        Class method to validate a salary against a company's range
+        
+        Parameters:
+        -----------
+        salary : float
+            Salary amount to validate
+        company : str, optional
+            Company name (default: the current company_name)
+        
+        Returns:
+        --------
+        bool : True if salary is within get_salary_bounds(company)
+        
+        NOTE: A class method, not a static one, because the bounds are
+        class data that set_salary_bounds can change
+        """
+        low, high = cls.get_salary_bounds(company)
+        return low <= salary <= high
+    
+    def accepts_salary(self, salary):
+        """
+        Check a salary for this employee (their company's range)
+        
+        NOTE: An instance method, so subclasses whose employees carry
+        their own bounds (see TenantEmployee) can override it
+        """
+        return self.is_valid_company_salary(salary)
+    
     def give_raise(self, percentage):
         """
         Increase employee's salary by given percentage
@@ -110,7 +190,7 @@ class Employee:
     def display_info(self):
         """Display all employee information"""
         print(f"\n{'=' * 50}")
-        print(f"Company: {Employee.company_name}")
+        print(f"Company: {self.company_name}")
         print(f"Employee ID: {self.employee_id}")
         print(f"Name: {self.name}")
         print(f"Position: {self.position}")
@@ -0,0 +1,240 @@
+"""
+SOLUTION 2 EXTENSION: Employee ID Allocators
+=============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Race conditions: "count += 1" is not atomic, two threads can get one ID
+2. Pluggable behaviour: Employee asks whatever allocator it is given
+3. Block allocation: Reserve many IDs at once, then hand them out locally
+4. File locks: Let separate processes share one counter safely
+5. Fork safety: A child process must not reuse its parent's block
+
+"""
+
+import os
+import struct
+import threading
+import weakref
+
+from solution_02_class_methods_static import Employee
+
+try:
+    import fcntl
+except ImportError:           # Windows
+    fcntl = None
+    import msvcrt
+
+
+_COUNTER = struct.Struct("<Q")
+
+
+class LocalIdAllocator:
+    """
+    Thread-safe IDs for a single process
+
+    NOTE: Good enough when all employees are created in one process;
+    IDs start again from `start` in every new process
+    """
+
+    def __init__(self, start=1):
+        """
+        Initialize a LocalIdAllocator
+
+        Parameters:
+        -----------
+        start : int, optional
+            First ID to hand out (default 1)
+        """
+        self._next = start
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        """Return a new ID"""
+        with self._lock:
+            employee_id = self._next
+            self._next += 1
+            return employee_id
+
+
+# Every live BlockIdAllocator, so one fork hook can reset them all
+_block_allocators = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    """A forked child starts with copies of its parent's blocks; drop them"""
+    for allocator in list(_block_allocators):
+        allocator._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class BlockIdAllocator:
+    """
+    IDs that are unique across threads and processes
+
+    The next free ID is stored in a small counter file. A process locks
+    the file, takes a block of `block_size` IDs, writes the new counter
+    and unlocks; the IDs in the block are then handed out without
+    touching the file again. Parallel workers therefore only meet at the
+    file once per block.
+
+    NOTE: IDs are unique but not dense: a process that exits with part
+    of its block unused leaves a gap
+    """
+
+    def __init__(self, path, block_size=1000, durable=True):
+        """
+        Initialize a BlockIdAllocator
+
+        Parameters:
+        -----------
+        path : str
+            Counter file shared by every process (created if missing)
+        block_size : int, optional
+            How many IDs to reserve at a time (default 1000)
+        durable : bool, optional
+            fsync the counter after each block so a crash cannot hand
+            the same block out twice (default True)
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.path = path
+        self.block_size = block_size
+        self.durable = durable
+        self.blocks_reserved = 0
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0             # block is [_next, _end)
+        _block_allocators.add(self)
+
+    def _after_fork(self):
+        """Forget the parent's block (runs in the child after fork)"""
+        self._lock = threading.Lock()
+        self._next = self._end = 0
+        self.blocks_reserved = 0
+
+    def _reserve_block(self):
+        """
+        Take the next block from the counter file
+
+        Returns:
+        --------
+        int : First ID of the block
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, _COUNTER.size)
+            try:
+                data = os.read(fd, _COUNTER.size)
+                first = _COUNTER.unpack(data)[0] if len(data) == _COUNTER.size else 1
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _COUNTER.pack(first + self.block_size))
+                if self.durable:
+                    os.fsync(fd)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, _COUNTER.size)
+        finally:
+            os.close(fd)
+        self.blocks_reserved += 1
+        return first
+
+    def next_id(self):
+        """Return a new ID, reserving a fresh block when this one runs out"""
+        with self._lock:
+            if self._next == self._end:
+                self._next = self._reserve_block()
+                self._end = self._next + self.block_size
+            employee_id = self._next
+            self._next += 1
+            return employee_id
+
+    def high_water_mark(self):
+        """Next ID the counter file would hand out (all processes)"""
+        with open(self.path, "rb") as counter:
+            data = counter.read(_COUNTER.size)
+        return _COUNTER.unpack(data)[0] if len(data) == _COUNTER.size else 1
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+def _onboard(args):
+    """Worker: create employees with the shared allocator, return their IDs"""
+    path, count = args
+    if not isinstance(Employee.id_allocator, BlockIdAllocator):
+        Employee.id_allocator = BlockIdAllocator(path, block_size=500)
+    before = Employee.get_employee_count()
+    ids = [Employee(f"Worker {i}", "Engineer", 80000).employee_id for i in range(count)]
+    return os.getpid(), Employee.get_employee_count() - before, ids
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from multiprocessing import Pool
+
+    print("=" * 50)
+    print("TESTING EMPLOYEE ID ALLOCATORS")
+    print("=" * 50)
+
+    print("\n1. Threads sharing a LocalIdAllocator:")
+    Employee.id_allocator = LocalIdAllocator()
+    before = Employee.get_employee_count()
+    ids = []
+
+    def hire(count):
+        ids.extend(Employee("New Hire", "Analyst", 60000).employee_id for _ in range(count))
+
+    threads = [threading.Thread(target=hire, args=(20_000,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"IDs handed out: {len(ids):,}, unique: {len(set(ids)):,}")
+    print(f"get_employee_count(): {Employee.get_employee_count() - before:,} new")
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "employee_ids.counter")
+
+        print("\n2. Parallel import workers sharing a counter file:")
+        jobs = [(path, 25_000)] * 8
+        start = time.perf_counter()
+        with Pool(4) as pool:
+            results = pool.map(_onboard, jobs)
+        elapsed = time.perf_counter() - start
+        all_ids = [employee_id for _, _, ids in results for employee_id in ids]
+        print(f"IDs handed out: {len(all_ids):,}, unique: {len(set(all_ids)):,}")
+        per_process = {}
+        for pid, count, _ in results:
+            per_process[pid] = per_process.get(pid, 0) + count
+        print(f"Employees counted per worker process: {sorted(per_process.values())}")
+        print(f"Counter file high-water mark: {BlockIdAllocator(path).high_water_mark():,}")
+        print(f"Elapsed: {elapsed:.2f}s")
+
+        print("\n3. Cost per ID:")
+        allocator = BlockIdAllocator(path, block_size=1000)
+        start = time.perf_counter()
+        for _ in range(200_000):
+            allocator.next_id()
+        elapsed = time.perf_counter() - start
+        print(f"{elapsed / 200_000 * 1e6:.2f} µs per ID "
+              f"({allocator.blocks_reserved} trips to the counter file)")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Shared counters need a lock, even in Python")
+    print("2. Reserving IDs in blocks keeps processes from contending")
+    print("3. A file lock coordinates processes that share nothing else")
+    print("4. Let the class take its ID source as a pluggable object")
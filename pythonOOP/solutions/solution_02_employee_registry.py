@@ -0,0 +1,359 @@
+"""
+SOLUTION 2 EXTENSION: Employee Registry
+========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Containers: One object that owns and looks up many Employee objects
+2. Hash indexes: A dict from position to its employees, no scanning
+3. Sorted indexes: bisect finds where a salary range starts in O(log n)
+4. Incremental maintenance: A raise moves one entry instead of re-sorting
+5. Compound indexes: One sorted salary index per position
+
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+from solution_02_class_methods_static import Employee
+
+
+class SalaryIndex:
+    """
+    Employee IDs kept in order of salary
+
+    NOTE: Entries are (salary, employee_id) pairs split into blocks of a
+    few hundred, like a B-tree with one level: an insert or removal only
+    shifts one small list, and the largest entry of every block is kept
+    in a separate list for bisect.
+    """
+
+    BLOCK_SIZE = 512
+
+    def __init__(self, entries=()):
+        """
+        Initialize the index
+
+        Parameters:
+        -----------
+        entries : iterable of (salary, employee_id), optional
+            Initial entries; sorting them once is much faster than
+            adding them one at a time
+        """
+        entries = sorted(entries)
+        size = self.BLOCK_SIZE
+        self._blocks = [entries[i:i + size] for i in range(0, len(entries), size)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(entries)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, salary, employee_id):
+        """Insert an employee under a salary"""
+        entry = (salary, employee_id)
+        self._size += 1
+        if not self._maxes:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            return
+        block = min(bisect_left(self._maxes, entry), len(self._maxes) - 1)
+        entries = self._blocks[block]
+        insort(entries, entry)
+        self._maxes[block] = entries[-1]
+        if len(entries) > 2 * self.BLOCK_SIZE:
+            half = len(entries) // 2
+            self._blocks[block:block + 1] = [entries[:half], entries[half:]]
+            self._maxes[block:block + 1] = [entries[half - 1], entries[-1]]
+
+    def remove(self, salary, employee_id):
+        """
+        Remove an employee stored under a salary
+
+        Raises:
+        -------
+        KeyError : If the employee is not stored under that salary
+        """
+        entry = (salary, employee_id)
+        block = bisect_left(self._maxes, entry)
+        if block < len(self._maxes):
+            entries = self._blocks[block]
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+                self._size -= 1
+                if entries:
+                    self._maxes[block] = entries[-1]
+                else:
+                    del self._blocks[block], self._maxes[block]
+                return
+        raise KeyError(f"{employee_id} is not stored under {salary!r}")
+
+    def range(self, low=None, high=None):
+        """
+        Yield employee IDs with low <= salary <= high, lowest salary first
+
+        NOTE: Two bisects find the first entry; after that every step
+        yields a match, so the cost is O(log n + k) for k results
+        """
+        if low is None:
+            block, position = 0, 0
+        else:
+            start = (low, float("-inf"))
+            block = bisect_left(self._maxes, start)
+            if block == len(self._maxes):
+                return
+            position = bisect_left(self._blocks[block], start)
+        end = (high, float("inf")) if high is not None else None
+        while block < len(self._blocks):
+            entries = self._blocks[block]
+            stop = len(entries) if end is None else bisect_right(entries, end, position)
+            for _, employee_id in entries[position:stop]:
+                yield employee_id
+            if stop < len(entries):
+                return
+            block, position = block + 1, 0
+
+
+class EmployeeRegistry:
+    """
+    All employees by ID, with indexes on position and salary
+
+    The registry keeps:
+    - a dict of employee_id -> Employee
+    - a SalaryIndex over everyone, for salary range queries
+    - a SalaryIndex per position, which is both the position index and
+      the index for "position X earning between A and B"
+
+    NOTE: Change salaries through the registry (give_raise, set_salary)
+    so the indexes follow. After changing an Employee directly, call
+    reindex(employee).
+    """
+
+    def __init__(self, employees=()):
+        """
+        Initialize an EmployeeRegistry
+
+        Parameters:
+        -----------
+        employees : iterable of Employee, optional
+            Employees to register straight away
+        """
+        self._employees = {}
+        self._indexed = {}             # employee_id -> (position, salary) as indexed
+        self._listeners = []
+        groups = {}
+        for employee in employees:
+            if employee.employee_id in self._employees:
+                raise ValueError(f"Duplicate employee id: {employee.employee_id}")
+            self._employees[employee.employee_id] = employee
+            self._indexed[employee.employee_id] = (employee.position, employee.salary)
+            groups.setdefault(employee.position, []).append(
+                (employee.salary, employee.employee_id))
+        self._salaries = SalaryIndex(entry for group in groups.values() for entry in group)
+        self._positions = {position: SalaryIndex(group) for position, group in groups.items()}
+
+    def add_listener(self, listener):
+        """
+        Register an object to be told about changes to the registry
+
+        NOTE: The listener needs employee_added(employee_id, position,
+        salary) and employee_removed(employee_id, position, salary,
+        leaving) methods. A raise or a new position is reported as a
+        removal (with the old values and leaving=False) followed by an
+        addition; remove() reports leaving=True.
+        """
+        self._listeners.append(listener)
+
+    def _index(self, employee):
+        """Add an employee to the indexes"""
+        employee_id, position, salary = employee.employee_id, employee.position, employee.salary
+        self._indexed[employee_id] = (position, salary)
+        self._salaries.add(salary, employee_id)
+        index = self._positions.get(position)
+        if index is None:
+            index = self._positions[position] = SalaryIndex()
+        index.add(salary, employee_id)
+        for listener in self._listeners:
+            listener.employee_added(employee_id, position, salary)
+
+    def _unindex(self, employee_id, leaving=False):
+        """Remove an employee from the indexes, using the values it was indexed under"""
+        position, salary = self._indexed.pop(employee_id)
+        self._salaries.remove(salary, employee_id)
+        index = self._positions[position]
+        index.remove(salary, employee_id)
+        if not index:
+            del self._positions[position]
+        for listener in self._listeners:
+            listener.employee_removed(employee_id, position, salary, leaving)
+
+    # ---- membership -------------------------------------------------------
+
+    def add(self, employee):
+        """Register an employee"""
+        if employee.employee_id in self._employees:
+            raise ValueError(f"Duplicate employee id: {employee.employee_id}")
+        self._employees[employee.employee_id] = employee
+        self._index(employee)
+
+    def remove(self, employee_id):
+        """
+        Unregister an employee
+
+        Returns:
+        --------
+        Employee : The employee that was removed
+        """
+        employee = self._employees.pop(employee_id)
+        self._unindex(employee_id, leaving=True)
+        return employee
+
+    def __len__(self):
+        return len(self._employees)
+
+    def __contains__(self, employee_id):
+        return employee_id in self._employees
+
+    def __getitem__(self, employee_id):
+        return self._employees[employee_id]
+
+    def __iter__(self):
+        return iter(self._employees.values())
+
+    # ---- changes ------------------------------------------------------------
+
+    def give_raise(self, employee_id, percentage):
+        """Call give_raise on an employee and move it in the salary indexes"""
+        employee = self._employees[employee_id]
+        employee.give_raise(percentage)
+        self.reindex(employee)
+
+    def set_salary(self, employee_id, salary):
+        """Set an employee's salary and move it in the salary indexes"""
+        employee = self._employees[employee_id]
+        # Through the employee, so subclasses such as TenantEmployee use their own bounds
+        if not employee.accepts_salary(salary):
+            raise ValueError(f"Invalid salary: {salary}")
+        employee.salary = salary
+        self.reindex(employee)
+
+    def reindex(self, employee):
+        """Update the indexes after an employee's position or salary changed"""
+        if self._indexed[employee.employee_id] != (employee.position, employee.salary):
+            self._unindex(employee.employee_id)
+            self._index(employee)
+
+    # ---- queries --------------------------------------------------------------
+
+    def positions(self):
+        """Return the positions that have employees"""
+        return list(self._positions)
+
+    def by_position(self, position):
+        """List the employees in a position, lowest salary first"""
+        return self.find(position=position)
+
+    def salary_range(self, low=None, high=None):
+        """List the employees with low <= salary <= high, lowest first"""
+        return self.find(low=low, high=high)
+
+    def find(self, position=None, low=None, high=None):
+        """
+        Employees matching every given condition
+
+        Parameters:
+        -----------
+        position : str, optional
+            Only this position
+        low, high : float, optional
+            Salary bounds (inclusive)
+
+        Returns:
+        --------
+        list : Matching employees, lowest salary first
+        """
+        if position is None:
+            index = self._salaries
+        else:
+            index = self._positions.get(position)
+            if index is None:
+                return []
+        employees = self._employees
+        return [employees[employee_id] for employee_id in index.range(low, high)]
+
+    def count(self, position=None):
+        """Number of employees (in a position, if given)"""
+        if position is None:
+            return len(self._employees)
+        index = self._positions.get(position)
+        return len(index) if index is not None else 0
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("=" * 50)
+    print("TESTING EMPLOYEE REGISTRY")
+    print("=" * 50)
+
+    registry = EmployeeRegistry([
+        Employee("Alice Johnson", "Software Engineer", 85000),
+        Employee("Bob Smith", "Data Scientist", 95000),
+        Employee("Carol White", "Product Manager", 105000),
+        Employee("David Brown", "Software Engineer", 125000),
+    ])
+    alice = next(e for e in registry if e.name == "Alice Johnson")
+
+    print("\n1. Queries:")
+    print(f"Software Engineers: {[e.name for e in registry.by_position('Software Engineer')]}")
+    print(f"Earning 90k-110k: {[e.name for e in registry.salary_range(90000, 110000)]}")
+
+    print("\n2. A raise moves Alice in the salary index:")
+    registry.give_raise(alice.employee_id, 20)
+    print(f"Software Engineers earning 80k-120k: "
+          f"{[e.name for e in registry.find('Software Engineer', 80000, 120000)]}")
+
+    count = 300_000
+    print(f"\n3. {count:,} employees:")
+    positions = [f"Position {i}" for i in range(50)]
+    staff = [Employee(f"Employee {i}", random.choice(positions),
+                      round(random.uniform(30000, 250000), 2)) for i in range(count)]
+    start = time.perf_counter()
+    big = EmployeeRegistry(staff)
+    print(f"Bulk registered in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for employee in staff[:10_000]:
+        big.remove(employee.employee_id)
+        big.add(employee)
+    print(f"remove + add: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} µs each")
+
+    start = time.perf_counter()
+    matches = big.find("Position 7", 80000, 81000)
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    scanned = [e for e in big if e.position == "Position 7" and 80000 <= e.salary <= 81000]
+    scan = time.perf_counter() - start
+    assert {e.employee_id for e in matches} == {e.employee_id for e in scanned}
+    print(f"Compound query: {len(matches)} matches in {indexed * 1e6:.0f} µs "
+          f"(full scan: {scan * 1000:.1f} ms)")
+
+    ids = [employee.employee_id for employee in random.sample(staff, 10_000)]
+    start = time.perf_counter()
+    for employee_id in ids:
+        employee = big[employee_id]
+        big.set_salary(employee_id, min(employee.salary * 1.03, Employee.get_salary_bounds()[1]))
+    print(f"set_salary: {(time.perf_counter() - start) / len(ids) * 1e6:.1f} µs each")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. A container class is the natural home for indexes")
+    print("2. Hash indexes answer 'equals' queries, sorted indexes answer ranges")
+    print("3. Keep indexes up to date with small incremental moves")
+    print("4. An index per group turns compound queries into range scans")
@@ -0,0 +1,309 @@
+"""
+SOLUTION 2 EXTENSION: Vectorized Payroll
+=========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Columns instead of objects: One array per field for every employee
+2. Masks: Select the rows a rule applies to with a boolean array
+3. Vectorized updates: One NumPy expression raises millions of salaries
+4. Validate in the same pass: Reject raises that leave the valid range
+5. Graceful fallback: Plain Python loops when NumPy is not installed
+
+"""
+
+from array import array
+
+from solution_02_class_methods_static import Employee
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class RaiseResult:
+    """Outcome of a bulk raise: how many salaries changed and which were refused"""
+
+    def __init__(self, raised, rejected):
+        """
+        Initialize a RaiseResult
+
+        Parameters:
+        -----------
+        raised : int
+            Number of salaries that were increased
+        rejected : list of int
+            Employee IDs whose new salary would not be valid (left unchanged)
+        """
+        self.raised = raised
+        self.rejected = rejected
+
+    def __repr__(self):
+        return f"RaiseResult(raised={self.raised:,}, rejected={len(self.rejected):,})"
+
+
+class PayrollTable:
+    """
+    Salaries, positions and IDs of many employees in parallel arrays
+
+    Row i of every column describes the same employee. Positions are
+    stored as small integer codes with one copy of each position name,
+    so "everyone in position X" is a comparison of integers. Bulk raises
+    build a mask of affected rows, compute the new salaries and check
+    them against Employee's valid range all at once; rows whose new
+    salary would be invalid keep their old salary and are reported.
+    """
+
+    def __init__(self, use_numpy=None):
+        """
+        Initialize an empty PayrollTable
+
+        Parameters:
+        -----------
+        use_numpy : bool, optional
+            Force NumPy on or off (default: use it if it is installed)
+        """
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._ids = array("q")
+        self._position_codes = array("I")
+        self._salaries = array("d")
+        self._names = []
+        self._positions = []          # code -> position name
+        self._position_lookup = {}    # position name -> code
+        self._row_of = {}             # employee id -> row
+
+    @classmethod
+    def from_employees(cls, employees, use_numpy=None):
+        """Build a table from Employee objects"""
+        table = cls(use_numpy)
+        for employee in employees:
+            table.add(employee.employee_id, employee.name, employee.position, employee.salary)
+        return table
+
+    def _position_code(self, position):
+        """Return the code for a position name, adding it if new"""
+        code = self._position_lookup.get(position)
+        if code is None:
+            code = len(self._positions)
+            self._positions.append(position)
+            self._position_lookup[position] = code
+        return code
+
+    def add(self, employee_id, name, position, salary):
+        """
+        Add an employee row
+
+        Parameters:
+        -----------
+        employee_id : int
+            Unique employee ID
+        name : str
+            Employee's name
+        position : str
+            Job position
+        salary : float
+            Annual salary
+        """
+        if employee_id in self._row_of:
+            raise ValueError(f"Duplicate employee id: {employee_id}")
+        self._row_of[employee_id] = len(self._ids)
+        self._ids.append(employee_id)
+        self._names.append(name)
+        self._position_codes.append(self._position_code(position))
+        self._salaries.append(salary)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def salary(self, employee_id):
+        """Current salary of an employee"""
+        return self._salaries[self._row_of[employee_id]]
+
+    def position(self, employee_id):
+        """Position of an employee"""
+        return self._positions[self._position_codes[self._row_of[employee_id]]]
+
+    def total_payroll(self):
+        """Sum of all salaries"""
+        if self.use_numpy:
+            return float(np.frombuffer(self._salaries, dtype=np.float64).sum())
+        return sum(self._salaries)
+
+    def to_employee(self, employee_id):
+        """
+        Create an Employee object for one row
+
+        NOTE: The object gets the row's ID; it is a copy, so raising its
+        salary does not change the table
+        """
+        row = self._row_of[employee_id]
+        employee = Employee.__new__(Employee)
+        employee.name = self._names[row]
+        employee.position = self._positions[self._position_codes[row]]
+        employee.salary = self._salaries[row]
+        employee.employee_id = employee_id
+        return employee
+
+    # ---- bulk raises --------------------------------------------------------
+
+    def raise_position(self, position, percentage):
+        """
+        Raise the salary of everyone in a position
+
+        Returns:
+        --------
+        RaiseResult : How many were raised and who was refused
+        """
+        code = self._position_lookup.get(position)
+        if code is None:
+            return RaiseResult(0, [])
+        if self.use_numpy:
+            codes = np.frombuffer(self._position_codes, dtype=np.uint32)
+            return self._apply(codes == code, percentage)
+        rows = [row for row, c in enumerate(self._position_codes) if c == code]
+        return self._apply_rows(rows, percentage)
+
+    def raise_band(self, low, high, percentage):
+        """
+        Raise every salary in the band low <= salary < high
+
+        Returns:
+        --------
+        RaiseResult : How many were raised and who was refused
+        """
+        if self.use_numpy:
+            salaries = np.frombuffer(self._salaries, dtype=np.float64)
+            return self._apply((salaries >= low) & (salaries < high), percentage)
+        rows = [row for row, s in enumerate(self._salaries) if low <= s < high]
+        return self._apply_rows(rows, percentage)
+
+    def raise_each(self, percentages):
+        """
+        Give every employee their own raise
+
+        Parameters:
+        -----------
+        percentages : sequence of float
+            One percentage per row, in the order employees were added
+            (0 leaves a salary unchanged)
+
+        Returns:
+        --------
+        RaiseResult : How many were raised and who was refused
+        """
+        if len(percentages) != len(self):
+            raise ValueError(f"Expected {len(self)} percentages, got {len(percentages)}")
+        if self.use_numpy:
+            percentages = np.asarray(percentages, dtype=np.float64)
+            return self._apply(percentages != 0, percentages)
+        rows = [row for row, p in enumerate(percentages) if p]
+        return self._apply_rows(rows, percentages, per_row=True)
+
+    def _apply(self, mask, percentage):
+        """
+        Vectorized raise of the rows in mask
+
+        NOTE: New salaries are computed for every row, then only copied
+        back where the row is selected and the result passes validation.
+        That is one pass over the columns with no Python-level loop.
+        """
+        if np.any(np.asarray(percentage) < 0):
+            raise ValueError("Percentage cannot be negative")
+        salaries = np.frombuffer(self._salaries, dtype=np.float64)
+        raised = salaries * (1 + np.asarray(percentage) / 100)
+        low, high = Employee.get_salary_bounds()
+        valid = (raised >= low) & (raised <= high)
+        accepted = mask & valid
+        np.copyto(salaries, raised, where=accepted)
+        rejected = np.frombuffer(self._ids, dtype=np.int64)[mask & ~valid]
+        return RaiseResult(int(np.count_nonzero(accepted)), rejected.tolist())
+
+    def _apply_rows(self, rows, percentage, per_row=False):
+        """Pure-Python raise of the given rows"""
+        if (min(percentage, default=0) if per_row else percentage) < 0:
+            raise ValueError("Percentage cannot be negative")
+        salaries, ids = self._salaries, self._ids
+        raised, rejected = 0, []
+        for row in rows:
+            new_salary = salaries[row] * (1 + (percentage[row] if per_row else percentage) / 100)
+            if Employee.is_valid_company_salary(new_salary):
+                salaries[row] = new_salary
+                raised += 1
+            else:
+                rejected.append(ids[row])
+        return RaiseResult(raised, rejected)
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING PAYROLL TABLE")
+    print("=" * 50)
+    print(f"NumPy available: {np is not None}")
+
+    staff = [Employee("Alice Johnson", "Software Engineer", 85000),
+             Employee("Bob Smith", "Data Scientist", 95000),
+             Employee("Carol White", "Product Manager", 105000),
+             Employee("Dana Green", "Software Engineer", 495000)]
+    table = PayrollTable.from_employees(staff)
+
+    print("\n1. Raise by position:")
+    result = table.raise_position("Software Engineer", 5)
+    print(result)
+    print(f"Refused (would exceed ${Employee.get_salary_bounds()[1]:,}): {result.rejected}")
+    print(f"Alice now earns ${table.salary(staff[0].employee_id):,.2f}")
+
+    print("\n2. Raise by salary band:")
+    print(table.raise_band(90000, 100000, 10))
+    table.to_employee(staff[1].employee_id).display_info()
+
+    print("\n3. Per-employee percentages:")
+    print(table.raise_each([0, 0, 2.5, 0]))
+    print(f"Total payroll: ${table.total_payroll():,.2f}")
+
+    # Size comes from the command line (default 2,000,000 employees)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"\n4. Annual cycle for {count:,} employees:")
+    positions = ["Engineer", "Analyst", "Manager", "Designer", "Support"]
+    people = [Employee(f"Employee {i}", random.choice(positions), random.uniform(25000, 300000))
+              for i in range(count)]
+    tables = [("Pure Python table:", PayrollTable.from_employees(people, use_numpy=False))]
+    if np is not None:
+        tables.append(("NumPy table:", PayrollTable.from_employees(people, use_numpy=True)))
+
+    start = time.perf_counter()
+    for employee in people:   # the object-by-object way, without the prints
+        if employee.position == "Engineer":
+            new_salary = employee.salary * 1.04
+            if Employee.is_valid_company_salary(new_salary):
+                employee.salary = new_salary
+        if 50000 <= employee.salary < 80000:
+            new_salary = employee.salary * 1.06
+            if Employee.is_valid_company_salary(new_salary):
+                employee.salary = new_salary
+    print(f"{'Loop over Employees:':20} {time.perf_counter() - start:8.3f}s")
+
+    for label, payroll in tables:
+        start = time.perf_counter()
+        payroll.raise_position("Engineer", 4)
+        payroll.raise_band(50000, 80000, 6)
+        print(f"{label:20} {time.perf_counter() - start:8.3f}s")
+        assert abs(payroll.total_payroll() - sum(e.salary for e in people)) < 1e-3 * count
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Store many records as columns to work on them all at once")
+    print("2. Boolean masks express 'which rows' without a loop")
+    print("3. Validate the whole batch in the same pass as the update")
+    print("4. Keep the per-object API for one-off changes")
@@ -0,0 +1,234 @@
+"""
+SOLUTION 2 EXTENSION: Running Payroll Totals
+=============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Maintain, don't recompute: Update totals on every change, read them free
+2. Observer pattern: The registry tells the totals about each change
+3. Exact sums: Money is added up in integer cents, so totals never drift
+4. Lazy heaps: Stale min/max entries are thrown away only when they surface
+5. Group totals: A count and a sum per position give every average
+
+"""
+
+import heapq
+
+from solution_02_class_methods_static import Employee
+from solution_02_employee_registry import EmployeeRegistry
+
+
+def _cents(salary):
+    """Salary as a whole number of cents"""
+    return round(salary * 100)
+
+
+class PayrollAggregates:
+    """
+    Headcount, payroll total, min/max and per-position totals of a registry
+
+    Every hire, raise and termination updates the totals in O(1) (plus
+    O(log n) for a heap push), so reading them is free. Sums are kept in
+    integer cents: adding and removing floats millions of times would
+    slowly drift, integers never do.
+
+    NOTE: Salaries are stored as given, and give_raise leaves fractions
+    of a cent, so each salary is rounded to the cent as it is counted.
+    Totals and averages are sums of those rounded salaries, which may
+    differ from sum(salaries) by up to half a cent per employee.
+
+    NOTE: The min and max heaps are never searched for a removed salary.
+    A dict remembers each employee's current salary; heap entries that
+    don't match it are stale and are popped when they reach the top.
+    """
+
+    def __init__(self, registry):
+        """
+        Start tracking a registry (including the employees already in it)
+
+        Parameters:
+        -----------
+        registry : EmployeeRegistry
+            The registry to follow
+        """
+        self._salary_of = {}       # employee_id -> current salary
+        self._total_cents = 0
+        self._positions = {}       # position -> [count, total cents]
+        for employee_id, (position, salary) in registry._indexed.items():
+            self._salary_of[employee_id] = salary
+            self._total_cents += _cents(salary)
+            group = self._positions.setdefault(position, [0, 0])
+            group[0] += 1
+            group[1] += _cents(salary)
+        self._min_heap = [(salary, employee_id) for employee_id, salary in self._salary_of.items()]
+        self._max_heap = [(-salary, employee_id) for salary, employee_id in self._min_heap]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+        registry.add_listener(self)
+
+    # ---- listener interface -------------------------------------------------
+
+    def employee_added(self, employee_id, position, salary):
+        """Count a hire (or the new half of a change)"""
+        self._salary_of[employee_id] = salary
+        cents = _cents(salary)
+        self._total_cents += cents
+        group = self._positions.get(position)
+        if group is None:
+            self._positions[position] = [1, cents]
+        else:
+            group[0] += 1
+            group[1] += cents
+        heapq.heappush(self._min_heap, (salary, employee_id))
+        heapq.heappush(self._max_heap, (-salary, employee_id))
+        if len(self._min_heap) > 2 * len(self._salary_of) + 64:
+            self._compact()
+
+    def employee_removed(self, employee_id, position, salary, leaving):
+        """
+        Uncount a termination (or the old half of a change)
+
+        NOTE: Both cases are handled the same way, so `leaving` is not used
+        """
+        del self._salary_of[employee_id]
+        cents = _cents(salary)
+        self._total_cents -= cents
+        group = self._positions[position]
+        if group[0] == 1:
+            del self._positions[position]
+        else:
+            group[0] -= 1
+            group[1] -= cents
+
+    # ---- heaps ----------------------------------------------------------------
+
+    def _compact(self):
+        """Rebuild both heaps from the current salaries only"""
+        self._min_heap = [(salary, employee_id) for employee_id, salary in self._salary_of.items()]
+        self._max_heap = [(-salary, employee_id) for salary, employee_id in self._min_heap]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+
+    def _top(self, heap, sign):
+        """Pop stale entries off a heap and return the current top salary"""
+        salary_of = self._salary_of
+        while heap:
+            key, employee_id = heap[0]
+            if salary_of.get(employee_id) == sign * key:
+                return sign * key
+            heapq.heappop(heap)
+        return None
+
+    # ---- queries --------------------------------------------------------------
+
+    @property
+    def headcount(self):
+        """Number of employees"""
+        return len(self._salary_of)
+
+    @property
+    def total(self):
+        """Sum of all salaries, each rounded to the cent"""
+        return self._total_cents / 100
+
+    def average(self):
+        """Mean salary, or None with no employees"""
+        return self._total_cents / len(self._salary_of) / 100 if self._salary_of else None
+
+    def min_salary(self):
+        """Lowest salary, or None with no employees (amortized O(log n))"""
+        return self._top(self._min_heap, 1)
+
+    def max_salary(self):
+        """Highest salary, or None with no employees (amortized O(log n))"""
+        return self._top(self._max_heap, -1)
+
+    def position_total(self, position):
+        """Sum of salaries in a position"""
+        group = self._positions.get(position)
+        return group[1] / 100 if group else 0.0
+
+    def position_average(self, position):
+        """Mean salary in a position, or None if nobody holds it"""
+        group = self._positions.get(position)
+        return group[1] / group[0] / 100 if group else None
+
+    def by_position(self):
+        """Return a dict of position -> (headcount, total, average)"""
+        return {position: (count, cents / 100, cents / count / 100)
+                for position, (count, cents) in self._positions.items()}
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("=" * 50)
+    print("TESTING PAYROLL AGGREGATES")
+    print("=" * 50)
+
+    registry = EmployeeRegistry([
+        Employee("Alice Johnson", "Software Engineer", 85000),
+        Employee("Bob Smith", "Data Scientist", 95000),
+        Employee("Carol White", "Product Manager", 105000),
+    ])
+    totals = PayrollAggregates(registry)
+
+    def show():
+        print(f"Headcount {totals.headcount}, total ${totals.total:,.2f}, "
+              f"min ${totals.min_salary():,.2f}, max ${totals.max_salary():,.2f}")
+
+    print("\n1. Starting totals:")
+    show()
+
+    print("\n2. Hire, raise and terminate:")
+    dave = Employee("David Brown", "Software Engineer", 125000)
+    registry.add(dave)
+    registry.give_raise(dave.employee_id, 10)
+    registry.remove(next(e for e in registry if e.name == "Carol White").employee_id)
+    show()
+    for position, (count, total, average) in totals.by_position().items():
+        print(f"{position}: {count} people, ${total:,.2f} total, ${average:,.2f} average")
+
+    count = 200_000
+    print(f"\n3. {count:,} employees under constant change:")
+    positions = [f"Position {i}" for i in range(20)]
+    staff = [Employee(f"Employee {i}", random.choice(positions),
+                      round(random.uniform(30000, 250000), 2)) for i in range(count)]
+    big = EmployeeRegistry(staff)
+    big_totals = PayrollAggregates(big)
+    ids = [employee.employee_id for employee in staff]
+
+    start = time.perf_counter()
+    for employee_id in random.sample(ids, 20_000):
+        employee = big[employee_id]
+        big.set_salary(employee_id, round(min(employee.salary * 1.05, 500000), 2))
+    print(f"set_salary with aggregates: {(time.perf_counter() - start) / 20_000 * 1e6:.1f} µs each")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        big_totals.total, big_totals.average(), big_totals.min_salary(), big_totals.max_salary()
+        big_totals.position_average("Position 3")
+    polled = time.perf_counter() - start
+    print(f"Dashboard poll: {polled / 10_000 * 1e6:.2f} µs "
+          f"({10_000 / polled:,.0f} polls per second)")
+
+    start = time.perf_counter()
+    exact = sum(employee.salary for employee in big)
+    print(f"Re-summing instead: {(time.perf_counter() - start) * 1000:.1f} ms per poll")
+    # Each salary is counted to the nearest cent
+    assert abs(big_totals.total - exact) <= 0.005 * len(big)
+    assert big_totals.total == sum(_cents(employee.salary) for employee in big) / 100
+    assert big_totals.max_salary() == max(employee.salary for employee in big)
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Update aggregates on write so reads cost nothing")
+    print("2. Keep money in integer cents when you add and subtract a lot")
+    print("3. Lazy deletion turns heap removals into cheap skips")
+    print("4. Listeners keep the registry unaware of who is watching")
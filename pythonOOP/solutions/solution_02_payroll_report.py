@@ -0,0 +1,278 @@
+"""
+SOLUTION 2 EXTENSION: Streaming Payroll Reports
+================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Generators: Employees flow through the report one at a time
+2. Chunked writes: Render thousands of rows, then write them in one call
+3. Pluggable formats: CSV, JSON Lines and fixed-width share one pipeline
+4. Transparent compression: gzip output is just a different file object
+5. Instrumentation: Count rows, bytes and throughput while writing
+
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from solution_02_class_methods_static import Employee
+from solution_02_payroll import PayrollTable
+
+
+FIELDS = ("employee_id", "company", "name", "position", "salary")
+
+# (field, width, alignment) for the fixed-width format
+FIXED_COLUMNS = (("employee_id", 11, ">"), ("company", 20, "<"), ("name", 28, "<"),
+                 ("position", 24, "<"), ("salary", 14, ">"))
+
+CHUNK_ROWS = 10_000
+BUFFER_SIZE = 1 << 20
+
+
+class ReportStats:
+    """Counters collected while writing a report"""
+
+    def __init__(self):
+        """Initialize all counters to zero"""
+        self.rows = 0
+        self.chunks = 0
+        self.bytes_written = 0      # before compression
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        """Seconds spent writing so far"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def rows_per_second(self):
+        """Rows written per second"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.rows:,} rows, {self.bytes_written / 1e6:,.1f} MB in "
+                f"{self.chunks:,} chunks, {self.elapsed:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/sec)")
+
+
+def detect_format(path):
+    """Return 'csv', 'jsonl' or 'fixed' based on the file name"""
+    name = os.fsdecode(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".txt", ".dat")):
+        return "fixed"
+    raise ValueError(f"Cannot tell the format of {path}; pass fmt='csv', 'jsonl' or 'fixed'")
+
+
+def iter_rows(source):
+    """
+    Yield (employee_id, company, name, position, salary) tuples
+
+    Parameters:
+    -----------
+    source : iterable of Employee, or PayrollTable
+        Employee objects are read one at a time; a PayrollTable is read
+        column by column without creating Employee objects
+    """
+    if isinstance(source, PayrollTable):
+        company = Employee.company_name
+        positions = source._positions
+        for employee_id, name, code, salary in zip(source._ids, source._names,
+                                                   source._position_codes, source._salaries):
+            yield employee_id, company, name, positions[code], salary
+        return
+    for employee in source:
+        yield (employee.employee_id, employee.company_name, employee.name,
+               employee.position, employee.salary)
+
+
+def chunked(rows, size):
+    """Yield lists of up to size rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_header(fmt):
+    """Return the text that starts a report ('' if the format has none)"""
+    if fmt == "csv":
+        return ",".join(FIELDS) + "\n"
+    if fmt == "fixed":
+        line = " ".join(f"{name:{align}{width}}" for name, width, align in FIXED_COLUMNS)
+        return line + "\n" + "-" * len(line) + "\n"
+    return ""
+
+
+def render_chunk(fmt, chunk):
+    """
+    Render a list of rows as one string
+
+    NOTE: Building one string per chunk means one write call per chunk
+    instead of one per row
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(
+            (employee_id, company, name, position, f"{salary:.2f}")
+            for employee_id, company, name, position, salary in chunk)
+        return buffer.getvalue()
+    if fmt == "jsonl":
+        dumps = json.dumps
+        return "".join(
+            dumps({"employee_id": employee_id, "company": company, "name": name,
+                   "position": position, "salary": round(salary, 2)}) + "\n"
+            for employee_id, company, name, position, salary in chunk)
+    if fmt == "fixed":
+        return "".join(
+            f"{employee_id:>11} {company[:20]:<20} {name[:28]:<28} "
+            f"{position[:24]:<24} {salary:>14,.2f}\n"
+            for employee_id, company, name, position, salary in chunk)
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def open_output(path, compress):
+    """Open a binary output file with a large buffer, gzip-compressed if asked"""
+    if compress:
+        return gzip.open(path, "wb", compresslevel=6)
+    return open(path, "wb", buffering=BUFFER_SIZE)
+
+
+def write_report(source, target, fmt=None, compress=None, chunk_rows=CHUNK_ROWS,
+                 progress=None):
+    """
+    Stream a payroll report to a file
+
+    Parameters:
+    -----------
+    source : iterable of Employee, or PayrollTable
+        Employees to report on (a generator is fine)
+    target : str or binary file object
+        Output path, or an open binary stream such as sys.stdout.buffer
+    fmt : str, optional
+        'csv', 'jsonl' or 'fixed' (default: from the file name)
+    compress : bool, optional
+        gzip the output (default: True if the path ends with .gz)
+    chunk_rows : int, optional
+        Rows rendered per write (default 10,000)
+    progress : callable, optional
+        Called with the ReportStats after every chunk
+
+    Returns:
+    --------
+    ReportStats : Rows, bytes and throughput
+
+    NOTE: Memory use depends on chunk_rows, not on the number of employees
+    """
+    is_path = isinstance(target, (str, bytes)) or hasattr(target, "__fspath__")
+    if fmt is None:
+        if not is_path:
+            raise ValueError("fmt is required when writing to a stream")
+        fmt = detect_format(target)
+    if compress is None:
+        compress = is_path and os.fsdecode(target).lower().endswith(".gz")
+    if is_path:
+        stream = open_output(target, compress)
+    else:
+        stream = gzip.GzipFile(fileobj=target, mode="wb") if compress else target
+
+    stats = ReportStats()
+    try:
+        header = render_header(fmt).encode("utf-8")
+        stream.write(header)
+        stats.bytes_written += len(header)
+        for chunk in chunked(iter_rows(source), chunk_rows):
+            data = render_chunk(fmt, chunk).encode("utf-8")
+            stream.write(data)
+            stats.rows += len(chunk)
+            stats.chunks += 1
+            stats.bytes_written += len(data)
+            if progress is not None:
+                progress(stats)
+    finally:
+        if is_path or compress:
+            stream.close()
+    stats.finished = time.perf_counter()
+    return stats
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import tempfile
+    import tracemalloc
+
+    print("=" * 50)
+    print("TESTING PAYROLL REPORTS")
+    print("=" * 50)
+
+    staff = [Employee("Alice Johnson", "Software Engineer", 85000),
+             Employee("Bob Smith", "Data Scientist", 95000),
+             Employee('Carol "CJ" White', "Product Manager, EMEA", 105000)]
+
+    for number, fmt in enumerate(("csv", "jsonl", "fixed"), 1):
+        print(f"\n{number}. {fmt} report:")
+        sys.stdout.flush()
+        write_report(staff, sys.stdout.buffer, fmt=fmt)
+        sys.stdout.buffer.flush()
+
+    # Size comes from the command line (default 2,000,000 employees)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"\n4. Streaming {count:,} employees from a generator:")
+    positions = ["Engineer", "Analyst", "Manager", "Designer", "Support"]
+
+    def generate(count):
+        for i in range(count):
+            yield Employee(f"Employee {i}", positions[i % 5], 30000 + (i * 7919) % 200000)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ("payroll.csv", "payroll.jsonl", "payroll.txt", "payroll.csv.gz"):
+            path = os.path.join(folder, name)
+            stats = write_report(generate(count), path)
+            print(f"{name:15} {stats}, file {os.path.getsize(path) / 1e6:,.1f} MB")
+        # bytes paths pick the format and compression the same way
+        path = os.fsencode(os.path.join(folder, "bytes.csv.gz"))
+        write_report(generate(10), path)
+        with gzip.open(path, "rt") as stream:
+            print(f"bytes path: {len(stream.readlines()) - 1} rows, gzip-compressed")
+
+        print("\n5. Peak memory does not grow with headcount:")
+        for size in (count // 100, count // 10):
+            tracemalloc.start()
+            write_report(generate(size), os.path.join(folder, "sample.csv"))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>10,} employees: peak {peak / 1e6:.1f} MB")
+
+        print("\n6. Straight from a PayrollTable (no Employee objects):")
+        table = PayrollTable()
+        for i in range(count):
+            table.add(i, f"Employee {i}", random.choice(positions), random.uniform(30000, 230000))
+        stats = write_report(table, os.path.join(folder, "table.csv"))
+        print(f"{'table.csv':15} {stats}")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Generators keep memory flat no matter how many rows there are")
+    print("2. Write in big chunks; per-row writes and prints are slow")
+    print("3. Compression is just another file object in the pipeline")
+    print("4. Measure rows/sec so regressions are easy to spot")
@@ -0,0 +1,323 @@
+"""
+SOLUTION 2 EXTENSION: Salary History
+=====================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Append-only logs: Changes are added at the end and never rewritten
+2. Packed records: struct stores each change in 32 bytes, no objects
+3. Spilling to disk: Older records move to a file that is memory-mapped
+4. Per-key indexes: Each employee's record numbers and times in arrays
+5. Point-in-time lookups: bisect finds "the salary at time T"
+
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_right
+
+from solution_02_class_methods_static import Employee
+from solution_02_employee_registry import EmployeeRegistry
+
+
+# employee_id, timestamp, old salary, new salary
+# (NaN old salary = hire, NaN new salary = left the company)
+RECORD = struct.Struct("<qddd")
+
+
+class SalaryHistory:
+    """
+    Append-only log of salary changes
+
+    Records are packed into a bytearray. With a path, full batches of
+    `spill_records` are appended to the file and read back through
+    mmap, so memory holds only the newest batch. For every employee
+    the log keeps two arrays, the record numbers and the timestamps of
+    their changes, which is all salary_at() needs to bisect.
+
+    The log can follow an EmployeeRegistry: raises, set_salary, hires
+    and removals are recorded automatically.
+
+    NOTE: An employee's changes must be recorded in time order
+    """
+
+    def __init__(self, path=None, spill_records=1_000_000, clock=time.time):
+        """
+        Initialize a SalaryHistory
+
+        Parameters:
+        -----------
+        path : str, optional
+            File to spill records to; an existing log is reopened and
+            appended to (default: keep everything in memory)
+        spill_records : int, optional
+            Records kept in memory before spilling (default 1,000,000)
+        clock : callable, optional
+            Returns the current time in seconds (default time.time)
+        """
+        self.path = path
+        self.spill_records = spill_records
+        self._clock = clock
+        self._buffer = bytearray()
+        self._spilled = 0           # records in the file
+        self._file = None
+        self._map = None
+        self._record_numbers = {}   # employee_id -> array of record numbers
+        self._times = {}            # employee_id -> array of timestamps
+        self._pending = {}          # employee_id -> salary before a registry change
+        if path is not None:
+            self._file = open(path, "a+b")
+            size = os.path.getsize(path)
+            if size % RECORD.size:
+                self._file.close()
+                raise ValueError(f"{path}: not a salary log (size {size})")
+            self._spilled = size // RECORD.size
+            self._remap()
+            self._rebuild_index()
+
+    def _remap(self):
+        """Map the spill file again after it has grown"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._spilled:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _rebuild_index(self):
+        """
+        Rebuild the per-employee arrays from the records in the file
+
+        NOTE: The records were checked for time order when they were
+        written, so they are appended here without checking again
+        """
+        times, numbers = self._times, self._record_numbers
+        for number, (employee_id, timestamp, _, _) in enumerate(RECORD.iter_unpack(self._map or b"")):
+            employee_times = times.get(employee_id)
+            if employee_times is None:
+                times[employee_id] = array("d", [timestamp])
+                numbers[employee_id] = array("Q", [number])
+            else:
+                employee_times.append(timestamp)
+                numbers[employee_id].append(number)
+
+    def _index(self, employee_id, timestamp, number):
+        """Add a record to its employee's arrays"""
+        times = self._times.get(employee_id)
+        if times is None:
+            self._times[employee_id] = array("d", [timestamp])
+            self._record_numbers[employee_id] = array("Q", [number])
+            return
+        if timestamp < times[-1]:
+            raise ValueError(f"Change for employee {employee_id} is older than the last one")
+        times.append(timestamp)
+        self._record_numbers[employee_id].append(number)
+
+    def _spill(self):
+        """Append the in-memory records to the file and map it again"""
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._spilled += len(self._buffer) // RECORD.size
+        self._buffer = bytearray()
+        self._remap()
+
+    def _record(self, number):
+        """Unpack record number `number` from the file or the buffer"""
+        if number < self._spilled:
+            return RECORD.unpack_from(self._map, number * RECORD.size)
+        return RECORD.unpack_from(self._buffer, (number - self._spilled) * RECORD.size)
+
+    # ---- writing --------------------------------------------------------------
+
+    def record(self, employee_id, old_salary, new_salary, timestamp=None):
+        """
+        Append a salary change
+
+        Parameters:
+        -----------
+        employee_id : int
+            Whose salary changed
+        old_salary : float or None
+            Salary before the change (None for a new hire)
+        new_salary : float or None
+            Salary after the change (None if the employee left)
+        timestamp : float, optional
+            When it happened (default: now)
+        """
+        timestamp = self._clock() if timestamp is None else timestamp
+        old_salary = math.nan if old_salary is None else old_salary
+        new_salary = math.nan if new_salary is None else new_salary
+        self._index(employee_id, timestamp, len(self))
+        self._buffer += RECORD.pack(employee_id, timestamp, old_salary, new_salary)
+        if self._file is not None and len(self._buffer) >= self.spill_records * RECORD.size:
+            self._spill()
+
+    def follow(self, registry):
+        """Record every change made through an EmployeeRegistry from now on"""
+        registry.add_listener(self)
+
+    def employee_removed(self, employee_id, position, salary, leaving):
+        """Listener: record a departure, or remember the salary before a change"""
+        if leaving:
+            self.record(employee_id, salary, None)
+        else:
+            self._pending[employee_id] = salary
+
+    def employee_added(self, employee_id, position, salary):
+        """Listener: record a hire (or re-hire) or a changed salary"""
+        old_salary = self._pending.pop(employee_id, None)
+        if old_salary != salary:
+            self.record(employee_id, old_salary, salary)
+
+    # ---- reading --------------------------------------------------------------
+
+    def __len__(self):
+        """Number of records in the log"""
+        return self._spilled + len(self._buffer) // RECORD.size
+
+    def history(self, employee_id):
+        """
+        Yield (timestamp, old salary, new salary) for an employee, oldest
+        first; the old salary is None for a hire, the new one for a departure
+        """
+        for number in self._record_numbers.get(employee_id, ()):
+            _, timestamp, old_salary, new_salary = self._record(number)
+            yield (timestamp, None if math.isnan(old_salary) else old_salary,
+                   None if math.isnan(new_salary) else new_salary)
+
+    def salary_at(self, employee_id, timestamp):
+        """
+        Salary of an employee at a moment in time
+
+        Returns:
+        --------
+        float : The salary in effect at `timestamp`, or None if the log
+        knows nothing about the employee before then or they had left
+
+        NOTE: bisect over the employee's change times, then one record
+        read: O(log k) for an employee with k changes
+        """
+        times = self._times.get(employee_id)
+        if times is None:
+            return None
+        position = bisect_right(times, timestamp)
+        if position == 0:
+            # Before the first recorded change: its "old" salary applied
+            old_salary = self._record(self._record_numbers[employee_id][0])[2]
+            return None if math.isnan(old_salary) else old_salary
+        new_salary = self._record(self._record_numbers[employee_id][position - 1])[3]
+        return None if math.isnan(new_salary) else new_salary
+
+    def memory_usage(self):
+        """Bytes held in memory by the buffer and the per-employee arrays"""
+        index = sum(times.itemsize * len(times) * 2 for times in self._times.values())
+        return len(self._buffer) + index
+
+    def close(self):
+        """Write any buffered records and close the file"""
+        if self._file is not None:
+            if self._buffer:
+                self._spill()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    print("=" * 50)
+    print("TESTING SALARY HISTORY")
+    print("=" * 50)
+
+    now = [1_700_000_000.0]
+    history = SalaryHistory(clock=lambda: now[0])
+    registry = EmployeeRegistry()
+    history.follow(registry)
+
+    def show(employee_id):
+        for timestamp, old_salary, new_salary in history.history(employee_id):
+            before = "hired" if old_salary is None else f"${old_salary:,.2f}"
+            after = "left" if new_salary is None else f"${new_salary:,.2f}"
+            print(f"t={timestamp:.0f}: {before} -> {after}")
+
+    alice = Employee("Alice Johnson", "Software Engineer", 85000)
+    registry.add(alice)
+    hired = now[0]
+
+    print("\n1. Raises are recorded:")
+    for percentage in (5, 10):
+        now[0] += 365 * 24 * 3600
+        registry.give_raise(alice.employee_id, percentage)
+    show(alice.employee_id)
+
+    print("\n2. Salary at a point in time:")
+    for label, moment in (("before hire", hired - 1), ("at hire", hired),
+                          ("18 months in", hired + 1.5 * 365 * 24 * 3600), ("today", now[0])):
+        salary = history.salary_at(alice.employee_id, moment)
+        print(f"{label:13}: {'unknown' if salary is None else f'${salary:,.2f}'}")
+
+    print("\n3. Leaving and being re-hired:")
+    now[0] += 365 * 24 * 3600
+    registry.remove(alice.employee_id)
+    left = now[0]
+    now[0] += 365 * 24 * 3600
+    alice.salary = 90000
+    registry.add(alice)
+    show(alice.employee_id)
+    salary = history.salary_at(alice.employee_id, left + 1)
+    print(f"While away: {'unknown' if salary is None else f'${salary:,.2f}'}")
+
+    events, employees = 5_000_000, 100_000
+    print(f"\n4. {events:,} changes for {employees:,} employees, spilling to disk:")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "salaries.log")
+        log = SalaryHistory(path, spill_records=500_000)
+        salaries = array("d", [50000.0]) * employees
+        start = time.perf_counter()
+        for event in range(events):
+            employee_id = random.randrange(employees)
+            old_salary = salaries[employee_id]
+            salaries[employee_id] = old_salary * 1.01
+            log.record(employee_id, old_salary, old_salary * 1.01, timestamp=float(event))
+        elapsed = time.perf_counter() - start
+        print(f"record:    {elapsed / events * 1e6:.2f} µs each")
+        print(f"File: {os.path.getsize(path) / 1e6:.0f} MB, in memory: "
+              f"{log.memory_usage() / 1e6:.0f} MB")
+
+        start = time.perf_counter()
+        for _ in range(100_000):
+            log.salary_at(random.randrange(employees), random.uniform(0, events))
+        print(f"salary_at: {(time.perf_counter() - start) / 100_000 * 1e6:.2f} µs each")
+        final = log.salary_at(0, events)
+        log.close()
+
+        start = time.perf_counter()
+        with SalaryHistory(path) as reopened:
+            print(f"Reopened {len(reopened):,} records in {time.perf_counter() - start:.1f}s, "
+                  f"employee 0 now earns ${reopened.salary_at(0, events):,.2f} "
+                  f"(was ${final:,.2f})")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. An append-only log keeps every change for auditing")
+    print("2. struct packs records into bytes with no per-record objects")
+    print("3. mmap lets old records live on disk but read like memory")
+    print("4. Keep per-key time arrays so bisect can answer 'as of' queries")
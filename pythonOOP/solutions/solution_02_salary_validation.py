@@ -0,0 +1,107 @@
+"""
+SOLUTION 2 EXTENSION: Batch Salary Validation
+==============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Batch APIs: Check a whole column in one call instead of one per row
+2. Boolean masks: One True/False per row says which rows are valid
+3. Per-company rules: Bounds are looked up once per batch, not per row
+4. Zero-copy input: NumPy reads array.array data without copying it
+5. Same answers: The batch check agrees with Employee.is_valid_company_salary
+
+"""
+
+from array import array
+
+from solution_02_class_methods_static import Employee
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def validate_salaries(salaries, company=None, use_numpy=None):
+    """
+    Check many salaries against a company's valid range at once
+
+    Parameters:
+    -----------
+    salaries : sequence of float
+        A list, array.array or NumPy array of salaries
+    company : str, optional
+        Whose bounds to use (default: Employee.company_name)
+    use_numpy : bool, optional
+        Force NumPy on or off (default: use it if it is installed)
+
+    Returns:
+    --------
+    tuple : (mask, violations) where mask[i] is True if salary i is
+    valid and violations lists the indices of the invalid salaries.
+    With NumPy these are a bool array and an int64 array; otherwise
+    a bytearray (1 = valid) and an array of ints.
+
+    NOTE: NaN is never valid, just as is_valid_company_salary(nan) is False
+    """
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed")
+    low, high = Employee.get_salary_bounds(company)
+    if np is not None and use_numpy is not False:
+        values = np.asarray(salaries, dtype=np.float64)
+        mask = (values >= low) & (values <= high)
+        return mask, np.flatnonzero(~mask)
+    mask = bytearray(low <= salary <= high for salary in salaries)
+    violations = array("q", (i for i, ok in enumerate(mask) if not ok))
+    return mask, violations
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("=" * 50)
+    print("TESTING BATCH SALARY VALIDATION")
+    print("=" * 50)
+    print(f"NumPy available: {np is not None}")
+
+    print("\n1. Same answers as is_valid_company_salary:")
+    sample = [15000, 50000, 20000, 500000, 600000, float("nan")]
+    mask, violations = validate_salaries(sample)
+    for salary, ok in zip(sample, mask):
+        print(f"${salary:>10,.0f}: batch {bool(ok)!s:5} / scalar {Employee.is_valid_company_salary(salary)}")
+    print(f"Violating rows: {violations.tolist()}")
+
+    print("\n2. Per-company bounds:")
+    Employee.set_salary_bounds(30000, 250000, company="StartupCo")
+    print(f"TechCorp bounds: {Employee.get_salary_bounds('TechCorp')}")
+    print(f"StartupCo bounds: {Employee.get_salary_bounds('StartupCo')}")
+    _, violations = validate_salaries(sample[:5], company="StartupCo")
+    print(f"StartupCo violating rows: {violations.tolist()}")
+
+    count = 10_000_000
+    print(f"\n3. Validating a {count:,}-row import:")
+    salaries = array("d", (random.uniform(10000, 550000) for _ in range(count)))
+
+    start = time.perf_counter()
+    scalar = [i for i, salary in enumerate(salaries) if not Employee.is_valid_company_salary(salary)]
+    print(f"{'is_valid_company_salary:':26} {time.perf_counter() - start:7.3f}s")
+
+    modes = [("Pure Python batch:", False)] + ([("NumPy batch:", True)] if np else [])
+    for label, use_numpy in modes:
+        start = time.perf_counter()
+        _, violations = validate_salaries(salaries, use_numpy=use_numpy)
+        print(f"{label:26} {time.perf_counter() - start:7.3f}s ({len(violations):,} invalid)")
+        assert violations.tolist() == scalar
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Offer a batch version of any check that runs per row")
+    print("2. Return a mask and the failing indices; callers need both")
+    print("3. Look configuration up once per batch, not once per row")
+    print("4. Test the batch version against the scalar one")
@@ -0,0 +1,259 @@
+"""
+SOLUTION 2 EXTENSION: Many Companies in One Process
+====================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Class state vs table state: Per-company data moves out of the class
+2. Compact tables: One array per field, one row per tenant
+3. Lock striping: Tenants share a small pool of locks, never one global lock
+4. Properties: company_name is looked up from the tenant row
+5. Subclassing: TenantEmployee reuses Employee's methods
+
+"""
+
+import threading
+from array import array
+
+from solution_02_class_methods_static import Employee
+
+
+class TenantTable:
+    """
+    Names, employee counters and salary bounds of many companies
+
+    Each tenant is a row number. Its name, count and bounds live in
+    parallel arrays, so hundreds of tenants cost a few bytes each.
+    Hiring bumps the tenant's counter under one of LOCK_STRIPES locks
+    chosen by tenant id: hires for different tenants rarely wait for
+    each other, and never for a lock shared by every tenant.
+    """
+
+    LOCK_STRIPES = 64   # must be a power of two
+
+    def __init__(self):
+        """Initialize an empty tenant table"""
+        self._names = []
+        self._lookup = {}                   # name -> tenant id
+        self._counts = array("Q")
+        self._min_salary = array("d")
+        self._max_salary = array("d")
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._tenants_lock = threading.Lock()   # only for adding and renaming
+
+    def _lock_for(self, tenant_id):
+        """Return the lock guarding a tenant's counter"""
+        return self._locks[tenant_id & (self.LOCK_STRIPES - 1)]
+
+    def add_tenant(self, name, min_salary=None, max_salary=None):
+        """
+        Add a company
+
+        Parameters:
+        -----------
+        name : str
+            Company name (must be unique)
+        min_salary, max_salary : float, optional
+            Valid salary range (default Employee.MIN_SALARY/MAX_SALARY)
+
+        Returns:
+        --------
+        int : Tenant id
+        """
+        low = Employee.MIN_SALARY if min_salary is None else min_salary
+        high = Employee.MAX_SALARY if max_salary is None else max_salary
+        if low > high:
+            raise ValueError("min_salary cannot be greater than max_salary")
+        with self._tenants_lock:
+            if name in self._lookup:
+                raise ValueError(f"Duplicate tenant: {name}")
+            tenant_id = len(self._names)
+            self._min_salary.append(low)
+            self._max_salary.append(high)
+            self._counts.append(0)
+            self._lookup[name] = tenant_id
+            self._names.append(name)    # last: makes the tenant visible
+            return tenant_id
+
+    def _check(self, tenant_id):
+        """Raise KeyError for an unknown tenant id"""
+        if not 0 <= tenant_id < len(self._names):
+            raise KeyError(f"Unknown tenant id: {tenant_id}")
+
+    def __len__(self):
+        return len(self._names)
+
+    def tenant_id(self, name):
+        """Tenant id of a company name"""
+        return self._lookup[name]
+
+    def name(self, tenant_id):
+        """Company name of a tenant"""
+        return self._names[tenant_id]
+
+    def rename(self, tenant_id, new_name):
+        """Change one tenant's company name (set_company_name for one tenant)"""
+        self._check(tenant_id)
+        with self._tenants_lock:
+            if new_name in self._lookup:
+                raise ValueError(f"Duplicate tenant: {new_name}")
+            del self._lookup[self._names[tenant_id]]
+            self._lookup[new_name] = tenant_id
+            self._names[tenant_id] = new_name
+
+    def salary_bounds(self, tenant_id):
+        """Return (min salary, max salary) of a tenant"""
+        with self._lock_for(tenant_id):     # never half of a set_salary_bounds
+            return self._min_salary[tenant_id], self._max_salary[tenant_id]
+
+    def set_salary_bounds(self, tenant_id, min_salary, max_salary):
+        """Change a tenant's valid salary range"""
+        self._check(tenant_id)
+        if min_salary > max_salary:
+            raise ValueError("min_salary cannot be greater than max_salary")
+        with self._lock_for(tenant_id):
+            self._min_salary[tenant_id] = min_salary
+            self._max_salary[tenant_id] = max_salary
+
+    def employee_count(self, tenant_id):
+        """Number of employees hired by a tenant (O(1))"""
+        return self._counts[tenant_id]
+
+    def next_employee_id(self, tenant_id):
+        """
+        Count a new hire and return their ID within the tenant
+
+        NOTE: Only the tenant's stripe lock is taken
+        """
+        self._check(tenant_id)
+        with self._lock_for(tenant_id):
+            count = self._counts[tenant_id] + 1
+            self._counts[tenant_id] = count
+            return count
+
+    def hire(self, tenant_id, name, position, salary):
+        """Create a TenantEmployee for a tenant"""
+        return TenantEmployee(self, tenant_id, name, position, salary)
+
+
+class TenantEmployee(Employee):
+    """
+    An Employee that belongs to one tenant of a TenantTable
+
+    NOTE: employee_id is unique within the tenant; (tenant_id,
+    employee_id) is unique across the table. The inherited class
+    methods still answer for the class as a whole;
+    tenant_employee_count() and accepts_salary() answer for the
+    employee's tenant.
+    """
+
+    def __init__(self, tenants, tenant_id, name, position, salary):
+        """
+        Initialize a TenantEmployee
+
+        Parameters:
+        -----------
+        tenants : TenantTable
+            Table the tenant lives in
+        tenant_id : int
+            Tenant (company) the employee works for
+        name, position, salary :
+            As for Employee
+        """
+        # Employee.__init__ is not called: it counts in the shared class variable
+        self.name = name
+        self.position = position
+        self.salary = salary
+        self.tenants = tenants
+        self.tenant_id = tenant_id
+        self.employee_id = tenants.next_employee_id(tenant_id)
+
+    @property
+    def company_name(self):
+        """Name of the employee's tenant"""
+        return self.tenants.name(self.tenant_id)
+
+    @classmethod
+    def set_company_name(cls, new_name):
+        raise TypeError("Tenants are renamed with TenantTable.rename(tenant_id, name)")
+
+    def tenant_employee_count(self):
+        """Number of employees hired by the employee's tenant"""
+        return self.tenants.employee_count(self.tenant_id)
+
+    def accepts_salary(self, salary):
+        """Check a salary against the employee's tenant's bounds"""
+        low, high = self.tenants.salary_bounds(self.tenant_id)
+        return low <= salary <= high
+
+    def give_raise(self, percentage):
+        """give_raise that refuses to leave the tenant's salary range"""
+        if percentage >= 0 and not self.accepts_salary(
+                self.salary * (1 + percentage / 100)):
+            print(f"Error: Raise would leave {self.company_name}'s salary range")
+            return
+        super().give_raise(percentage)
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 50)
+    print("TESTING TENANTS")
+    print("=" * 50)
+
+    tenants = TenantTable()
+    acme = tenants.add_tenant("Acme Corp")
+    startup = tenants.add_tenant("StartupCo", min_salary=30000, max_salary=150000)
+
+    print("\n1. Employees of two companies:")
+    alice = tenants.hire(acme, "Alice Johnson", "Software Engineer", 85000)
+    bob = tenants.hire(startup, "Bob Smith", "Data Scientist", 95000)
+    carol = tenants.hire(startup, "Carol White", "Product Manager", 140000)
+    alice.display_info()
+    bob.display_info()
+    print(f"Acme employees: {alice.tenant_employee_count()}, "
+          f"StartupCo employees: {bob.tenant_employee_count()}")
+
+    print("\n2. Renaming one tenant leaves the others alone:")
+    tenants.rename(startup, "ScaleUp Inc")
+    print(f"Alice works for {alice.company_name}, Bob for {bob.company_name}")
+
+    print("\n3. Raises respect each tenant's bounds:")
+    carol.give_raise(10)
+    alice.give_raise(10)
+    print(f"Is $160,000 valid for Alice? {alice.accepts_salary(160000)}, "
+          f"for Carol? {carol.accepts_salary(160000)}")
+
+    tenant_count, threads_count, hires = 200, 8, 50_000
+    print(f"\n4. {threads_count} threads hiring into {tenant_count} tenants:")
+    big = TenantTable()
+    for i in range(tenant_count):
+        big.add_tenant(f"Tenant {i}")
+
+    def onboard(worker):
+        for i in range(hires):
+            TenantEmployee(big, (worker * 7 + i) % tenant_count, "New Hire", "Analyst", 60000)
+
+    workers = [threading.Thread(target=onboard, args=(w,)) for w in range(threads_count)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    total = sum(big.employee_count(t) for t in range(tenant_count))
+    print(f"Hired {total:,} (expected {threads_count * hires:,}) in {elapsed:.2f}s")
+    print(f"Tenant 0 has {big.employee_count(0):,} employees")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Class variables mean one value per process; use a table for many")
+    print("2. Keep per-tenant data in compact rows, looked up by id")
+    print("3. Stripe locks so unrelated tenants don't contend")
+    print("4. A property can replace a class variable in a subclass")
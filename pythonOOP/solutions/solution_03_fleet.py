@@ -0,0 +1,561 @@
+"""
+SOLUTION 3 EXTENSION: Columnar Fleet Store
+===========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Partitioning by type: Each subclass gets its own set of columns
+2. Schemas: A table of (field, type) pairs drives storage for every class
+3. Typed columns: array.array stores numbers without per-object overhead
+4. String tables: Repeated brands and models are stored once, used by id
+5. Materializing: Rebuild a real Car/Motorcycle/Truck object on demand
+
+"""
+
+import math
+import random
+from array import array
+
+from solution_03_inheritance import Vehicle, Car, Motorcycle, Truck
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Column types: array typecodes, plus "str" (an id into the string table)
+# and "?" (a bool stored as one byte)
+SHARED_FIELDS = (("brand", "str"), ("model", "str"), ("year", "H"), ("price", "d"))
+
+SCHEMAS = {
+    Vehicle: (),
+    Car: (("num_doors", "B"), ("fuel_type", "str")),
+    Motorcycle: (("has_sidecar", "?"), ("engine_cc", "I")),
+    Truck: (("cargo_capacity", "d"), ("num_axles", "B")),
+}
+
+# Position in KINDS is stored in the low bits of a vehicle id
+KINDS = (Vehicle, Car, Motorcycle, Truck)
+KIND_BITS = 2
+
+
+def _storage_code(kind):
+    """Array typecode used to store a column type"""
+    return {"str": "I", "?": "B"}.get(kind, kind)
+
+
+def _as_array(code, values):
+    """
+    Convert a sequence to an array of the given typecode
+
+    NOTE: NumPy arrays are converted with one bulk copy instead of
+    element by element, after the same checks array() makes: integers
+    must fit the column type, and integer columns do not take floats
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        dtype = np.dtype(code)
+        if dtype.kind in "iu" and len(values):
+            if values.dtype.kind not in "biu":
+                raise TypeError(f"Column of type {code!r} needs integers, got {values.dtype}")
+            limits = np.iinfo(dtype)
+            if values.min() < limits.min or values.max() > limits.max:
+                raise OverflowError(f"Values out of range for column type {code!r}")
+        result = array(code)
+        result.frombytes(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        return result
+    return array(code, values)
+
+
+def _check_prices(prices):
+    """Raise ValueError unless every price is a finite number"""
+    if np is not None and isinstance(prices, np.ndarray):
+        finite = bool(np.isfinite(prices).all())
+    else:
+        finite = all(map(math.isfinite, prices))
+    if not finite:
+        raise ValueError("Prices must be finite numbers")
+
+
+def _is_int(value):
+    """True for ints (not bools), which "d" columns would turn into floats"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class StringTable:
+    """Each distinct string stored once and referred to by a small int"""
+
+    def __init__(self, strings=()):
+        """Initialize the table, optionally with strings in id order"""
+        self._strings = list(strings)
+        self._ids = {string: i for i, string in enumerate(self._strings)}
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __getitem__(self, string_id):
+        return self._strings[string_id]
+
+    def intern(self, string):
+        """Return the id of a string, adding it if new"""
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._ids[string] = string_id
+        return string_id
+
+    def find(self, string):
+        """Return the id of a string, or None if it was never added"""
+        return self._ids.get(string)
+
+
+class FleetPartition:
+    """
+    Columns for the vehicles of one class
+
+    Row i of every column belongs to the same vehicle. Removed vehicles
+    keep their row (so vehicle ids stay stable) and are marked dead in
+    `live`.
+
+    NOTE: "d" columns store ints as floats. So that a vehicle built
+    with price=45000 comes back with 45000 and not 45000.0, `int_flags`
+    holds one byte per row with bit i set when the i-th "d" field (in
+    `float_fields` order) was given as an int.
+    """
+
+    def __init__(self, cls, strings):
+        """
+        Initialize an empty partition
+
+        Parameters:
+        -----------
+        cls : type
+            Vehicle, Car, Motorcycle or Truck
+        strings : StringTable
+            The fleet's shared string table
+        """
+        self.cls = cls
+        self.kind = KINDS.index(cls)
+        self.fields = SHARED_FIELDS + SCHEMAS[cls]
+        self.columns = {name: array(_storage_code(kind)) for name, kind in self.fields}
+        self.float_fields = tuple(name for name, kind in self.fields if kind == "d")
+        self.int_flags = bytearray()
+        self.live = bytearray()
+        self.live_count = 0
+        self._strings = strings
+
+    def __len__(self):
+        """Number of rows, including removed vehicles"""
+        return len(self.live)
+
+    def append(self, vehicle):
+        """Store a vehicle's fields in a new row and return the row"""
+        intern = self._strings.intern
+        # Convert every field first so a bad value cannot leave a half-written row
+        row = [array(_storage_code(kind), [intern(getattr(vehicle, name)) if kind == "str"
+                                           else getattr(vehicle, name)])
+               for name, kind in self.fields]
+        flags = sum(1 << bit for bit, name in enumerate(self.float_fields)
+                    if _is_int(getattr(vehicle, name)))
+        for (name, _), value in zip(self.fields, row):
+            self.columns[name].extend(value)
+        self.int_flags.append(flags)
+        self.live.append(1)
+        self.live_count += 1
+        return len(self.live) - 1
+
+    def extend(self, columns, encoded=False, int_flags=None):
+        """
+        Append many rows given as one sequence per field
+
+        Parameters:
+        -----------
+        columns : dict
+            field name -> sequence or NumPy array of values
+        encoded : bool, optional
+            "str" fields hold string table ids instead of strings
+            (default False)
+        int_flags : bytes-like, optional
+            One int_flags byte per row (default: worked out from the
+            values; NumPy integer arrays count as ints)
+
+        Returns:
+        --------
+        range : The new rows
+        """
+        missing = [name for name, _ in self.fields if name not in columns]
+        if missing:
+            raise ValueError(f"Missing columns for {self.cls.__name__}: {missing}")
+        count = len(columns[self.fields[0][0]])
+        if any(len(columns[name]) != count for name, _ in self.fields):
+            raise ValueError("All columns must have the same length")
+        first = len(self.live)
+        intern = self._strings.intern
+        converted = []
+        for name, kind in self.fields:
+            values = columns[name]
+            if kind == "str" and not encoded:
+                # Intern each distinct string once, then map the column
+                ids = {string: intern(string) for string in set(values)}
+                values = map(ids.__getitem__, values)
+            values = _as_array(_storage_code(kind), values)
+            if kind == "str" and values and max(values) >= len(self._strings):
+                raise ValueError(f"Column {name} refers to unknown string ids")
+            converted.append(values)
+        if int_flags is None:
+            int_flags = self._int_flags(columns, count)
+        elif len(int_flags) != count:
+            raise ValueError("int_flags must have one byte per row")
+        for (name, _), values in zip(self.fields, converted):
+            self.columns[name].extend(values)
+        self.int_flags.extend(int_flags)
+        self.live.extend(b"\x01" * count)
+        self.live_count += count
+        return range(first, first + count)
+
+    def _int_flags(self, columns, count):
+        """Work out the int_flags bytes of new rows from their values"""
+        flags = bytearray(count)
+        for bit, name in enumerate(self.float_fields):
+            values = columns[name]
+            if np is not None and isinstance(values, np.ndarray):
+                if values.dtype.kind in "iu":
+                    flags = bytearray(flag | (1 << bit) for flag in flags)
+            else:
+                flags = bytearray(flag | (1 << bit) if _is_int(value) else flag
+                                  for flag, value in zip(flags, values))
+        return flags
+
+    def column_values(self, name, start=0, stop=None):
+        """
+        Return rows start..stop of a column as stored, except that "d"
+        values given as ints come back as ints
+        """
+        values = self.columns[name][start:stop]
+        if name in self.float_fields:
+            bit = 1 << self.float_fields.index(name)
+            flags = self.int_flags[start:stop]
+            if any(flag & bit for flag in flags):
+                return [int(value) if flag & bit else value
+                        for value, flag in zip(values, flags)]
+        return values
+
+    def values(self, row):
+        """Return a row's field values in schema order, with strings resolved"""
+        strings = self._strings
+        flags = self.int_flags[row]
+        result = []
+        for name, kind in self.fields:
+            value = self.columns[name][row]
+            if kind == "str":
+                value = strings[value]
+            elif kind == "?":
+                value = bool(value)
+            elif kind == "d" and flags >> self.float_fields.index(name) & 1:
+                value = int(value)
+            result.append(value)
+        return result
+
+    def materialize(self, row):
+        """Build a real object of the partition's class from a row"""
+        return self.cls(*self.values(row))
+
+    def nbytes(self):
+        """Bytes used by the columns"""
+        return (len(self.live) + len(self.int_flags) +
+                sum(c.itemsize * len(c) for c in self.columns.values()))
+
+
+class Fleet:
+    """
+    Vehicles of every class, stored as one columnar partition per class
+
+    A vehicle id holds the row number and the class:
+    (row << KIND_BITS) | position of the class in KINDS.
+    Looking a vehicle up builds a normal Car, Motorcycle, Truck or
+    Vehicle object, so display_info(), calculate_age() and the
+    predicates behave exactly as before.
+
+    NOTE: The object is a copy; use set_price() and remove() to change
+    the fleet
+    """
+
+    def __init__(self):
+        """Initialize an empty fleet"""
+        self.strings = StringTable()
+        self.partitions = {cls: FleetPartition(cls, self.strings) for cls in KINDS}
+        self._listeners = []
+
+    def _locate(self, vehicle_id):
+        """Return (partition, row) for a vehicle id, or raise KeyError"""
+        kind = vehicle_id & ((1 << KIND_BITS) - 1)
+        row = vehicle_id >> KIND_BITS
+        if kind < len(KINDS):
+            partition = self.partitions[KINDS[kind]]
+            if 0 <= row < len(partition) and partition.live[row]:
+                return partition, row
+        raise KeyError(f"Unknown vehicle id: {vehicle_id}")
+
+    def partition(self, cls):
+        """The partition holding a class's vehicles"""
+        return self.partitions[cls]
+
+    def add_listener(self, listener):
+        """
+        Register an object to be told about changes to the fleet
+
+        NOTE: The listener needs vehicle_added(vehicle_id) and
+        vehicle_removed(vehicle_id) methods. Removals are reported while
+        the vehicle's row still holds its values, and a price change is
+        reported as a removal followed by an addition.
+        """
+        self._listeners.append(listener)
+
+    # ---- changes --------------------------------------------------------------
+
+    def add(self, vehicle):
+        """
+        Store a vehicle
+
+        Returns:
+        --------
+        int : The new vehicle id
+
+        Raises:
+        -------
+        TypeError : If the object is not exactly one of KINDS
+        ValueError : If its price is NaN or infinite
+        """
+        partition = self.partitions.get(type(vehicle))
+        if partition is None:
+            raise TypeError(f"Cannot store {type(vehicle).__name__} objects in a Fleet")
+        _check_prices((vehicle.price,))
+        vehicle_id = (partition.append(vehicle) << KIND_BITS) | partition.kind
+        for listener in self._listeners:
+            listener.vehicle_added(vehicle_id)
+        return vehicle_id
+
+    def add_many(self, vehicles):
+        """Store many vehicles and return their ids"""
+        return [self.add(vehicle) for vehicle in vehicles]
+
+    def add_columns(self, cls, encoded=False, int_flags=None, **columns):
+        """
+        Store many vehicles of one class given column by column
+
+        Example:
+            fleet.add_columns(Truck, brand=[...], model=[...], year=[...],
+                              price=[...], cargo_capacity=[...], num_axles=[...])
+
+        NOTE: With encoded=True, brand/model/fuel_type hold ids from
+        fleet.strings.intern() instead of strings. int_flags is passed
+        on to FleetPartition.extend().
+
+        Returns:
+        --------
+        range : The new vehicle ids
+
+        Raises:
+        -------
+        ValueError : If a price is NaN or infinite
+        """
+        partition = self.partitions[cls]
+        if "price" in columns:
+            _check_prices(columns["price"])
+        rows = partition.extend(columns, encoded, int_flags)
+        new_ids = range((rows.start << KIND_BITS) | partition.kind,
+                        (rows.stop << KIND_BITS) | partition.kind, 1 << KIND_BITS)
+        for listener in self._listeners:
+            for vehicle_id in new_ids:
+                listener.vehicle_added(vehicle_id)
+        return new_ids
+
+    def remove(self, vehicle_id):
+        """Remove a vehicle (its id is never reused)"""
+        partition, row = self._locate(vehicle_id)
+        for listener in self._listeners:
+            listener.vehicle_removed(vehicle_id)
+        partition.live[row] = 0
+        partition.live_count -= 1
+
+    def set_price(self, vehicle_id, price):
+        """
+        Change a vehicle's price
+
+        Raises:
+        -------
+        ValueError : If the price is NaN or infinite
+        """
+        partition, row = self._locate(vehicle_id)
+        given, price = price, float(price)      # fail before listeners hear about the change
+        _check_prices((price,))
+        for listener in self._listeners:
+            listener.vehicle_removed(vehicle_id)
+        partition.columns["price"][row] = price
+        bit = 1 << partition.float_fields.index("price")
+        partition.int_flags[row] = (partition.int_flags[row] | bit if _is_int(given)
+                                    else partition.int_flags[row] & ~bit)
+        for listener in self._listeners:
+            listener.vehicle_added(vehicle_id)
+
+    # ---- reading --------------------------------------------------------------
+
+    def __len__(self):
+        return sum(partition.live_count for partition in self.partitions.values())
+
+    def __contains__(self, vehicle_id):
+        try:
+            self._locate(vehicle_id)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, vehicle_id):
+        partition, row = self._locate(vehicle_id)
+        return partition.materialize(row)
+
+    def ids(self, cls=None):
+        """Yield the ids of live vehicles (of one class, if given)"""
+        for partition in self.partitions.values():
+            if cls is not None and partition.cls is not cls:
+                continue
+            kind, live = partition.kind, partition.live
+            for row in range(len(live)):
+                if live[row]:
+                    yield (row << KIND_BITS) | kind
+
+    def __iter__(self):
+        """Yield every live vehicle as an object"""
+        for vehicle_id in self.ids():
+            yield self[vehicle_id]
+
+    def count(self, cls=None):
+        """Number of live vehicles (of one class, if given)"""
+        if cls is None:
+            return len(self)
+        return self.partitions[cls].live_count
+
+    def nbytes(self):
+        """Bytes used by all columns and the string table's strings"""
+        strings = sum(len(self.strings[i]) for i in range(len(self.strings)))
+        return strings + sum(p.nbytes() for p in self.partitions.values())
+
+
+BRANDS = ("Toyota", "Ford", "Honda", "Volvo", "BMW", "Tesla", "Kawasaki", "Ducati",
+          "Scania", "Mercedes")
+FUEL_TYPES = ("Petrol", "Diesel", "Electric", "Hybrid")
+
+
+def sample_fleet(count, seed=0, fleet=None):
+    """
+    Fill a fleet with `count` random vehicles for demos and benchmarks
+
+    60% cars, 15% motorcycles, 25% trucks from model years 1995-2025.
+    Uses NumPy to generate the columns when it is installed.
+
+    Returns:
+    --------
+    Fleet : The fleet (a new one unless given)
+    """
+    fleet = Fleet() if fleet is None else fleet
+    brands = [fleet.strings.intern(brand) for brand in BRANDS]
+    models = [fleet.strings.intern(f"Model {i}") for i in range(200)]
+    fuels = [fleet.strings.intern(fuel) for fuel in FUEL_TYPES]
+    shares = ((Car, 0.6), (Motorcycle, 0.15), (Truck, 0.25))
+    if np is not None:
+        rng = np.random.default_rng(seed)
+
+        def pick(options, n):
+            return np.asarray(options)[rng.integers(0, len(options), n)]
+
+        def uniform(low, high, n):
+            return rng.uniform(low, high, n)
+    else:
+        rng = random.Random(seed)
+
+        def pick(options, n):
+            return [rng.choice(options) for _ in range(n)]
+
+        def uniform(low, high, n):
+            return [rng.uniform(low, high) for _ in range(n)]
+    for cls, share in shares:
+        n = count - int(count * 0.4) if cls is Car else int(count * share)
+        columns = {"brand": pick(brands, n), "model": pick(models, n),
+                   "year": pick(range(1995, 2026), n), "price": uniform(5000, 150000, n)}
+        if cls is Car:
+            columns.update(num_doors=pick((2, 4, 5), n), fuel_type=pick(fuels, n))
+        elif cls is Motorcycle:
+            columns.update(has_sidecar=pick((0, 0, 0, 0, 1), n),
+                           engine_cc=pick((125, 300, 650, 998, 1200), n))
+        else:
+            columns.update(cargo_capacity=uniform(1, 40, n), num_axles=pick((2, 3, 4), n))
+        fleet.add_columns(cls, encoded=True, **columns)
+    return fleet
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    print("=" * 50)
+    print("TESTING FLEET STORE")
+    print("=" * 50)
+
+    fleet = Fleet()
+    ids = fleet.add_many([
+        Car("Tesla", "Model 3", 2022, 45000, 4, "Electric"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Truck("Volvo", "FH16", 2021, 120000, 25, 3),
+    ])
+
+    print("\n1. Materialized objects are the real classes:")
+    for vehicle_id in ids:
+        vehicle = fleet[vehicle_id]
+        print(f"id {vehicle_id}: {type(vehicle).__name__}, "
+              f"isinstance Vehicle: {isinstance(vehicle, Vehicle)}")
+    fleet[ids[0]].display_info()
+
+    print("\n2. Changing and removing:")
+    fleet.set_price(ids[2], 110000)
+    fleet.remove(ids[1])
+    print(f"Truck price: ${fleet[ids[2]].price:,.2f}")
+    print(f"Vehicles left: {len(fleet)}, motorcycles: {fleet.count(Motorcycle)}")
+
+    # Size comes from the command line (default 1,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"\n3. Memory for {count:,} vehicles:")
+    sample = min(count, 200_000)
+
+    tracemalloc.start()
+    objects = [Car(random.choice(BRANDS), f"Model {i % 200}", random.randint(1995, 2025),
+                   random.uniform(5000, 150000), random.choice((2, 4, 5)),
+                   random.choice(FUEL_TYPES)) for i in range(sample)]
+    per_object = tracemalloc.get_traced_memory()[0] / sample
+    tracemalloc.stop()
+    del objects
+    print(f"List of Car objects: {per_object:6.1f} bytes per vehicle")
+
+    start = time.perf_counter()
+    big = sample_fleet(count)
+    print(f"Fleet columns:       {big.nbytes() / len(big):6.1f} bytes per vehicle "
+          f"(generated in {time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    trucks = big.partition(Truck)
+    heavy = sum(1 for row in range(len(trucks)) if trucks.columns["cargo_capacity"][row] > 10)
+    print(f"Heavy-duty trucks from a column scan: {heavy:,} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. One partition per subclass keeps each column a single type")
+    print("2. A schema table replaces hand-written storage code per class")
+    print("3. String tables turn repeated text into small integers")
+    print("4. Materialize objects only when you need their behaviour")
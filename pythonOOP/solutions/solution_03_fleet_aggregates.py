@@ -0,0 +1,317 @@
+"""
+SOLUTION 3 EXTENSION: Running Fleet Totals
+===========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Group-by, maintained: Counts and sums per group change with every edit
+2. Observer pattern: The fleet reports each insert, delete and price change
+3. Exact sums: Prices are added up in integer cents
+4. Small domains: Model years span a few decades, so min/max is a short scan
+5. Consistency checks: A from-scratch recount proves the running totals right
+
+"""
+
+from solution_03_inheritance import Car, Motorcycle, Truck
+from solution_03_fleet import Fleet, KINDS, KIND_BITS, sample_fleet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _cents(price):
+    """Price as a whole number of cents"""
+    return round(price * 100)
+
+
+def group_totals(fleet, use_numpy=None):
+    """
+    Count and sum the live vehicles of a fleet from scratch
+
+    Returns:
+    --------
+    dict : (brand id, class, year) -> [count, total cents]
+    """
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed")
+    use_numpy = np is not None if use_numpy is None else use_numpy
+    groups = {}
+    for cls, partition in fleet.partitions.items():
+        columns = partition.columns
+        if use_numpy:
+            live = np.frombuffer(partition.live, dtype=np.uint8).view(bool)
+            brands = np.frombuffer(columns["brand"], dtype=np.uint32)[live].astype(np.int64)
+            years = np.frombuffer(columns["year"], dtype=np.uint16)[live]
+            cents = np.round(np.frombuffer(columns["price"], dtype=np.float64)[live] * 100)
+            keys, inverse = np.unique((brands << 16) | years, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            # Whole cents are summed exactly as floats while totals stay below 2**53
+            sums = np.bincount(inverse, weights=cents, minlength=len(keys))
+            for key, count, total in zip(keys.tolist(), counts.tolist(), sums.tolist()):
+                groups[(key >> 16, cls, key & 0xFFFF)] = [count, int(total)]
+            continue
+        for brand, year, price, alive in zip(columns["brand"], columns["year"],
+                                             columns["price"], partition.live):
+            if alive:
+                group = groups.get((brand, cls, year))
+                if group is None:
+                    groups[(brand, cls, year)] = [1, _cents(price)]
+                else:
+                    group[0] += 1
+                    group[1] += _cents(price)
+    return groups
+
+
+class FleetAggregates:
+    """
+    Counts, total value and model year range of a fleet, kept up to date
+
+    Groups are brand x class x model year, each holding a count and a
+    price total in cents. Every brand x class also keeps its count,
+    total and oldest/newest model year, and the whole fleet keeps its
+    count and total, so every read is a dict lookup.
+
+    NOTE: When the oldest or newest model year of a brand x class runs
+    out of vehicles, the new one is found by scanning the years between
+    the old bounds. That range is a few decades at most.
+    """
+
+    def __init__(self, fleet, use_numpy=None):
+        """
+        Start tracking a fleet (including the vehicles already in it)
+
+        Parameters:
+        -----------
+        fleet : Fleet
+            The fleet to follow
+        use_numpy : bool, optional
+            Count the existing vehicles with NumPy (default: if installed)
+        """
+        self._fleet = fleet
+        self._use_numpy = use_numpy
+        self._groups = group_totals(fleet, use_numpy)
+        self._rollups = {}      # (brand id, class) -> [count, cents, min year, max year]
+        self._count = 0
+        self._total_cents = 0
+        for (brand, cls, year), (count, cents) in self._groups.items():
+            self._count += count
+            self._total_cents += cents
+            rollup = self._rollups.get((brand, cls))
+            if rollup is None:
+                self._rollups[(brand, cls)] = [count, cents, year, year]
+            else:
+                rollup[0] += count
+                rollup[1] += cents
+                rollup[2] = min(rollup[2], year)
+                rollup[3] = max(rollup[3], year)
+        fleet.add_listener(self)
+
+    def _values(self, vehicle_id):
+        """Return (brand id, class, year, cents) of a vehicle from its row"""
+        partition = self._fleet.partitions[KINDS[vehicle_id & ((1 << KIND_BITS) - 1)]]
+        row = vehicle_id >> KIND_BITS
+        columns = partition.columns
+        return (columns["brand"][row], partition.cls, columns["year"][row],
+                _cents(columns["price"][row]))
+
+    # ---- listener interface -------------------------------------------------
+
+    def vehicle_added(self, vehicle_id):
+        """Count a new vehicle (or the new half of a price change)"""
+        brand, cls, year, cents = self._values(vehicle_id)
+        self._count += 1
+        self._total_cents += cents
+        group = self._groups.get((brand, cls, year))
+        if group is None:
+            self._groups[(brand, cls, year)] = [1, cents]
+        else:
+            group[0] += 1
+            group[1] += cents
+        rollup = self._rollups.get((brand, cls))
+        if rollup is None:
+            self._rollups[(brand, cls)] = [1, cents, year, year]
+        else:
+            rollup[0] += 1
+            rollup[1] += cents
+            if year < rollup[2]:
+                rollup[2] = year
+            elif year > rollup[3]:
+                rollup[3] = year
+
+    def vehicle_removed(self, vehicle_id):
+        """Uncount a removed vehicle (or the old half of a price change)"""
+        brand, cls, year, cents = self._values(vehicle_id)
+        self._count -= 1
+        self._total_cents -= cents
+        group = self._groups[(brand, cls, year)]
+        emptied = group[0] == 1
+        if emptied:
+            del self._groups[(brand, cls, year)]
+        else:
+            group[0] -= 1
+            group[1] -= cents
+        rollup = self._rollups[(brand, cls)]
+        if rollup[0] == 1:
+            del self._rollups[(brand, cls)]
+            return
+        rollup[0] -= 1
+        rollup[1] -= cents
+        if emptied and year in (rollup[2], rollup[3]):
+            # The oldest or newest year just emptied: find the next one
+            years = [y for y in range(rollup[2], rollup[3] + 1)
+                     if (brand, cls, y) in self._groups]
+            rollup[2], rollup[3] = years[0], years[-1]
+
+    # ---- queries --------------------------------------------------------------
+
+    @property
+    def count(self):
+        """Number of vehicles"""
+        return self._count
+
+    @property
+    def total_value(self):
+        """Sum of all prices"""
+        return self._total_cents / 100
+
+    def group(self, brand, cls, year):
+        """Return (count, total price) for one brand, class and model year"""
+        brand_id = self._fleet.strings.find(brand)
+        count, cents = self._groups.get((brand_id, cls, year), (0, 0))
+        return count, cents / 100
+
+    def brand_type(self, brand, cls):
+        """
+        Return (count, total price, oldest year, newest year) for a brand
+        and class, with None for the years if there are no such vehicles
+        """
+        rollup = self._rollups.get((self._fleet.strings.find(brand), cls))
+        if rollup is None:
+            return 0, 0.0, None, None
+        count, cents, oldest, newest = rollup
+        return count, cents / 100, oldest, newest
+
+    def by_group(self):
+        """Return a dict of (brand, class name, year) -> (count, total price)"""
+        strings = self._fleet.strings
+        return {(strings[brand], cls.__name__, year): (count, cents / 100)
+                for (brand, cls, year), (count, cents) in self._groups.items()}
+
+    def check(self):
+        """
+        Recount the fleet from scratch and compare with the running totals
+
+        Returns:
+        --------
+        list : One message per difference (empty if everything agrees)
+        """
+        expected = group_totals(self._fleet, self._use_numpy)
+        problems = [f"group {key}: running {self._groups.get(key)}, recounted {expected.get(key)}"
+                    for key in expected.keys() | self._groups.keys()
+                    if self._groups.get(key) != expected.get(key)]
+        rollups = {}
+        for (brand, cls, year), (count, cents) in expected.items():
+            rollup = rollups.setdefault((brand, cls), [0, 0, year, year])
+            rollup[0] += count
+            rollup[1] += cents
+            rollup[2] = min(rollup[2], year)
+            rollup[3] = max(rollup[3], year)
+        problems += [f"brand x class {key}: running {self._rollups.get(key)}, "
+                     f"recounted {rollups.get(key)}"
+                     for key in rollups.keys() | self._rollups.keys()
+                     if self._rollups.get(key) != rollups.get(key)]
+        count = sum(count for count, _ in expected.values())
+        cents = sum(cents for _, cents in expected.values())
+        if (self._count, self._total_cents) != (count, cents):
+            problems.append(f"fleet: running {(self._count, self._total_cents)}, "
+                            f"recounted {(count, cents)}")
+        return problems
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING FLEET AGGREGATES")
+    print("=" * 50)
+
+    fleet = Fleet()
+    totals = FleetAggregates(fleet)
+    ids = fleet.add_many([
+        Car("Tesla", "Model 3", 2022, 45000, 4, "Electric"),
+        Car("Tesla", "Model Y", 2023, 52000, 4, "Electric"),
+        Car("Tesla", "Model S", 2019, 79000, 4, "Electric"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Truck("Volvo", "FH16", 2021, 120000, 25, 3),
+    ])
+
+    def show():
+        count, total, oldest, newest = totals.brand_type("Tesla", Car)
+        print(f"Fleet: {totals.count} vehicles, ${totals.total_value:,.2f}; "
+              f"Tesla cars: {count}, ${total:,.2f}, years {oldest}-{newest}")
+
+    print("\n1. Starting totals:")
+    show()
+
+    print("\n2. Price change and removal:")
+    fleet.set_price(ids[0], 41000)
+    fleet.remove(ids[2])
+    show()
+    print(f"Tesla cars from 2022: {totals.group('Tesla', Car, 2022)}")
+    try:
+        fleet.set_price(ids[1], float("nan"))
+    except ValueError as error:
+        print(f"Rejected before the totals changed: {error}")
+    print(f"Consistent: {not totals.check()}")
+
+    # Size comes from the command line (default 2,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"\n3. {count:,} vehicles under constant change:")
+    big = sample_fleet(count)
+    start = time.perf_counter()
+    big_totals = FleetAggregates(big)
+    print(f"Initial count: {time.perf_counter() - start:.2f}s")
+
+    changes = min(20_000, count // 4)
+    big_ids = random.sample(list(big.ids()), 2 * changes)
+    start = time.perf_counter()
+    for vehicle_id in big_ids[:changes]:
+        big.set_price(vehicle_id, round(random.uniform(5000, 150000), 2))
+    for vehicle_id in big_ids[changes:]:
+        big.remove(vehicle_id)
+    big.add_many(Truck("Scania", "R500", random.randint(1995, 2025), 90000, 30, 3)
+                 for _ in range(changes))
+    print(f"Insert/delete/price change: "
+          f"{(time.perf_counter() - start) / (3 * changes) * 1e6:.1f} µs each")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        big_totals.total_value, big_totals.group("Volvo", Truck, 2020)
+        big_totals.brand_type("Scania", Truck)
+    polled = time.perf_counter() - start
+    print(f"Dashboard poll: {polled / 10_000 * 1e6:.2f} µs "
+          f"({10_000 / polled:,.0f} polls per second)")
+
+    start = time.perf_counter()
+    recount = sum(vehicle.price for vehicle in big)
+    print(f"sum(vehicle.price for vehicle in vehicles): {time.perf_counter() - start:.2f}s")
+    # Each price is counted to the nearest cent
+    assert abs(recount - big_totals.total_value) <= 0.005 * len(big)
+    problems = big_totals.check()
+    print(f"Consistency check: {'OK' if not problems else problems[:3]}")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Maintain group totals on write so dashboards read them for free")
+    print("2. Report an edit as remove-then-add so totals need only two cases")
+    print("3. Use integer cents for sums that are added to and subtracted from")
+    print("4. Keep a from-scratch recount around to test the running totals")
@@ -0,0 +1,324 @@
+"""
+SOLUTION 3 EXTENSION: Fleet Queries
+====================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Query builders: Chain conditions, then run them all at once
+2. Masks: Each condition becomes one True/False per row, combined with &
+3. Precomputed indexes: Predicate results are stored, not recomputed
+4. Same rules as the classes: Indexes reuse the predicates' definitions
+5. Incremental indexes: New rows are indexed without redoing old ones
+
+"""
+
+from solution_03_inheritance import Car, Motorcycle, Truck
+from solution_03_fleet import Fleet, KIND_BITS, sample_fleet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _fuel_efficient(partition, strings, start, use_numpy):
+    """Car.is_fuel_efficient for the car rows from `start` on"""
+    electric = [i for i in range(len(strings)) if strings[i].lower() == "electric"]
+    fuel = partition.columns["fuel_type"]
+    if use_numpy:
+        return np.isin(np.frombuffer(fuel, dtype=np.uint32)[start:], electric).view(np.uint8)
+    electric = set(electric)
+    return bytearray(fuel[row] in electric for row in range(start, len(fuel)))
+
+
+def _high_performance(partition, strings, start, use_numpy):
+    """Motorcycle.is_high_performance for the motorcycle rows from `start` on"""
+    engine_cc = partition.columns["engine_cc"]
+    if use_numpy:
+        return (np.frombuffer(engine_cc, dtype=np.uint32)[start:] > 600).view(np.uint8)
+    return bytearray(engine_cc[row] > 600 for row in range(start, len(engine_cc)))
+
+
+def _heavy_duty(partition, strings, start, use_numpy):
+    """Truck.is_heavy_duty for the truck rows from `start` on"""
+    cargo = partition.columns["cargo_capacity"]
+    if use_numpy:
+        return (np.frombuffer(cargo, dtype=np.float64)[start:] > 10).view(np.uint8)
+    return bytearray(cargo[row] > 10 for row in range(start, len(cargo)))
+
+
+# class -> {predicate method name -> function computing it for new rows}
+PREDICATES = {
+    Car: {"is_fuel_efficient": _fuel_efficient},
+    Motorcycle: {"is_high_performance": _high_performance},
+    Truck: {"is_heavy_duty": _heavy_duty},
+}
+
+
+class FleetQueryEngine:
+    """
+    Runs queries over a Fleet's columns
+
+    For every boolean predicate of a class (see PREDICATES) the engine
+    keeps an index: one byte per row, 1 where the predicate is true.
+    Queries combine those indexes with range and equality masks built
+    from the columns. When the fleet grows only the new rows are
+    indexed; removed vehicles are left out through the live column.
+
+    NOTE: Fleet has no way to change fuel type, engine size or cargo
+    capacity after a vehicle is added, so indexed rows never go stale
+    """
+
+    def __init__(self, fleet, use_numpy=None):
+        """
+        Initialize a FleetQueryEngine
+
+        Parameters:
+        -----------
+        fleet : Fleet
+            The vehicles to query
+        use_numpy : bool, optional
+            Force NumPy on or off (default: use it if it is installed)
+        """
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self._fleet = fleet
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._indexes = {}      # (class, predicate) -> bytearray, one byte per row
+
+    def index(self, cls, predicate):
+        """
+        Return the index for a predicate, indexing any new rows first
+
+        Raises:
+        -------
+        KeyError : If the class has no such predicate
+        """
+        compute = PREDICATES.get(cls, {}).get(predicate)
+        if compute is None:
+            raise KeyError(f"{cls.__name__} has no indexed predicate {predicate!r}")
+        partition = self._fleet.partition(cls)
+        index = self._indexes.setdefault((cls, predicate), bytearray())
+        if len(index) < len(partition):
+            index += memoryview(compute(partition, self._fleet.strings, len(index), self.use_numpy))
+        return index
+
+    def select(self, cls=None):
+        """Start a query over one class (or every class with cls=None)"""
+        return Query(self, cls)
+
+
+class Query:
+    """
+    A chain of conditions on a fleet
+
+    Example:
+        engine.select(Car).where("is_fuel_efficient")
+              .between("price", high=40000).between("year", low=2020).ids()
+    """
+
+    def __init__(self, engine, cls=None):
+        """Initialize a query over one class, or all classes"""
+        self._engine = engine
+        fleet = engine._fleet
+        self._partitions = [fleet.partition(cls)] if cls is not None else list(fleet.partitions.values())
+        self._conditions = []
+
+    def where(self, predicate):
+        """
+        Keep vehicles for which a predicate method (e.g. 'is_heavy_duty') is true
+
+        Raises:
+        -------
+        KeyError : If no class has such a predicate
+        """
+        if not any(predicate in methods for methods in PREDICATES.values()):
+            raise KeyError(f"No indexed predicate {predicate!r}")
+        self._conditions.append(("predicate", predicate))
+        return self
+
+    def between(self, field, low=None, high=None):
+        """Keep vehicles with low <= field < high (either bound may be None)"""
+        self._conditions.append(("range", field, low, high))
+        return self
+
+    def equals(self, field, value):
+        """Keep vehicles whose field equals value (brand, model, fuel_type, ...)"""
+        self._conditions.append(("equals", field, value))
+        return self
+
+    # ---- running ----------------------------------------------------------------
+
+    def _mask(self, partition):
+        """Combine every condition for one partition into a per-row mask"""
+        if self._engine.use_numpy:
+            return self._numpy_mask(partition)
+        return self._python_mask(partition)
+
+    def _numpy_mask(self, partition):
+        """Vectorized mask: one NumPy operation per condition"""
+        engine = self._engine
+        mask = np.frombuffer(partition.live, dtype=np.uint8).astype(bool)
+        for condition in self._conditions:
+            if condition[0] == "predicate":
+                if condition[1] not in PREDICATES.get(partition.cls, {}):
+                    return None
+                index = engine.index(partition.cls, condition[1])
+                mask &= np.frombuffer(index, dtype=np.uint8).view(bool)
+                continue
+            column = partition.columns.get(condition[1])
+            if column is None:
+                return None
+            values = np.frombuffer(column, dtype=np.dtype(column.typecode))
+            if condition[0] == "range":
+                _, _, low, high = condition
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values < high
+            else:
+                value = self._encode(partition, condition[1], condition[2])
+                if value is None:
+                    return None
+                mask &= values == value
+        return mask
+
+    def _python_mask(self, partition):
+        """Pure-Python mask: a bytearray built row by row"""
+        mask = bytearray(partition.live)
+        for condition in self._conditions:
+            if condition[0] == "predicate":
+                if condition[1] not in PREDICATES.get(partition.cls, {}):
+                    return None
+                index = self._engine.index(partition.cls, condition[1])
+                mask = bytearray(a & b for a, b in zip(mask, index))
+                continue
+            column = partition.columns.get(condition[1])
+            if column is None:
+                return None
+            if condition[0] == "range":
+                _, _, low, high = condition
+                mask = bytearray(ok and (low is None or value >= low) and
+                                 (high is None or value < high)
+                                 for ok, value in zip(mask, column))
+            else:
+                value = self._encode(partition, condition[1], condition[2])
+                if value is None:
+                    return None
+                mask = bytearray(ok and stored == value for ok, stored in zip(mask, column))
+        return mask
+
+    def _encode(self, partition, field, value):
+        """Turn a value into what the column stores (string ids for text)"""
+        kind = dict(partition.fields)[field]
+        if kind == "str":
+            return self._engine._fleet.strings.find(value)
+        return int(value) if kind == "?" else value
+
+    def ids(self):
+        """Return the ids of the matching vehicles"""
+        result = []
+        for partition in self._partitions:
+            mask = self._mask(partition)
+            if mask is None:
+                continue
+            if self._engine.use_numpy:
+                rows = np.flatnonzero(mask)
+                result.extend(((rows << KIND_BITS) | partition.kind).tolist())
+            else:
+                result.extend((row << KIND_BITS) | partition.kind
+                              for row, ok in enumerate(mask) if ok)
+        return result
+
+    def count(self):
+        """Number of matching vehicles"""
+        total = 0
+        for partition in self._partitions:
+            mask = self._mask(partition)
+            if mask is not None:
+                total += int(np.count_nonzero(mask)) if self._engine.use_numpy else sum(mask)
+        return total
+
+    def vehicles(self):
+        """Yield the matching vehicles as objects"""
+        fleet = self._engine._fleet
+        for vehicle_id in self.ids():
+            yield fleet[vehicle_id]
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING FLEET QUERIES")
+    print("=" * 50)
+    print(f"NumPy available: {np is not None}")
+
+    fleet = Fleet()
+    fleet.add_many([
+        Car("Tesla", "Model 3", 2022, 38000, 4, "Electric"),
+        Car("Tesla", "Model S", 2021, 79000, 4, "Electric"),
+        Car("Honda", "Civic", 2020, 25000, 4, "Petrol"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Truck("Volvo", "FH16", 2021, 120000, 25, 3),
+    ])
+    engine = FleetQueryEngine(fleet)
+
+    print("\n1. Electric cars under $40k from 2020 on:")
+    query = engine.select(Car).where("is_fuel_efficient").between("price", high=40000) \
+                  .between("year", low=2020)
+    for vehicle in query.vehicles():
+        print(f"{vehicle.brand} {vehicle.model} ({vehicle.year}) ${vehicle.price:,.0f}")
+
+    print("\n2. Every vehicle from 2021 on, and new rows are indexed:")
+    print(f"Count: {engine.select().between('year', low=2021).count()}")
+    fleet.add(Car("Nissan", "Leaf", 2023, 29000, 5, "electric"))
+    print(f"Cheap electric cars now: {query.count()}")
+    fallback = FleetQueryEngine(fleet, use_numpy=False).select(Car).where("is_fuel_efficient") \
+        .between("price", high=40000).between("year", low=2020)
+    assert fallback.ids() == query.ids()
+
+    # Size comes from the command line (default 20,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    print(f"\n3. Querying {count:,} vehicles:")
+    big = sample_fleet(count)
+    big_engine = FleetQueryEngine(big)
+    query = big_engine.select(Car).where("is_fuel_efficient").between("price", high=40000) \
+                      .between("year", low=2020)
+
+    start = time.perf_counter()
+    query.count()
+    print(f"First query (builds the index): {(time.perf_counter() - start) * 1000:8.1f} ms")
+    start = time.perf_counter()
+    matches = query.count()
+    print(f"Same query again:               {(time.perf_counter() - start) * 1000:8.1f} ms "
+          f"({matches:,} matches)")
+
+    start = time.perf_counter()
+    brand = big_engine.select().equals("brand", "Volvo").between("year", 2015, 2020).count()
+    print(f"Volvos from 2015-2019, all types: {(time.perf_counter() - start) * 1000:6.1f} ms "
+          f"({brand:,} matches)")
+
+    cars = big.partition(Car)
+    sample = min(len(cars), 200_000)
+    objects = [cars.materialize(row) for row in range(sample)]
+    start = time.perf_counter()
+    loop = sum(1 for car in objects
+               if car.is_fuel_efficient() and car.price < 40000 and car.year >= 2020)
+    per_car = (time.perf_counter() - start) / sample
+    print(f"Object loop: {per_car * 1e9:.0f} ns per car -> "
+          f"~{per_car * len(cars) * 1000:,.0f} ms for every car")
+    assert loop == sum(1 for vehicle_id in query.ids() if vehicle_id >> KIND_BITS < sample)
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Build a query first, then evaluate it column by column")
+    print("2. Boolean masks combine any number of conditions cheaply")
+    print("3. Store predicate results once instead of calling methods per object")
+    print("4. Keep index definitions next to the rules they mirror")
@@ -0,0 +1,254 @@
+"""
+SOLUTION 3 EXTENSION: Fleet Age and Depreciation
+=================================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Hoisting: Read the clock once per batch, not once per vehicle
+2. Lookup tables: Ages are small integers, so precompute a factor per age
+3. Vectorization: Ages and values for a whole column in a few NumPy calls
+4. Configuration objects: Each subclass gets its own depreciation curve
+5. Checking against the original: The batch result matches the object loop
+
+"""
+
+from datetime import date
+
+from solution_03_inheritance import Vehicle, Car, Motorcycle, Truck
+from solution_03_fleet import Fleet, sample_fleet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DepreciationCurve:
+    """
+    How a vehicle loses value with age
+
+    A vehicle keeps its full price in its model year. Every year after
+    that it loses `annual_rate` of its value, plus a one-off drop of
+    `first_year` in the first year, but it never falls below `floor`
+    of the price.
+    """
+
+    def __init__(self, annual_rate, first_year=0.0, floor=0.0):
+        """
+        Initialize a DepreciationCurve
+
+        Parameters:
+        -----------
+        annual_rate : float
+            Fraction of value lost per year (e.g. 0.15)
+        first_year : float, optional
+            Extra fraction lost in the first year (default 0)
+        floor : float, optional
+            Lowest fraction of the price a vehicle is worth (default 0)
+        """
+        if not (0 <= annual_rate < 1 and 0 <= first_year < 1 and 0 <= floor <= 1):
+            raise ValueError("Rates and floor must be fractions between 0 and 1")
+        self.annual_rate = annual_rate
+        self.first_year = first_year
+        self.floor = floor
+
+    def factor(self, age):
+        """Fraction of the price a vehicle of this age is worth"""
+        if age <= 0:
+            return 1.0
+        value = (1 - self.first_year) * (1 - self.annual_rate) ** age
+        return max(self.floor, value)
+
+    def table(self, max_age):
+        """
+        Return [factor(0), factor(1), ..., factor(max_age)]
+
+        NOTE: Using the same factor() for the table keeps the batch
+        results identical to the one-at-a-time results
+        """
+        return [self.factor(age) for age in range(max_age + 1)]
+
+    def __repr__(self):
+        return (f"DepreciationCurve(annual_rate={self.annual_rate}, "
+                f"first_year={self.first_year}, floor={self.floor})")
+
+
+DEFAULT_CURVES = {
+    Vehicle: DepreciationCurve(0.12, floor=0.05),
+    Car: DepreciationCurve(0.15, first_year=0.10, floor=0.05),
+    Motorcycle: DepreciationCurve(0.12, first_year=0.05, floor=0.10),
+    Truck: DepreciationCurve(0.10, floor=0.15),
+}
+
+
+def current_value(vehicle, curves=DEFAULT_CURVES):
+    """
+    Value of one vehicle today, the object-by-object way
+
+    NOTE: calculate_age() reads the clock on every call
+    """
+    return vehicle.price * curves[type(vehicle)].factor(vehicle.calculate_age())
+
+
+class FleetValuation:
+    """
+    Ages and current values of every vehicle in a Fleet
+
+    Every method takes the reference year once (from `today`) and
+    works a whole partition at a time: ages are reference year minus
+    the year column, and values are price times the curve factor looked
+    up by age. Removed vehicles are valued at 0.
+    """
+
+    def __init__(self, fleet, curves=None, today=date.today, use_numpy=None):
+        """
+        Initialize a FleetValuation
+
+        Parameters:
+        -----------
+        fleet : Fleet
+            The vehicles to value
+        curves : dict, optional
+            class -> DepreciationCurve (default DEFAULT_CURVES)
+        today : callable, optional
+            Returns the reference date (default date.today)
+        use_numpy : bool, optional
+            Force NumPy on or off (default: use it if it is installed)
+        """
+        if use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self._fleet = fleet
+        self.curves = dict(DEFAULT_CURVES if curves is None else curves)
+        self._today = today
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+
+    def reference_year(self):
+        """The year ages are counted from (read once per batch)"""
+        return self._today().year
+
+    def ages(self, cls, year=None):
+        """
+        Age of every row of a class's partition, like calculate_age()
+
+        Returns:
+        --------
+        NumPy int32 array (or list without NumPy), one age per row
+        """
+        year = self.reference_year() if year is None else year
+        years = self._fleet.partition(cls).columns["year"]
+        if self.use_numpy:
+            return year - np.frombuffer(years, dtype=np.uint16).astype(np.int32)
+        return [year - model_year for model_year in years]
+
+    def values(self, cls, year=None):
+        """
+        Current value of every row of a class's partition
+
+        Returns:
+        --------
+        NumPy float64 array (or list without NumPy), one value per row
+        """
+        year = self.reference_year() if year is None else year
+        partition = self._fleet.partition(cls)
+        ages = self.ages(cls, year)
+        curve = self.curves[cls]
+        if self.use_numpy:
+            if not len(ages):
+                return np.zeros(0)
+            ages = np.clip(ages, 0, None)
+            factors = np.asarray(curve.table(int(ages.max())))
+            prices = np.frombuffer(partition.columns["price"], dtype=np.float64)
+            live = np.frombuffer(partition.live, dtype=np.uint8).view(bool)
+            return np.where(live, prices * factors[ages], 0.0)
+        factors = curve.table(max((max(ages, default=0), 0)))
+        return [price * factors[max(age, 0)] if alive else 0.0
+                for price, age, alive in zip(partition.columns["price"], ages, partition.live)]
+
+    def revalue(self):
+        """
+        Value the whole fleet against one reference year
+
+        Returns:
+        --------
+        dict : class -> per-row values (see values())
+        """
+        year = self.reference_year()
+        return {cls: self.values(cls, year) for cls in self._fleet.partitions}
+
+    def total_value(self):
+        """Current value of the whole fleet"""
+        values = self.revalue().values()
+        if self.use_numpy:
+            return float(sum(column.sum() for column in values))
+        return sum(sum(column) for column in values)
+
+    def value_of(self, vehicle_id):
+        """Current value of one vehicle"""
+        vehicle = self._fleet[vehicle_id]
+        return vehicle.price * self.curves[type(vehicle)].factor(
+            self.reference_year() - vehicle.year)
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING FLEET VALUATION")
+    print("=" * 50)
+    print(f"NumPy available: {np is not None}")
+
+    fleet = Fleet()
+    ids = fleet.add_many([
+        Car("Tesla", "Model 3", 2022, 45000, 4, "Electric"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Truck("Volvo", "FH16", 2015, 120000, 25, 3),
+    ])
+    valuation = FleetValuation(fleet)
+
+    print("\n1. Values match the object-by-object calculation:")
+    for vehicle_id in ids:
+        vehicle = fleet[vehicle_id]
+        print(f"{vehicle.brand} {vehicle.model}: age {vehicle.calculate_age()}, "
+              f"${vehicle.price:,.0f} -> ${valuation.value_of(vehicle_id):,.2f} "
+              f"(object loop: ${current_value(vehicle):,.2f})")
+
+    print("\n2. Custom curve for trucks:")
+    valuation.curves[Truck] = DepreciationCurve(0.05, floor=0.3)
+    print(f"Fleet value: ${valuation.total_value():,.2f}")
+
+    # Size comes from the command line (default 20,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    print(f"\n3. Revaluing {count:,} vehicles:")
+    big = sample_fleet(count)
+    engine = FleetValuation(big)
+
+    sample = min(count, 200_000)
+    objects = [big[vehicle_id] for _, vehicle_id in zip(range(sample), big.ids(Car))]
+    start = time.perf_counter()
+    for vehicle in objects:
+        current_value(vehicle)
+    per_vehicle = (time.perf_counter() - start) / sample
+    print(f"Object loop:   {per_vehicle * 1e6:.2f} µs per vehicle "
+          f"-> ~{per_vehicle * count:.1f}s for the fleet (objects not included)")
+
+    modes = [("Pure Python:", False)] + ([("NumPy:", True)] if np else [])
+    for label, use_numpy in modes:
+        if not use_numpy and count > 2_000_000:
+            continue
+        engine.use_numpy = use_numpy
+        start = time.perf_counter()
+        total = engine.total_value()
+        print(f"{label:14} {time.perf_counter() - start:.3f}s, fleet value ${total:,.0f}")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Move expensive calls like datetime.now() out of the loop")
+    print("2. Small integer keys make lookup tables a perfect fit")
+    print("3. Keep the rules in one place so batch and single results agree")
+    print("4. Configure behaviour per subclass with a dict of objects")
@@ -0,0 +1,303 @@
+"""
+SOLUTION 3 EXTENSION: Parallel Fleet Appraisal
+===============================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Shared memory: Columns are copied once into memory every process can see
+2. No pickling: Workers receive row ranges, never vehicle objects
+3. Shared output: Workers write results straight into a shared array
+4. memoryview.cast: Raw shared bytes read as typed arrays, no NumPy needed
+5. Scaling: CPU-bound Python speeds up with processes, not threads
+
+"""
+
+import os
+from array import array
+from datetime import date
+from multiprocessing import Pool, shared_memory
+
+from solution_03_inheritance import Car, Motorcycle, Truck
+from solution_03_fleet import Fleet, KIND_BITS, sample_fleet
+from solution_03_valuation import DEFAULT_CURVES
+
+
+HORIZON = 10            # years a vehicle may be held before it is sold
+DISCOUNT_RATE = 0.06    # yearly rate future sale prices are discounted at
+CHUNK_ROWS = 50_000
+
+# Columns each worker needs, per partition
+COLUMNS = ("year", "price")
+
+
+def appraise(price, age, curve, horizon=HORIZON, discount_rate=DISCOUNT_RATE):
+    """
+    Portfolio value of one vehicle: the average, over selling it now or
+    in any of the next `horizon` years, of the sale price discounted to
+    today
+
+    NOTE: This is deliberately plain Python, one vehicle at a time, so
+    it stands in for valuation logic that cannot be vectorized
+    """
+    total = 0.0
+    discount = 1.0
+    for year in range(horizon + 1):
+        total += price * curve.factor(age + year) * discount
+        discount /= 1 + discount_rate
+    return total / (horizon + 1)
+
+
+def appraise_vehicle(vehicle, curves=DEFAULT_CURVES):
+    """appraise() for one Vehicle object, the object-by-object way"""
+    return appraise(vehicle.price, vehicle.calculate_age(), curves[type(vehicle)])
+
+
+class SharedFleetColumns:
+    """
+    The year, price and live columns of a Fleet in one shared memory block
+
+    `layout` describes where each column lives in the block and is all
+    another process needs (with the block's `name`) to read them. A
+    second block holds one float64 result per row.
+
+    NOTE: The columns are a snapshot; later changes to the fleet are
+    not seen
+    """
+
+    def __init__(self, fleet):
+        """Copy the columns of every partition into shared memory"""
+        self.layout = []        # (class, rows, {column: (offset, typecode)}, output offset)
+        offset = 0
+        output_rows = 0
+        sections = []
+        for cls, partition in fleet.partitions.items():
+            offsets = {}
+            for name in COLUMNS + ("live",):
+                column = partition.live if name == "live" else partition.columns[name]
+                data = memoryview(column).cast("B")
+                offsets[name] = (offset, "B" if name == "live" else column.typecode)
+                sections.append((offset, data))
+                offset += (len(data) + 7) // 8 * 8      # keep every column 8-byte aligned
+            self.layout.append((cls, len(partition), offsets, output_rows))
+            output_rows += len(partition)
+        self.rows = output_rows
+        self._columns = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            self._output = shared_memory.SharedMemory(create=True, size=max(output_rows * 8, 1))
+            for start, data in sections:
+                self._columns.buf[start:start + len(data)] = data
+        except BaseException:
+            # Shared memory outlives the process, so don't leave the block behind
+            self._columns.close()
+            self._columns.unlink()
+            raise
+        self.names = (self._columns.name, self._output.name)
+
+    def results(self):
+        """Return class -> array('d') of one result per row"""
+        output = self._output.buf
+        results = {}
+        for cls, rows, _, first in self.layout:
+            values = array("d")
+            values.frombytes(output[first * 8:(first + rows) * 8])
+            results[cls] = values
+        return results
+
+    def close(self):
+        """Free both shared memory blocks"""
+        for block in (self._columns, self._output):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Worker:
+    """A process's view of the shared columns and output"""
+
+    def __init__(self, names, layout, curves, year):
+        """Attach to the shared blocks and cast each column to its type"""
+        self._blocks = [shared_memory.SharedMemory(name=name) for name in names]
+        columns, output = (block.buf for block in self._blocks)
+        self.output = output.cast("d")
+        self.sections = []
+        for cls, rows, offsets, first in layout:
+            views = {name: columns[start:start + rows * array(code).itemsize].cast(code)
+                     for name, (start, code) in offsets.items()}
+            self.sections.append((curves[cls], views, first))
+        self.year = year
+
+    def run(self, task):
+        """Appraise rows start..stop of one partition into the output"""
+        section, start, stop = task
+        curve, views, first = self.sections[section]
+        years, prices, live, output = views["year"], views["price"], views["live"], self.output
+        year = self.year
+        for row in range(start, stop):
+            if live[row]:
+                output[first + row] = appraise(prices[row], year - years[row], curve)
+            else:
+                output[first + row] = 0.0
+        return stop - start
+
+    def release(self):
+        """Release the typed views so the blocks can be closed"""
+        for _, views, _ in self.sections:
+            for view in views.values():
+                view.release()
+        self.output.release()
+        for block in self._blocks:
+            block.close()
+
+
+# The worker of the current pool process, set by _start_worker
+_worker = None
+
+
+def _start_worker(names, layout, curves, year):
+    """Pool initializer: attach to shared memory once per process"""
+    global _worker
+    _worker = _Worker(names, layout, curves, year)
+
+
+def _run_task(task):
+    return _worker.run(task)
+
+
+class ParallelAppraisal:
+    """
+    Appraise every vehicle of a Fleet with a pool of processes
+
+    Each run copies the fleet's columns into shared memory, sends the
+    workers (partition, start, stop) ranges and collects the results
+    they wrote into the shared output array. Nothing but those small
+    tuples is pickled.
+    """
+
+    def __init__(self, fleet, processes=None, curves=None, today=date.today,
+                 chunk_rows=CHUNK_ROWS):
+        """
+        Initialize a ParallelAppraisal
+
+        Parameters:
+        -----------
+        fleet : Fleet
+            The vehicles to appraise
+        processes : int, optional
+            Worker processes (default: one per CPU; 1 runs in this process)
+        curves : dict, optional
+            class -> DepreciationCurve (default DEFAULT_CURVES)
+        today : callable, optional
+            Returns the reference date (default date.today)
+        chunk_rows : int, optional
+            Rows per task (default 50,000)
+        """
+        self._fleet = fleet
+        self.processes = processes or os.cpu_count() or 1
+        self.curves = dict(DEFAULT_CURVES if curves is None else curves)
+        self._today = today
+        self.chunk_rows = chunk_rows
+
+    def _tasks(self, layout):
+        """Split every partition into (section, start, stop) ranges"""
+        for section, (_, rows, _, _) in enumerate(layout):
+            for start in range(0, rows, self.chunk_rows):
+                yield section, start, min(start + self.chunk_rows, rows)
+
+    def run(self):
+        """
+        Appraise the whole fleet against one reference year
+
+        Returns:
+        --------
+        dict : class -> array('d') with one value per row (0 for removed
+        vehicles)
+        """
+        year = self._today().year
+        with SharedFleetColumns(self._fleet) as shared:
+            arguments = (shared.names, shared.layout, self.curves, year)
+            if self.processes == 1:
+                worker = _Worker(*arguments)
+                try:
+                    for task in self._tasks(shared.layout):
+                        worker.run(task)
+                finally:
+                    worker.release()
+            else:
+                with Pool(self.processes, initializer=_start_worker, initargs=arguments) as pool:
+                    for _ in pool.imap_unordered(_run_task, self._tasks(shared.layout)):
+                        pass
+            return shared.results()
+
+    def total_value(self):
+        """Portfolio value of the whole fleet"""
+        return sum(sum(values) for values in self.run().values())
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("=" * 50)
+    print("TESTING PARALLEL APPRAISAL")
+    print("=" * 50)
+    print(f"CPUs: {os.cpu_count()}")
+
+    fleet = Fleet()
+    ids = fleet.add_many([
+        Car("Tesla", "Model 3", 2022, 45000, 4, "Electric"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Truck("Volvo", "FH16", 2015, 120000, 25, 3),
+    ])
+
+    print("\n1. Pool results match the object-by-object appraisal:")
+    results = ParallelAppraisal(fleet, processes=2).run()
+    for vehicle_id in ids:
+        vehicle = fleet[vehicle_id]
+        row = vehicle_id >> KIND_BITS
+        print(f"{vehicle.brand} {vehicle.model}: ${results[type(vehicle)][row]:,.2f} "
+              f"(object loop: ${appraise_vehicle(vehicle):,.2f})")
+        assert abs(results[type(vehicle)][row] - appraise_vehicle(vehicle)) < 1e-6
+
+    # Size comes from the command line (default 2,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"\n2. Appraising {count:,} vehicles:")
+    big = sample_fleet(count)
+
+    sample = min(count, 100_000)
+    objects = [big[vehicle_id] for _, vehicle_id in zip(range(sample), big.ids(Car))]
+    start = time.perf_counter()
+    for vehicle in objects:
+        appraise_vehicle(vehicle)
+    per_vehicle = (time.perf_counter() - start) / sample
+    print(f"Object loop: {per_vehicle * 1e6:.2f} µs per vehicle "
+          f"-> ~{per_vehicle * count:.1f}s for the fleet")
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cpus} if cpus > 1 else {1, 2})
+    baseline = None
+    for processes in counts:
+        start = time.perf_counter()
+        total = ParallelAppraisal(big, processes=processes).total_value()
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{processes:2} process(es): {elapsed:6.2f}s, speedup {baseline / elapsed:4.1f}x, "
+              f"portfolio ${total:,.0f}")
+    if cpus == 1:
+        print("(only one CPU here, so extra processes cannot speed this up)")
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Processes sidestep the GIL for CPU-bound Python code")
+    print("2. Share columns through shared_memory instead of pickling objects")
+    print("3. Send workers small tasks (row ranges) and let them write results")
+    print("4. Measure speedup per process count; it is rarely free")
@@ -0,0 +1,481 @@
+"""
+SOLUTION 3 EXTENSION: Binary Vehicle Files
+===========================================
+
+CONCEPTS EXPLAINED:
+-------------------
+1. Schema tags: The file lists each class's fields, so readers can check them
+2. Fixed-width records: Every vehicle of a class takes the same bytes
+3. String tables: Each brand, model and fuel type is stored once
+4. Lazy reading: Vehicles are built one at a time, only when asked for
+5. Zero-copy columns: A column is a typed view of the mapped file
+
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import compress
+
+from solution_03_inheritance import Vehicle, Car, Motorcycle, Truck
+from solution_03_fleet import (Fleet, KINDS, SCHEMAS, SHARED_FIELDS, _storage_code,
+                               sample_fleet)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MAGIC = b"VEHICLE\0"
+VERSION = 1
+
+# magic, version, section count, string count, string table offset, checksum
+HEADER = struct.Struct("<8sIIQQI")
+HEADER_SIZE = 64
+
+# class name, rows, field count
+SECTION = struct.Struct("<16sQI")
+# field name, field type, offset of its column
+FIELD = struct.Struct("<16s4sQ")
+
+# Saved after each class's fields: which float fields were ints (FleetPartition.int_flags)
+INT_FLAGS = ("int_flags", "B")
+
+
+class VehicleFormatError(ValueError):
+    """Raised when a vehicle file is damaged or does not match the classes"""
+
+
+def _align(offset):
+    """Round an offset up to a multiple of 8"""
+    return (offset + 7) & ~7
+
+
+def _check_byte_order():
+    """Columns are stored in native order, which must be little-endian"""
+    if sys.byteorder != "little":
+        raise OSError("Vehicle files require a little-endian machine")
+
+
+def _live_columns(partition):
+    """Return field name -> bytes of a partition's live rows, int_flags included"""
+    columns = dict(partition.columns, int_flags=partition.int_flags)
+    if partition.live_count == len(partition):
+        return {name: bytes(column) for name, column in columns.items()}
+    live = partition.live
+    return {name: bytes(compress(column, live)) if name == INT_FLAGS[0]
+            else array(column.typecode, compress(column, live)).tobytes()
+            for name, column in columns.items()}
+
+
+def _with_ints(values, flags, bit):
+    """Yield values, as ints where `bit` is set in the row's int_flags byte"""
+    mask = 1 << bit
+    for value, flag in zip(values, flags):
+        yield int(value) if flag & mask else value
+
+
+def save_vehicles(source, path):
+    """
+    Write vehicles to a file that VehicleFile can open
+
+    Layout: header, one schema entry per class (its name, row count and
+    fields with their types and offsets), the columns of each class,
+    then the string table. Every column is 8-byte aligned. Each class
+    ends with an int_flags column so ints stored as floats come back
+    as ints.
+
+    Parameters:
+    -----------
+    source : Fleet or iterable of Vehicle
+        The vehicles to save (removed fleet vehicles are left out)
+    path : str
+        Destination file (written to a temporary name, then renamed)
+
+    Returns:
+    --------
+    int : Number of vehicles written
+    """
+    _check_byte_order()
+    if not isinstance(source, Fleet):
+        fleet = Fleet()
+        fleet.add_many(source)
+        source = fleet
+
+    sections = [(cls, partition, _live_columns(partition))
+                for cls, partition in source.partitions.items()]
+    offset = HEADER_SIZE + sum(SECTION.size + FIELD.size * (len(partition.fields) + 1)
+                               for _, partition, _ in sections)
+    schema = bytearray()
+    contents = []
+    total = 0
+    for cls, partition, columns in sections:
+        rows = partition.live_count
+        total += rows
+        schema += SECTION.pack(cls.__name__.encode(), rows, len(partition.fields) + 1)
+        for name, kind in partition.fields + (INT_FLAGS,):
+            offset = _align(offset)
+            schema += FIELD.pack(name.encode(), kind.encode(), offset)
+            contents.append((offset, columns[name]))
+            offset += len(columns[name])
+
+    strings = [source.strings[i].encode() for i in range(len(source.strings))]
+    starts = array("Q", [0])
+    for string in strings:
+        starts.append(starts[-1] + len(string))
+    strings_offset = _align(offset)
+    contents.append((strings_offset, starts.tobytes()))
+    contents.append((strings_offset + len(starts) * 8, b"".join(strings)))
+
+    buffer = bytearray(contents[-1][0] + len(contents[-1][1]))
+    buffer[HEADER_SIZE:HEADER_SIZE + len(schema)] = schema
+    for start, data in contents:
+        buffer[start:start + len(data)] = data
+    checksum = zlib.crc32(memoryview(buffer)[HEADER_SIZE:])
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, len(sections), len(strings),
+                     strings_offset, checksum)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(buffer)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return total
+
+
+class VehicleFile:
+    """
+    A read-only, memory-mapped file written by save_vehicles()
+
+    Opening reads the header, the schema entries and the string table;
+    the columns stay in the file until they are used. Iterating builds
+    one Vehicle object at a time, and column() returns a typed view of
+    the mapped bytes without copying them.
+
+    NOTE: A file's schema must match the classes' current fields; a file
+    written with different fields is rejected instead of misread
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        Open a vehicle file
+
+        Parameters:
+        -----------
+        path : str
+            File written by save_vehicles()
+        verify : bool, optional
+            Check the checksum (default True)
+
+        Raises:
+        -------
+        VehicleFormatError : If the file is damaged, of another version,
+        or its schema does not match the classes
+        """
+        _check_byte_order()
+        self.path = path
+        self._map = None
+        self._views = []
+        self._columns = {}      # (class, field) -> typed view
+        self._file = open(path, "rb")
+
+        # mmap cannot map an empty file, so check the size first
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER_SIZE:
+            self._abort("file is too small")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as error:
+            self._abort(f"cannot map the file ({error})")
+        magic, version, section_count, string_count, strings_offset, checksum = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._abort("not a vehicle file")
+        if version != VERSION:
+            self._abort(f"unsupported version {version}")
+        if verify:
+            with memoryview(self._map) as whole, whole[HEADER_SIZE:] as body:
+                actual = zlib.crc32(body)
+            if actual != checksum:
+                self._abort("checksum does not match")
+
+        classes = {cls.__name__: cls for cls in KINDS}
+        kinds = {kind for cls in KINDS for _, kind in SHARED_FIELDS + SCHEMAS[cls]}
+        self._sections = {}     # class -> (rows, {field: (kind, offset)})
+        position = HEADER_SIZE
+        for _ in range(section_count):
+            if position + SECTION.size > size:
+                self._abort("file is truncated")
+            name, rows, field_count = SECTION.unpack_from(self._map, position)
+            position += SECTION.size
+            name = name.rstrip(b"\0").decode(errors="replace")
+            cls = classes.get(name)
+            if cls is None:
+                self._abort(f"unknown class {name!r}")
+            if cls in self._sections:
+                self._abort(f"duplicate section for {name!r}")
+            fields = {}
+            for _ in range(field_count):
+                if position + FIELD.size > size:
+                    self._abort("file is truncated")
+                field, kind, offset = FIELD.unpack_from(self._map, position)
+                position += FIELD.size
+                kind = kind.rstrip(b"\0").decode(errors="replace")
+                if kind not in kinds:
+                    self._abort(f"unknown field type {kind!r}")
+                width = array(_storage_code(kind)).itemsize
+                if offset + rows * width > size:
+                    self._abort("file is truncated")
+                fields[field.rstrip(b"\0").decode(errors="replace")] = (kind, offset)
+            expected = SHARED_FIELDS + SCHEMAS[cls] + (INT_FLAGS,)
+            if [(name, kind) for name, (kind, _) in fields.items()] != list(expected):
+                self._abort(f"{cls.__name__} fields do not match the class")
+            self._sections[cls] = (rows, fields)
+
+        data = strings_offset + (string_count + 1) * 8
+        if data > size:
+            self._abort("file is truncated")
+        starts = self._view(strings_offset, data - strings_offset, "Q")
+        if data + starts[-1] > size:
+            self._abort("file is truncated")
+        try:
+            self.strings = [str(self._map[data + starts[i]:data + starts[i + 1]], "utf-8")
+                            for i in range(string_count)]
+        except UnicodeDecodeError:
+            self._abort("string table is damaged")
+
+    def _abort(self, message):
+        """Close the file and raise VehicleFormatError"""
+        self.close()
+        raise VehicleFormatError(f"{self.path}: {message}")
+
+    def _view(self, offset, length, typecode):
+        """Return bytes of the mapped file as a typed memoryview"""
+        view = memoryview(self._map)[offset:offset + length]
+        self._views.append(view)
+        if typecode != "B":
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    # ---- reading --------------------------------------------------------------
+
+    def count(self, cls=None):
+        """Number of vehicles (of one class, if given)"""
+        if cls is not None:
+            return self._sections[cls][0] if cls in self._sections else 0
+        return sum(rows for rows, _ in self._sections.values())
+
+    def __len__(self):
+        return self.count()
+
+    def column(self, cls, name):
+        """
+        Return one column of a class as a read-only view of the file
+
+        NOTE: No bytes are copied. Text fields hold indexes into
+        `strings`, and bool fields hold 0 or 1.
+        """
+        view = self._columns.get((cls, name))
+        if view is None:
+            rows, fields = self._sections[cls]
+            kind, offset = fields[name]
+            code = _storage_code(kind)
+            view = self._columns[(cls, name)] = self._view(offset, rows * array(code).itemsize, code)
+        return view
+
+    def vehicles(self, cls):
+        """Yield the vehicles of one class as objects, one at a time"""
+        if cls not in self._sections:
+            return
+        rows, fields = self._sections[cls]
+        strings = self.strings
+        flags = self.column(cls, INT_FLAGS[0])
+        columns = []
+        floats = 0
+        for name, (kind, _) in fields.items():
+            if name == INT_FLAGS[0]:
+                continue
+            column = self.column(cls, name)
+            if kind == "str":
+                column = map(strings.__getitem__, column)
+            elif kind == "?":
+                column = map(bool, column)
+            elif kind == "d":
+                column = _with_ints(column, flags, floats)
+                floats += 1
+            columns.append(column)
+        for values in zip(*columns):
+            yield cls(*values)
+
+    def __iter__(self):
+        """Yield every vehicle, class by class"""
+        for cls in self._sections:
+            yield from self.vehicles(cls)
+
+    def to_fleet(self):
+        """
+        Load every vehicle into a new Fleet, column by column
+
+        NOTE: String ids are kept as they are, so each column is one
+        bulk copy (with NumPy) and no objects are built
+        """
+        fleet = Fleet()
+        for string in self.strings:
+            fleet.strings.intern(string)
+        for cls, (rows, fields) in self._sections.items():
+            if rows:
+                columns = {name: self.column(cls, name) for name in fields
+                           if name != INT_FLAGS[0]}
+                if np is not None:
+                    columns = {name: np.frombuffer(view, dtype=view.format)
+                               for name, view in columns.items()}
+                fleet.add_columns(cls, encoded=True,
+                                  int_flags=self.column(cls, INT_FLAGS[0]), **columns)
+        return fleet
+
+    def close(self):
+        """Release every view, then the mapping and the file"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._columns = {}
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ============================================
+# TESTING THE CODE
+# ============================================
+
+if __name__ == "__main__":
+    import pickle
+    import tempfile
+    import time
+
+    print("=" * 50)
+    print("TESTING BINARY VEHICLE FILES")
+    print("=" * 50)
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "vehicles.bin")
+
+    originals = [
+        Vehicle("Ford", "Model T", 1925, 850.5),
+        Car("Tesla", "Model 3", 2022, 45000, 4, "Electric"),
+        Car("Škoda", "Octavia, Combi", 2019, 21999.99, 5, "Diesel"),
+        Motorcycle("Kawasaki", "Ninja ZX-10R", 2023, 16000, False, 998),
+        Motorcycle("Ural", "Gear Up", 2021, 18000, True, 749),
+        Truck("Volvo", "FH16", 2021, 120000, 25, 3),
+        Truck("MAN", "TGX", 2020, 98500.75, 18.5, 2),
+    ]
+
+    def fields(vehicle):
+        """Attribute values with their types, so 25 and 25.0 differ"""
+        return {name: (type(value), value) for name, value in vars(vehicle).items()}
+
+    print("\n1. Round trip of every class:")
+    save_vehicles(originals, path)
+    with VehicleFile(path) as stored:
+        loaded = list(stored)
+        by_class = {cls: stored.count(cls) for cls in KINDS}
+    for original, copy in zip(originals, loaded):
+        same = type(copy) is type(original) and fields(copy) == fields(original)
+        print(f"{'✓' if same else '✗'} {type(copy).__name__:10} {copy.brand} {copy.model}")
+        assert same
+    print(f"Per class: {', '.join(f'{cls.__name__} {n}' for cls, n in by_class.items())}")
+
+    print("\n2. Damaged and foreign files are rejected:")
+    with open(path, "r+b") as f:
+        # Give the second schema entry the first one's class name
+        first = f.read(HEADER_SIZE + SECTION.size)[HEADER_SIZE:]
+        f.seek(HEADER_SIZE + SECTION.size + SECTION.unpack(first)[2] * FIELD.size)
+        f.write(first[:16])     # the 16-byte name field
+    try:
+        VehicleFile(path, verify=False)
+    except VehicleFormatError as error:
+        print(f"✗ {error}")
+    save_vehicles(originals, path)
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + SECTION.size + 2)
+        f.write(b"\xff")
+    try:
+        VehicleFile(path)
+    except VehicleFormatError as error:
+        print(f"✗ {error}")
+    with open(path, "r+b") as f:
+        f.write(b"NOTAFILE")
+    try:
+        VehicleFile(path, verify=False)
+    except VehicleFormatError as error:
+        print(f"✗ {error}")
+    open(path, "wb").close()
+    try:
+        VehicleFile(path)
+    except VehicleFormatError as error:
+        print(f"✗ {error}")
+
+    # Size comes from the command line (default 1,000,000 vehicles)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"\n3. {count:,} vehicles:")
+    fleet = sample_fleet(count)
+    big_path = os.path.join(folder, "fleet.bin")
+
+    start = time.perf_counter()
+    save_vehicles(fleet, big_path)
+    print(f"save_vehicles:        {time.perf_counter() - start:6.2f}s, "
+          f"{os.path.getsize(big_path) / count:5.1f} bytes per vehicle")
+
+    sample = min(count, 200_000)
+    objects = [vehicle for _, vehicle in zip(range(sample), fleet)]
+    start = time.perf_counter()
+    pickled = pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL)
+    dumped = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(pickled)
+    unpickled = time.perf_counter() - start
+    print(f"pickle (estimated):   {dumped * count / sample:6.2f}s, "
+          f"{len(pickled) / sample:5.1f} bytes per vehicle, "
+          f"load ~{unpickled * count / sample:.2f}s")
+
+    with VehicleFile(big_path) as stored:
+        start = time.perf_counter()
+        prices = stored.column(Car, "price")
+        print(f"Zero-copy price column of {len(prices):,} cars: "
+              f"{(time.perf_counter() - start) * 1e6:.0f} µs")
+        del prices
+        start = time.perf_counter()
+        first = next(iter(stored))
+        print(f"First vehicle, lazily: {(time.perf_counter() - start) * 1e6:.0f} µs "
+              f"({type(first).__name__} {first.brand} {first.model})")
+        start = time.perf_counter()
+        reloaded = stored.to_fleet()
+        print(f"to_fleet:             {time.perf_counter() - start:6.2f}s")
+    assert len(reloaded) == len(fleet)
+    assert all(reloaded.partition(cls).columns[name] == fleet.partition(cls).columns[name]
+               for cls in KINDS for name in fleet.partition(cls).columns)
+    assert all(reloaded.partition(cls).int_flags == fleet.partition(cls).int_flags
+               for cls in KINDS)
+
+    print("\n" + "=" * 50)
+    print("KEY TAKEAWAYS:")
+    print("=" * 50)
+    print("1. Store the schema in the file so old or foreign files are caught")
+    print("2. Fixed-width columns are compact and need no parsing")
+    print("3. mmap plus memoryview.cast reads columns without copying")
+    print("4. Pickle is convenient, but slow for millions of objects")